@@ -0,0 +1,111 @@
+# Adif.py
+# Incremental ADIF tokenizer. Each <tag:len[:type]>value field is visited exactly
+# once and tag names are matched case-insensitively (<CALL:5>, <call:5>, <EOR>, ...).
+
+import codecs
+import mmap
+import os
+import re
+
+CHUNK_SIZE = 1 << 16  # 64 KiB reads keep memory flat on very large logs
+EOR_PATTERN = re.compile(rb"<eor>", re.IGNORECASE)
+
+
+def parse_adif_chunks(chunks):
+    """
+    Tokenize an iterable of ADIF text chunks.
+    Yields one dict per record, keyed by lower-case field name.
+    Anything before <EOH> is header data and is discarded.
+    """
+    buf = ""
+    pos = 0
+    record = {}
+    for chunk in chunks:
+        buf = buf[pos:] + chunk if pos < len(buf) else chunk
+        pos = 0
+        while True:
+            lt = buf.find("<", pos)
+            if lt < 0:
+                pos = len(buf)  # Free text between fields, nothing to keep
+                break
+            gt = buf.find(">", lt + 1)
+            if gt < 0:
+                pos = lt  # Tag is split across chunks, wait for more data
+                break
+            spec = buf[lt + 1:gt].split(":")
+            name = spec[0].strip().lower()
+            length = 0
+            if len(spec) > 1:
+                try:
+                    length = int(spec[1])
+                except ValueError:
+                    length = 0
+            value_end = gt + 1 + length
+            if value_end > len(buf):
+                pos = lt  # Value is split across chunks, wait for more data
+                break
+            if name == "eor":
+                if record:
+                    yield record
+                record = {}
+            elif name == "eoh":
+                record = {}  # Drop header fields
+            elif name:
+                record[name] = buf[gt + 1:value_end].strip()
+            pos = value_end
+    # A trailing record without <EOR> is incomplete and ignored, as before
+
+
+def read_adif_file(adif_file, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Stream the records of an ADIF file without loading the whole file into memory.
+    progress(done_bytes, total_bytes) is called after every chunk read.
+    """
+    total = os.path.getsize(adif_file)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def chunks(f):
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                yield decoder.decode(b"", final=True)
+                return
+            yield decoder.decode(data)
+            if progress:
+                progress(f.tell(), total)
+
+    with open(adif_file, 'rb') as f:
+        yield from parse_adif_chunks(chunks(f))
+
+
+def find_record_ranges(adif_file, count):
+    """
+    Split an ADIF file into about count byte ranges that each end just after an <EOR>.
+    The file is memory-mapped, only the bytes around each cut point are touched.
+    """
+    size = os.path.getsize(adif_file)
+    if size == 0:
+        return []
+    ranges = []
+    with open(adif_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        for i in range(1, count):
+            target = max(start, size * i // count)
+            match = EOR_PATTERN.search(mm, target)
+            if match is None:
+                break
+            ranges.append((start, match.end()))
+            start = match.end()
+        if start < size:
+            ranges.append((start, size))
+    return ranges
+
+
+def read_adif_range(adif_file, start, end):
+    """
+    Parse the records in bytes [start, end) of an ADIF file, as found by find_record_ranges.
+    """
+    with open(adif_file, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8", errors="replace")
+    return list(parse_adif_chunks([text]))
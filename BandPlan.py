@@ -0,0 +1,96 @@
+# BandPlan.py
+# Amateur band edges for the three IARU regions, used to work out the band of a QSO
+# from its frequency instead of trusting a radio's band code or an imported BAND field.
+# Band names follow Cat.bands (ADIF band names in upper case).
+from bisect import bisect_right
+
+DEFAULT_REGION = 2
+
+# (lower edge Hz, upper edge Hz, band), sorted by frequency and never overlapping
+REGION_EDGES = {
+    1: [
+        (135700, 137800, "2190M"), (472000, 479000, "630M"), (1810000, 2000000, "160M"),
+        (3500000, 3800000, "80M"), (5351500, 5366500, "60M"), (7000000, 7200000, "40M"),
+        (10100000, 10150000, "30M"), (14000000, 14350000, "20M"), (18068000, 18168000, "17M"),
+        (21000000, 21450000, "15M"), (24890000, 24990000, "12M"), (28000000, 29700000, "10M"),
+        (50000000, 54000000, "6M"), (70000000, 70500000, "4M"), (144000000, 146000000, "2M"),
+        (430000000, 440000000, "70CM"), (1240000000, 1300000000, "23CM"), (2300000000, 2450000000, "13CM"),
+        (3400000000, 3475000000, "9CM"), (5650000000, 5850000000, "6CM"), (10000000000, 10500000000, "3CM"),
+        (24000000000, 24250000000, "1.25CM"),
+    ],
+    2: [
+        (135700, 137800, "2190M"), (472000, 479000, "630M"), (1800000, 2000000, "160M"),
+        (3500000, 4000000, "80M"), (5330000, 5410000, "60M"), (7000000, 7300000, "40M"),
+        (10100000, 10150000, "30M"), (14000000, 14350000, "20M"), (18068000, 18168000, "17M"),
+        (21000000, 21450000, "15M"), (24890000, 24990000, "12M"), (28000000, 29700000, "10M"),
+        (50000000, 54000000, "6M"), (144000000, 148000000, "2M"), (222000000, 225000000, "1.25M"),
+        (420000000, 450000000, "70CM"), (902000000, 928000000, "33CM"), (1240000000, 1300000000, "23CM"),
+        (2300000000, 2450000000, "13CM"), (3300000000, 3500000000, "9CM"), (5650000000, 5925000000, "6CM"),
+        (10000000000, 10500000000, "3CM"), (24000000000, 24250000000, "1.25CM"),
+    ],
+    3: [
+        (135700, 137800, "2190M"), (472000, 479000, "630M"), (1800000, 2000000, "160M"),
+        (3500000, 3900000, "80M"), (5351500, 5366500, "60M"), (7000000, 7300000, "40M"),
+        (10100000, 10150000, "30M"), (14000000, 14350000, "20M"), (18068000, 18168000, "17M"),
+        (21000000, 21450000, "15M"), (24890000, 24990000, "12M"), (28000000, 29700000, "10M"),
+        (50000000, 54000000, "6M"), (144000000, 148000000, "2M"), (430000000, 450000000, "70CM"),
+        (1240000000, 1300000000, "23CM"), (2300000000, 2450000000, "13CM"), (3300000000, 3500000000, "9CM"),
+        (5650000000, 5850000000, "6CM"), (10000000000, 10500000000, "3CM"), (24000000000, 24250000000, "1.25CM"),
+    ],
+}
+
+# Column form of each table for bisect: (lower edges, upper edges, band names)
+_TABLES = {region: tuple(map(list, zip(*edges))) for region, edges in REGION_EDGES.items()}
+
+current_region = DEFAULT_REGION  # Operating region, set from [MY_DETAILS] iaru_region
+
+
+def set_region(new_region):
+    """
+    Select the IARU region (1, 2 or 3) used when no region is passed.
+    Anything else falls back to DEFAULT_REGION.
+    """
+    global current_region
+    try:
+        new_region = int(new_region)
+    except (TypeError, ValueError):
+        new_region = DEFAULT_REGION
+    current_region = new_region if new_region in _TABLES else DEFAULT_REGION
+
+
+def band_for_freq(hz, region=None):
+    # Binary search for the last band starting at or below hz, then check its upper edge
+    if hz is None:
+        return None
+    lows, highs, names = _TABLES[region or current_region]
+    i = bisect_right(lows, hz) - 1
+    if i >= 0 and hz <= highs[i]:
+        return names[i]
+    return None
+
+
+def band_for_mhz(freq, region=None):
+    # freq is MHz as stored in the log and in ADIF, as text or a number
+    try:
+        hz = int(round(float(freq) * 1000000))
+    except (TypeError, ValueError):
+        return None
+    return band_for_freq(hz, region)
+
+
+def bands_for_freqs(freqs_hz, region=None):
+    """
+    Resolve a whole column of frequencies (Hz, None allowed) at once.
+    Each distinct frequency is looked up only once, so a log where most QSOs share
+    a handful of frequencies costs a dictionary hit per row instead of a search.
+    Returns a list of band names (or None) in input order.
+    """
+    lows, highs, names = _TABLES[region or current_region]
+    found = {}
+    for hz in set(freqs_hz):
+        if hz is None:
+            continue
+        i = bisect_right(lows, hz) - 1
+        if i >= 0 and hz <= highs[i]:
+            found[hz] = names[i]
+    return list(map(found.get, freqs_hz))
@@ -1,28 +1,75 @@
+import socket
+import threading
 import time
 import serial
 import configparser
+from BandPlan import band_for_freq
 
 
-bands = ["160M", "80M", "60M", "40M", "30M", "20M", "17M", "15M", "12M", "10M", "6M", "2M", "1.25M", "70CM", "33CM", "23CM", "13CM", "9CM", "6CM", "3CM"]
+# Every band in the BandPlan tables, lowest first
+bands = ["2190M", "630M", "160M", "80M", "60M", "40M", "30M", "20M", "17M", "15M", "12M", "10M", "6M", "4M", "2M", "1.25M",
+         "70CM", "33CM", "23CM", "13CM", "9CM", "6CM", "3CM", "1.25CM"]
 modes = ["NONE", "SSB", "SSB", "CW", "FM", "AM", "DIGI", "CW", "ERR", "DIGI"]
 
-class Cat:
+# Hamlib mode names mapped onto the modes list
+HAMLIB_MODES = {
+    "USB": "SSB", "LSB": "SSB", "CW": "CW", "CWR": "CW", "AM": "AM", "SAM": "AM", "FM": "FM", "FMN": "FM", "WFM": "FM",
+    "RTTY": "DIGI", "RTTYR": "DIGI", "PKTUSB": "DIGI", "PKTLSB": "DIGI", "PKTFM": "DIGI", "PKTAM": "DIGI",
+}
+
+POLL_MS = 100  # How often the reader thread asks the radio for its settings
+READ_TIMEOUT = 0.02  # Serial read timeout, bounds how long the reader waits for bytes
+MAX_FRAME = 64  # Longer runs without a ';' are line noise and are dropped
+AI_TIMEOUT = 1.0  # Seconds to wait for the radio to confirm auto-information mode
+AI_KEEPALIVE = 5.0  # Seconds between checks that the radio is still in auto-information mode
+RIGCTLD_PORT = 4532  # Hamlib's default rigctld port
+CONNECT_TIMEOUT = 3.0  # Seconds to wait for rigctld to accept the connection
+REPLY_TIMEOUT = 2.0  # Seconds before an unanswered rigctld poll is given up and resent
+
+
+class CatFrameParser:
+    """
+    Incremental decoder for ';'-terminated CAT replies.
+    feed() takes whatever bytes the port returned, a reply may be split across
+    reads and one read may carry several replies. Only complete frames are returned.
+    """
+
+    def __init__(self, max_frame=MAX_FRAME):
+        self.max_frame = max_frame
+        self._buffer = b""
+
+    def feed(self, data):
+        self._buffer += data
+        *frames, self._buffer = self._buffer.split(b";")
+        if len(self._buffer) > self.max_frame:
+            self._buffer = b""  # No terminator in sight, resynchronise on the next ';'
+        return [frame.decode("ascii", errors="ignore").strip() for frame in frames]
+
+
+class CatDriver:
+    """
+    Common part of all CAT drivers: a reader thread owns the connection to the radio
+    and publishes its settings as a snapshot the Tk thread can read without blocking.
+    Drivers implement _open(), _close(), is_open(), describe() and _reader_loop().
+    """
+
+    name = None  # Value of the [CAT] driver key that selects this driver
 
     def __init__(self, config: configparser.ConfigParser):
-        self._com_port = config['CAT'].get('com_port', fallback='/dev/ttyUSB0')
-        self._baudrate = int(config['CAT'].get('baudrate', fallback='38400'))
-        self._freq_cmd = config['CAT'].get('freq_cmd', fallback='FA')
-        self._band_cmd = config['CAT'].get('band_cmd', fallback='BN')
-        self._mode_cmd = config['CAT'].get('mode_cmd', fallback='MD')
-        self._ser = None
+        self._load_config(config)
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()  # Guards the snapshot shared with the Tk thread
+        self._freq = self._band = self._mode = None
+        self._version = 0
+        self.error = None  # Set by the reader thread when the connection fails
+
+    def _load_config(self, config):
+        self._poll_interval = int(config['CAT'].get('poll_ms', fallback=str(POLL_MS))) / 1000
 
     def reload_config(self, config: configparser.ConfigParser):
-        self._com_port = config['CAT'].get('com_port', fallback='/dev/ttyUSB0')
-        self._baudrate = int(config['CAT'].get('baudrate', fallback='38400'))
-        self._freq_cmd = config['CAT'].get('freq_cmd', fallback='FA')
-        self._band_cmd = config['CAT'].get('band_cmd', fallback='BN')
-        self._mode_cmd = config['CAT'].get('mode_cmd', fallback='MD')
-        if self._ser and self._ser.is_open:
+        self._load_config(config)
+        if self.is_open():
             self.disconnect()
             return self.connect()
         else:
@@ -30,55 +77,250 @@ class Cat:
 
     def connect(self):
         try:
-            self._ser = serial.Serial(self._com_port, self._baudrate, timeout=1)
-            time.sleep(0.200)  # Wait for the connection to establish
-            if self._ser.is_open:
-                #print(f"Connected to CAT Interface on {self._com_port} at {self._baudrate} baud.")
-                return True
-            else:
-                #print(f"Failed to open serial port {self._com_port}.")
+            if not self._open():
                 return False
-        except serial.SerialException as e:
-            #print(f"Serial exception: {e}")
+        except OSError as e:  # serial.SerialException is an OSError too
+            #print(f"CAT connection failed: {e}")
             return False
+        self.error = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cat-reader", daemon=True)
+        self._thread.start()
+        return True
 
     def disconnect(self):
-        if self._ser and self._ser.is_open:
-            self._ser.close()
-            #print("Disconnected from CAT Interface")
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if self.is_open():
+            self._close()
+
+    def _run(self):
+        try:
+            self._reader_loop()
+        except OSError as e:
+            self.error = str(e)
+
+    def snapshot(self):
+        """
+        Return (version, freq, band, mode) of the latest radio state without blocking.
+        version goes up every time a setting changes, so callers can skip redraws.
+        """
+        with self._lock:
+            return self._version, self._freq, self._band, self._mode
 
     def get_freq_band_mode(self):
-        if not self._ser or not self._ser.is_open:
-            #print("Serial port is not open.")
-            return None, None
-        else:
-            self._ser.write(f"{self._freq_cmd};\n".encode("ascii"))
-            self._ser.write(f"{self._band_cmd};\n".encode("ascii"))
-            self._ser.write(f"{self._mode_cmd};\n".encode("ascii"))
-            time.sleep(0.300)  # Wait for the radio to respond
-            if self._ser.in_waiting > 0:
-                response = self._ser.readline().decode("utf-8", errors="ignore").strip()
-                #print("Received:", response)
-            if response:
-                #print(f"Raw response: {response}")
-                freq = band = mode = None
-                parts = response.split(';')
-                for part in parts:
-                    if part.startswith(self._freq_cmd):
-                        if part[2:].isdigit():
-                            freq = str(round(int(part[2:]) / 1000000, 3))  # Convert Hz to MHz
-                    elif part.startswith(self._band_cmd):
-                        if part[2:].isdigit():
-                            band_code = int(part[2:])
-                            if band_code < len(bands):
-                                band = bands[band_code]
-                    elif part.startswith(self._mode_cmd):
-                       if part[2:].isdigit():
-                            mode_code = int(part[2:])
-                            if mode_code < len(modes):
-                                mode = modes[mode_code]
-                return freq, band, mode
-            else:
-                #print("No response received.")
-                return None, None
+        _, freq, band, mode = self.snapshot()
+        return freq, band, mode
+
+    def _publish(self, freq=None, band=None, mode=None):
+        with self._lock:
+            changed = False
+            if freq is not None and freq != self._freq:
+                self._freq = freq
+                changed = True
+            if band is not None and band != self._band:
+                self._band = band
+                changed = True
+            if mode is not None and mode != self._mode:
+                self._mode = mode
+                changed = True
+            if changed:
+                self._version += 1
+
+
+class Cat(CatDriver):
+    """
+    Serial driver for radios that speak the Kenwood/Yaesu FA/MD dialect.
+    The band is worked out from the frequency, so the radio's band code is never queried.
+    """
+
+    name = "serial"
+
+    def __init__(self, config: configparser.ConfigParser):
+        self._ser = None
+        self.auto_info_active = False  # The radio confirmed AI mode, polling is off
+        super().__init__(config)
+
+    def _load_config(self, config):
+        super()._load_config(config)
+        self._com_port = config['CAT'].get('com_port', fallback='/dev/ttyUSB0')
+        self._baudrate = int(config['CAT'].get('baudrate', fallback='38400'))
+        self._freq_cmd = config['CAT'].get('freq_cmd', fallback='FA')
+        self._mode_cmd = config['CAT'].get('mode_cmd', fallback='MD')
+        # Auto-information: the radio pushes every change itself, AI2 (Kenwood) or AI1 (Yaesu)
+        self._auto_info = config['CAT'].get('auto_info', fallback='off').strip().upper()
+        if self._auto_info in ('', 'OFF', 'FALSE', 'NO', '0', 'AI0'):
+            self._auto_info = None
+
+    def describe(self):
+        return f"{self._com_port} at {self._baudrate} baud"
+
+    def is_open(self):
+        return bool(self._ser and self._ser.is_open)
+
+    def _open(self):
+        self._ser = serial.Serial(self._com_port, self._baudrate, timeout=READ_TIMEOUT)
+        time.sleep(0.200)  # Wait for the connection to establish
+        return self._ser.is_open
+
+    def _close(self):
+        if self.auto_info_active:
+            try:
+                self._ser.write(b"AI0;")  # Leave the radio as we found it
+            except OSError:
+                pass
+            self.auto_info_active = False
+        self._ser.close()
+        #print("Disconnected from CAT Interface")
+
+    def _reader_loop(self):
+        # The only thread that touches the port: writes the poll, reads whatever arrived
+        # and decodes complete ';'-terminated replies as soon as they are in.
+        # In auto-information mode the radio is mostly listened to. Every AI_KEEPALIVE
+        # seconds it is polled once and asked for its AI state; a radio that was switched
+        # off and on again, or a lost reply, makes the loop fall back to polling.
+        poll = f"{self._freq_cmd};\n{self._mode_cmd};\n".encode("ascii")
+        parser = CatFrameParser()
+        self.auto_info_active = False
+        ai_deadline = None  # Set while an AI; query waits for its answer
+        self._ser.write(poll)
+        next_poll = time.monotonic() + self._poll_interval
+        next_keepalive = None
+        if self._auto_info:
+            # Switch AI on and read it back, radios without AI answer '?;' or nothing
+            self._ser.write(f"{self._auto_info};AI;".encode("ascii"))
+            ai_deadline = time.monotonic() + AI_TIMEOUT
+        while not self._stop.is_set():
+            now = time.monotonic()
+            if ai_deadline is not None and now >= ai_deadline:
+                ai_deadline = None  # No confirmation, keep polling
+                self.auto_info_active = False
+            if self.auto_info_active and ai_deadline is None and now >= next_keepalive:
+                self._ser.write(poll + b"AI;")
+                ai_deadline = now + AI_TIMEOUT
+                next_keepalive = now + AI_KEEPALIVE
+            if not self.auto_info_active and ai_deadline is None and now >= next_poll:
+                self._ser.write(poll)
+                next_poll = now + self._poll_interval
+            data = self._ser.read(self._ser.in_waiting or 1)
+            if not data:
+                continue
+            for frame in parser.feed(data):
+                if ai_deadline is not None and frame.startswith("AI"):
+                    self.auto_info_active = frame[2:] not in ("", "0")
+                    ai_deadline = None
+                    next_keepalive = time.monotonic() + AI_KEEPALIVE
+                elif ai_deadline is not None and frame == "?":
+                    ai_deadline = None  # Command not supported
+                    self.auto_info_active = False
+                else:
+                    self._parse_frame(frame)
+
+    def _parse_frame(self, frame):
+        freq = band = mode = None
+        if frame.startswith(self._freq_cmd):
+            value = frame[len(self._freq_cmd):]
+            if value.isdigit():
+                freq = str(round(int(value) / 1000000, 3))  # Convert Hz to MHz
+                band = band_for_freq(int(value)) or ""  # Out of band: clear the band, don't keep the last one
+        elif frame.startswith(self._mode_cmd):
+            value = frame[len(self._mode_cmd):]
+            if value.isdigit() and int(value) < len(modes):
+                mode = modes[int(value)]
+        self._publish(freq, band, mode)
+
+
+class RigctldCat(CatDriver):
+    """
+    Network driver for Hamlib's rigctld, so several programs can share one radio.
+    Keeps one TCP connection open and pipelines the frequency and mode queries in a
+    single write using the extended response protocol ('+f', '+m'), where every
+    answer is a block of 'Key: value' lines closed by an 'RPRT n' line.
+    """
+
+    name = "rigctld"
+
+    def __init__(self, config: configparser.ConfigParser):
+        self._sock = None
+        super().__init__(config)
+
+    def _load_config(self, config):
+        super()._load_config(config)
+        self._host = config['CAT'].get('rigctld_host', fallback='localhost')
+        self._port = int(config['CAT'].get('rigctld_port', fallback=str(RIGCTLD_PORT)))
+
+    def describe(self):
+        return f"rigctld at {self._host}:{self._port}"
+
+    def is_open(self):
+        return self._sock is not None
+
+    def _open(self):
+        self._sock = socket.create_connection((self._host, self._port), timeout=CONNECT_TIMEOUT)
+        self._sock.settimeout(READ_TIMEOUT)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return True
+
+    def _close(self):
+        try:
+            self._sock.sendall(b"q\n")  # Polite goodbye, rigctld closes its side
+        except OSError:
+            pass
+        self._sock.close()
+        self._sock = None
+
+    def _reader_loop(self):
+        buffer = b""
+        outstanding = 0  # Queries sent but not yet closed by their RPRT line
+        sent_at = next_poll = 0
+        while not self._stop.is_set():
+            now = time.monotonic()
+            if outstanding and now - sent_at > REPLY_TIMEOUT:
+                outstanding = 0  # Reply lost, poll again
+            if not outstanding and now >= next_poll:
+                self._sock.sendall(b"+f\n+m\n")
+                outstanding = 2
+                sent_at = now
+                next_poll = now + self._poll_interval
+            try:
+                data = self._sock.recv(4096)
+            except socket.timeout:
+                continue
+            if not data:
+                raise ConnectionError("rigctld closed the connection")
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                outstanding -= self._parse_line(line.decode("ascii", errors="ignore").strip())
+            outstanding = max(outstanding, 0)
+
+    def _parse_line(self, line):
+        # Returns 1 when the line ends an answer block
+        if line.startswith("RPRT"):
+            return 1
+        key, _, value = line.partition(":")
+        value = value.strip()
+        if key == "Frequency":
+            try:
+                hz = int(float(value))
+            except ValueError:
+                return 0
+            self._publish(freq=str(round(hz / 1000000, 3)), band=band_for_freq(hz) or "")
+        elif key == "Mode":
+            self._publish(mode=HAMLIB_MODES.get(value.upper()))
+        return 0
+
+
+DRIVERS = {driver.name: driver for driver in (Cat, RigctldCat)}
+
 
+def open_cat(config: configparser.ConfigParser):
+    """
+    Create the CAT driver selected by the [CAT] driver key (serial by default).
+    """
+    name = config['CAT'].get('driver', fallback='serial').strip().lower()
+    if name not in DRIVERS:
+        raise ValueError(f"Unknown CAT driver '{name}', expected one of: {', '.join(DRIVERS)}")
+    return DRIVERS[name](config)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# CatBenchmark.py
+# Measures Cat against a VirtualRadio: how quickly a dial change reaches the snapshot,
+# how fast the frame parser runs, and how well the reader copes with a lossy line.
+# Run it before and after changing Cat to catch latency regressions.
+import argparse
+import configparser
+import random
+import statistics
+import time
+from Cat import Cat, CatFrameParser
+from VirtualRadio import radio_from_args, add_radio_arguments
+
+
+def connect(radio, args):
+    config = configparser.ConfigParser()
+    config.read(args.config)
+    if 'CAT' not in config:
+        config['CAT'] = {}
+    config['CAT']['com_port'] = radio.port
+    config['CAT']['auto_info'] = args.auto_info
+    config['CAT']['poll_ms'] = str(args.poll_ms)
+    cat = Cat(config)
+    if not cat.connect():
+        raise SystemExit(f"Could not open {radio.port}")
+    time.sleep(1.5)  # Initial query and auto-information handshake
+    return cat
+
+
+def update_latency(cat, radio, rounds, spread, timeout=2.0):
+    # Retune the radio at a random point of the poll cycle and time until the snapshot shows it
+    rng = random.Random(rounds)
+    latencies = []
+    missed = 0
+    for i in range(rounds):
+        time.sleep(rng.uniform(0, spread))
+        freq = 7000000 + (i % 300) * 1000 + 1000
+        expected = str(round(freq / 1000000, 3))
+        started = time.perf_counter()
+        radio.tune(freq=freq)
+        while cat.get_freq_band_mode()[0] != expected:
+            if time.perf_counter() - started > timeout:
+                missed += 1
+                break
+            time.sleep(0.0005)
+        else:
+            latencies.append(time.perf_counter() - started)
+    return latencies, missed
+
+
+def parse_throughput(frames=200000, seed=1):
+    # Feed the parser the way a busy port would: random chunk sizes, several replies per read
+    rng = random.Random(seed)
+    stream = b"".join(rng.choice((b"FA%011d;" % rng.randint(1800000, 54000000), b"MD3;")) for _ in range(frames))
+    chunks = []
+    pos = 0
+    while pos < len(stream):
+        size = rng.randint(1, 64)
+        chunks.append(stream[pos:pos + size])
+        pos += size
+    parser = CatFrameParser()
+    started = time.perf_counter()
+    decoded = sum(len(parser.feed(chunk)) for chunk in chunks)
+    elapsed = time.perf_counter() - started
+    return decoded, elapsed
+
+
+def report(name, latencies, missed):
+    if not latencies:
+        print(f"{name}: no updates seen, {missed} missed")
+        return
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+    print(f"{name}: median {statistics.median(latencies) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms, "
+          f"max {latencies[-1] * 1000:.1f} ms, {missed} missed of {len(latencies) + missed}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CAT latency and parser benchmark against a virtual radio")
+    add_radio_arguments(parser)
+    parser.add_argument("--rounds", type=int, default=200, help="dial changes per latency run")
+    parser.add_argument("--auto-info", default="off", help="Cat auto_info setting, e.g. AI2")
+    parser.add_argument("--poll-ms", type=int, default=100, help="Cat poll interval")
+    args = parser.parse_args()
+
+    decoded, elapsed = parse_throughput()
+    print(f"Parser: {decoded} frames in {elapsed * 1000:.0f} ms, {decoded / elapsed:,.0f} frames/s")
+
+    radio = radio_from_args(args)
+    cat = connect(radio, args)
+    try:
+        mode = "auto-information" if cat.auto_info_active else f"polling every {args.poll_ms} ms"
+        spread = args.poll_ms / 1000
+        report(f"Update latency ({mode})", *update_latency(cat, radio, args.rounds, spread))
+        # Recovery: the same run over a line that loses and corrupts replies
+        radio.drop, radio.garbage, radio.fragment = max(radio.drop, 0.2), max(radio.garbage, 0.2), max(radio.fragment, 0.5)
+        report("Update latency, lossy line", *update_latency(cat, radio, args.rounds, spread))
+        print(f"Radio answered {radio.queries} queries")
+    finally:
+        cat.disconnect()
+        radio.close()
+
+
+if __name__ == "__main__":
+    main()
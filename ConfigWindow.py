@@ -1,8 +1,10 @@
 # ConfigWindow.py
 from tkinter import *
 from tkinter import messagebox
+from tkinter import ttk
 import configparser
 import Crypto
+from Cat import DRIVERS
 
 
 class ConfigWindow:
@@ -25,6 +27,7 @@ class ConfigWindow:
         self.config['MY_DETAILS']['state'] = self.stateEntry.get().strip().upper()
         self.config['MY_DETAILS']['zip'] = self.zipEntry.get().strip()
         self.config['MY_DETAILS']['my_grid'] = self.myGridEntry.get().strip()
+        self.config['MY_DETAILS']['iaru_region'] = self.regionEntry.get().strip() or "2"
         self.config['LOTW']['username'] = self.lotwUsernameEntry.get().strip()
         self.config['LOTW']['password'] = Crypto.encrypt_text(self.lotwPasswordEntry.get().strip())
         self.config['LOTW']['location'] = self.locationEntry.get().strip()
@@ -32,8 +35,11 @@ class ConfigWindow:
         self.config['CAT']['com_port'] = self.comPortEntry.get().strip()
         self.config['CAT']['baudrate'] = self.baudrateEntry.get().strip()
         self.config['CAT']['freq_cmd'] = self.freqCmdEntry.get().strip()
-        self.config['CAT']['band_cmd'] = self.bandCmdEntry.get().strip()
         self.config['CAT']['mode_cmd'] = self.modeCmdEntry.get().strip()
+        self.config['CAT']['auto_info'] = self.autoInfoEntry.get().strip().upper() or "off"
+        self.config['CAT']['driver'] = self.driverVar.get()
+        self.config['CAT']['rigctld_host'] = self.rigctldHostEntry.get().strip()
+        self.config['CAT']['rigctld_port'] = self.rigctldPortEntry.get().strip()
         self.config['CAT']['auto_con'] = str(self.autoConCatVar.get())
         self.config['QRZ']['username'] = self.qrzUsernameEntry.get().strip()
         self.config['QRZ']['password'] = Crypto.encrypt_text(self.qrzPasswordEntry.get().strip())
@@ -90,6 +96,12 @@ class ConfigWindow:
         self.myGridEntry.grid(row=6, column=1, padx=5, pady=2, sticky=W)
         self.myGridEntry.insert(0, self.config.get('MY_DETAILS', 'my_grid', fallback=""))
 
+        self.regionLabel = Label(self.detailsFrame, text="IARU Region:")
+        self.regionLabel.grid(row=7, column=0, sticky=W)
+        self.regionEntry = Entry(self.detailsFrame, width=4)
+        self.regionEntry.grid(row=7, column=1, padx=5, pady=2, sticky=W)
+        self.regionEntry.insert(0, self.config.get('MY_DETAILS', 'iaru_region', fallback="2"))
+
         self.lotwFrame = LabelFrame(self.top, text="LoTW Settings", padx=5, pady=5)
         self.lotwFrame.grid(row=0, column=2, padx=5, pady=5)  # Set the frame position
 
@@ -144,18 +156,38 @@ class ConfigWindow:
         self.freqCmdEntry.grid(row=2, column=1, padx=5, pady=2)
         self.freqCmdEntry.insert(0, self.config.get('CAT', 'freq_cmd', fallback=""))
 
-        self.bandCmdLabel = Label(self.catFrame, text="Band Cmd:")
-        self.bandCmdLabel.grid(row=3, column=0, sticky=W)
-        self.bandCmdEntry = Entry(self.catFrame, width=16)
-        self.bandCmdEntry.grid(row=3, column=1, padx=5, pady=2)
-        self.bandCmdEntry.insert(0, self.config.get('CAT', 'band_cmd', fallback=""))
-
         self.modeCmdLabel = Label(self.catFrame, text="Mode Cmd:")
-        self.modeCmdLabel.grid(row=4, column=0, sticky=W)
+        self.modeCmdLabel.grid(row=3, column=0, sticky=W)
         self.modeCmdEntry = Entry(self.catFrame, width=16)
-        self.modeCmdEntry.grid(row=4, column=1, padx=5, pady=2)
+        self.modeCmdEntry.grid(row=3, column=1, padx=5, pady=2)
         self.modeCmdEntry.insert(0, self.config.get('CAT', 'mode_cmd', fallback=""))
 
+        self.autoInfoLabel = Label(self.catFrame, text="Auto Info Cmd:")
+        self.autoInfoLabel.grid(row=4, column=0, sticky=W)
+        self.autoInfoEntry = Entry(self.catFrame, width=16)
+        self.autoInfoEntry.grid(row=4, column=1, padx=5, pady=2)
+        self.autoInfoEntry.insert(0, self.config.get('CAT', 'auto_info', fallback="off"))
+
+        self.driverLabel = Label(self.catFrame, text="Driver:")
+        self.driverLabel.grid(row=5, column=0, sticky=W)
+        driver = self.config.get('CAT', 'driver', fallback="serial").strip().lower()
+        self.driverVar = StringVar(value=driver if driver in DRIVERS else "serial")
+        # Readonly, so only a driver that exists can be picked
+        self.driverMenu = ttk.Combobox(self.catFrame, textvariable=self.driverVar, values=list(DRIVERS), state="readonly", width=14)
+        self.driverMenu.grid(row=5, column=1, padx=5, pady=2)
+
+        self.rigctldHostLabel = Label(self.catFrame, text="Rigctld Host:")
+        self.rigctldHostLabel.grid(row=6, column=0, sticky=W)
+        self.rigctldHostEntry = Entry(self.catFrame, width=16)
+        self.rigctldHostEntry.grid(row=6, column=1, padx=5, pady=2)
+        self.rigctldHostEntry.insert(0, self.config.get('CAT', 'rigctld_host', fallback="localhost"))
+
+        self.rigctldPortLabel = Label(self.catFrame, text="Rigctld Port:")
+        self.rigctldPortLabel.grid(row=7, column=0, sticky=W)
+        self.rigctldPortEntry = Entry(self.catFrame, width=16)
+        self.rigctldPortEntry.grid(row=7, column=1, padx=5, pady=2)
+        self.rigctldPortEntry.insert(0, self.config.get('CAT', 'rigctld_port', fallback="4532"))
+
         auto_con_cat = self.config.getboolean('CAT', 'auto_con', fallback=False)
         self.autoConCatVar = BooleanVar(value=auto_con_cat)
         self.autoConCatCheck = Checkbutton(
@@ -165,7 +197,7 @@ class ConfigWindow:
             onvalue=True,
             offvalue=False
         )
-        self.autoConCatCheck.grid(row=5, column=0, columnspan=2, sticky="w", pady=(5, 0))
+        self.autoConCatCheck.grid(row=8, column=0, columnspan=2, sticky="w", pady=(5, 0))
 
         self.qrzFrame = LabelFrame(self.top, text="QRZ.com Settings", padx=5, pady=5)
         self.qrzFrame.grid(row=0, column=1, padx=5, pady=5)  # Set the frame position
@@ -0,0 +1,75 @@
+# DupeIndex.py
+# In-memory hash index of logged QSOs for O(1) duplicate checks.
+# A QSO is a dupe when the same call was worked on the same band and mode
+# within DUPE_WINDOW seconds of an existing QSO.
+
+DUPE_WINDOW = 15 * 60  # seconds
+
+
+class DupeIndex:
+
+    def __init__(self, window=DUPE_WINDOW):
+        self.window = window
+        self._buckets = {}  # (call, band, mode, ts // window) -> {rowid: ts}
+        self._keys = {}     # rowid -> bucket key, so updates and deletes can find it
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _key(self, call, band, mode, slot):
+        return ((call or "").upper(), (band or "").upper(), (mode or "").upper(), slot)
+
+    def add(self, rowid, call, band, mode, ts):
+        if ts is None or not call:
+            return  # Nothing to match on
+        self.remove(rowid)
+        key = self._key(call, band, mode, ts // self.window)
+        self._buckets.setdefault(key, {})[rowid] = ts
+        self._keys[rowid] = key
+
+    def remove(self, rowid):
+        key = self._keys.pop(rowid, None)
+        if key is None:
+            return
+        bucket = self._buckets[key]
+        del bucket[rowid]
+        if not bucket:
+            del self._buckets[key]
+
+    def find(self, call, band, mode, ts, exclude=None):
+        """
+        Return the rowid of a QSO that duplicates this one, or None.
+        exclude: rowid to ignore, e.g. the QSO being edited.
+        Only the window slot of ts and its two neighbours are inspected.
+        """
+        if ts is None or not call:
+            return None
+        slot = ts // self.window
+        for neighbour in (slot, slot - 1, slot + 1):
+            bucket = self._buckets.get(self._key(call, band, mode, neighbour))
+            if not bucket:
+                continue
+            for rowid, other in bucket.items():
+                if rowid != exclude and abs(other - ts) <= self.window:
+                    return rowid
+        return None
+
+    def closest(self, call, band, mode, ts):
+        """
+        Return the rowid of the QSO nearest in time within the window, or None.
+        Used for confirmation matching, where several QSOs may fall in one window.
+        """
+        if ts is None or not call:
+            return None
+        slot = ts // self.window
+        best = None
+        best_diff = self.window + 1
+        for neighbour in (slot, slot - 1, slot + 1):
+            bucket = self._buckets.get(self._key(call, band, mode, neighbour))
+            if not bucket:
+                continue
+            for rowid, other in bucket.items():
+                diff = abs(other - ts)
+                if diff < best_diff:
+                    best, best_diff = rowid, diff
+        return best
@@ -0,0 +1,87 @@
+# ExportWindow.py
+from tkinter import *
+from tkinter import ttk
+from tkinter import messagebox
+
+from LogDatabase import to_ts_utc
+
+
+class ExportWindow:
+
+    def __init__(self, parent, bands, modes):
+        self.parent = parent
+        self.bands = [""] + list(bands)
+        self.modes = [""] + list(modes)
+        self.filters = None  # Stays None if the dialog is cancelled
+        self.top = Toplevel(parent)
+        self.top.title("Export ADIF")
+        self.top.transient(parent) # stay on top of parent
+        self.top.grab_set()        # modal
+        self._build_ui()
+
+    def export(self):
+        date_from = self.dateFromEntry.get().strip() or None
+        date_to = self.dateToEntry.get().strip() or None
+        # A date the filter can't parse would silently match no QSOs at all
+        for label, date in (("From Date", date_from), ("To Date", date_to)):
+            if date and to_ts_utc(date, "0000") is None:
+                messagebox.showwarning("Export ADIF", f"{label} '{date}' is not a valid date, use YYYY-MM-DD.", parent=self.top)
+                return
+        if date_from and date_to and to_ts_utc(date_from, "0000") > to_ts_utc(date_to, "0000"):
+            messagebox.showwarning("Export ADIF", "From Date is after To Date.", parent=self.top)
+            return
+        self.filters = {
+            "date_from": date_from,
+            "date_to": date_to,
+            "band": self.bandVar.get().strip() or None,
+            "mode": self.modeVar.get().strip() or None,
+            "call": self.callEntry.get().strip().upper() or None,
+            "since_last_export": self.sinceLastVar.get(),
+        }
+        self.top.destroy()
+
+    def _build_ui(self):
+        self.filterFrame = LabelFrame(self.top, text="Export Filters (leave blank for all)", padx=5, pady=5)
+        self.filterFrame.grid(row=0, column=0, columnspan=2, padx=5, pady=5)
+
+        self.dateFromLabel = Label(self.filterFrame, text="From Date:")
+        self.dateFromLabel.grid(row=0, column=0, sticky=W)
+        self.dateFromEntry = Entry(self.filterFrame, width=12)
+        self.dateFromEntry.grid(row=0, column=1, padx=5, pady=2, sticky=W)
+
+        self.dateToLabel = Label(self.filterFrame, text="To Date:")
+        self.dateToLabel.grid(row=1, column=0, sticky=W)
+        self.dateToEntry = Entry(self.filterFrame, width=12)
+        self.dateToEntry.grid(row=1, column=1, padx=5, pady=2, sticky=W)
+
+        self.bandLabel = Label(self.filterFrame, text="Band:")
+        self.bandLabel.grid(row=2, column=0, sticky=W)
+        self.bandVar = StringVar(self.top)
+        self.bandMenu = ttk.Combobox(self.filterFrame, textvariable=self.bandVar, values=self.bands, state="readonly", width=10)
+        self.bandMenu.grid(row=2, column=1, padx=5, pady=2, sticky=W)
+
+        self.modeLabel = Label(self.filterFrame, text="Mode:")
+        self.modeLabel.grid(row=3, column=0, sticky=W)
+        self.modeVar = StringVar(self.top)
+        self.modeMenu = ttk.Combobox(self.filterFrame, textvariable=self.modeVar, values=self.modes, state="readonly", width=10)
+        self.modeMenu.grid(row=3, column=1, padx=5, pady=2, sticky=W)
+
+        self.callLabel = Label(self.filterFrame, text="Callsign:")
+        self.callLabel.grid(row=4, column=0, sticky=W)
+        self.callEntry = Entry(self.filterFrame, width=12)
+        self.callEntry.grid(row=4, column=1, padx=5, pady=2, sticky=W)
+
+        self.sinceLastVar = BooleanVar(value=False)
+        self.sinceLastCheck = Checkbutton(
+            self.filterFrame,
+            text="Only QSOs added or changed since last export",
+            variable=self.sinceLastVar,
+            onvalue=True,
+            offvalue=False
+        )
+        self.sinceLastCheck.grid(row=5, column=0, columnspan=2, sticky="w", pady=(5, 0))
+
+        self.exportButton = Button(self.top, text="Export", command=self.export)
+        self.exportButton.grid(row=1, column=0, pady=10)
+        self.cancelButton = Button(self.top, text="Cancel", command=self.top.destroy)
+        self.cancelButton.grid(row=1, column=1, pady=10)
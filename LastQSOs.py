@@ -1,4 +1,5 @@
 import sqlite3
+from bisect import bisect_left
 import tkinter as tk
 import tkinter.font as tkfont
 from tkinter import ttk
@@ -7,13 +8,24 @@ from tkinter import ttk
 class LastQSOs(ttk.Frame):
 
     COLUMNS = ("rowid", "Call", "Name", "Date", "Time", "Band", "Freq", "Mode", "Report", "Grid", "State", "Country")
+    LIMITS = ("5", "10", "25", "50", "100", "250", "500", "1000", "2500", "5000", "All")
+    PAGE_SIZE = 100  # Rows fetched at a time as the list is scrolled
+    WINDOW_ROWS = 300  # Rows kept in the Treeview, the viewport plus a margin on both sides
+    EDGE = 0.1       # Load the next page when the viewport is this close to an end of the window
+    MAX_DIFF = 100   # More changes than this since the last refresh and the view is rebuilt
 
     def __init__(self, master, conn, on_pick=None):
         super().__init__(master, padding=8)
         self.conn = conn
         self.on_pick = on_pick
         self.font = tkfont.nametofont("TkDefaultFont")
-        self.limit_var = tk.IntVar(value=10)
+        self.limit_var = tk.StringVar(value="10")
+        self._call = None          # Callsign being looked up, None for the most recent QSOs
+        self._order = []           # Sort key of every row in the Treeview, in display order
+        self._offset = 0           # Position of the first Treeview row in the whole list
+        self._total = 0            # Rows in the whole list, capped at the "Show last" limit
+        self._load_pending = set()  # Directions ("above", "below") queued with after_idle
+        self._seq = None           # Last logbook_changes seq reflected in the view
         self._build_ui()
         self.refresh()
         #self._schedule_autorefresh()
@@ -28,11 +40,11 @@ class LastQSOs(ttk.Frame):
         ttk.Label(controls, text="Show last:").pack(side="left")
         self.combo = ttk.Combobox(
             controls, width=5, state="readonly",
-            values=(5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+            values=self.LIMITS,
             textvariable=self.limit_var
         )
         self.combo.pack(side="left", padx=(6, 12))
-        self.combo.bind("<<ComboboxSelected>>", lambda e: self.refresh())
+        self.combo.bind("<<ComboboxSelected>>", lambda e: self.reload())
 
         self.refresh_btn = ttk.Button(controls, text="Refresh", command=self.refresh)
         self.refresh_btn.pack(side="left")
@@ -44,8 +56,9 @@ class LastQSOs(ttk.Frame):
             show="headings",
             height=12
         )
-        vsb = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=vsb.set)
+        # Only a window of the list is in the Treeview, the scrollbar shows the whole list
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.tree.configure(yscrollcommand=self._on_scroll)
 
         # Column headings and widths , Name, Date, Time, FreqBand, Mode, Report, Grid, State, Country
         headings = {
@@ -81,29 +94,105 @@ class LastQSOs(ttk.Frame):
             self.tree.column(col, width=widths[col], anchor="center")
 
         self.tree.pack(side="left", fill="both", expand=True)
-        vsb.pack(side="right", fill="y")
+        self.vsb.pack(side="right", fill="y")
         self.tree.bind("<<TreeviewSelect>>", self._on_select)
 
-    def fetch_last_qsos(self, limit=10):
-        # If datetime_utc is ISO-8601 text, simple ORDER BY works correctly.
-        sql = """
-            SELECT rowid, Call, Name, Date, Time, Band, Freq, Mode, Report, Grid, State, Country
+    def _limit(self):
+        value = self.limit_var.get()
+        return None if value == "All" else int(value)
+
+    def fetch_page(self, call=None, after=None, limit=PAGE_SIZE):
+        """
+        Fetch up to limit QSOs, newest first, that come after the (ts_utc, rowid) key.
+        Keyset paging walks the (ts_utc) or (Call, ts_utc) index from where the
+        previous page stopped, so every page costs the same however deep it is.
+        QSOs without a usable timestamp sort last, by rowid.
+        Rows are the display columns followed by ts_utc.
+        """
+        select = """
+            SELECT rowid, Call, Name, Date, Time, Band, Freq, Mode, Report, Grid, State, Country, ts_utc
             FROM logbook
-            ORDER BY Date DESC, Time DESC
-            LIMIT ?
         """
-        return self.conn.execute(sql, (limit,)).fetchall()
+        where = ["Call=?"] if call else []
+        params = [call] if call else []
+        rows = []
+        if after is None or after[0] is not None:
+            keyset = ["(ts_utc, rowid) < (?, ?)"] if after else ["ts_utc IS NOT NULL"]
+            sql = select + " WHERE " + " AND ".join(where + keyset) + " ORDER BY ts_utc DESC, rowid DESC LIMIT ?"
+            rows = self.conn.execute(sql, params + list(after or ()) + [limit]).fetchall()
+            if len(rows) == limit:
+                return rows
+            after = (None, None)  # Timestamped QSOs are done, start on the rest
+        keyset = ["ts_utc IS NULL"] + (["rowid < ?"] if after[1] is not None else [])
+        sql = select + " WHERE " + " AND ".join(where + keyset) + " ORDER BY rowid DESC LIMIT ?"
+        rowid = [after[1]] if after[1] is not None else []
+        return rows + self.conn.execute(sql, params + rowid + [limit - len(rows)]).fetchall()
 
-    def fetch_qsos_by_call(self, call, limit=10):
-        # If datetime_utc is ISO-8601 text, simple ORDER BY works correctly.
-        sql = """
-            SELECT rowid, Call, Name, Date, Time, Band, Freq, Mode, Report, Grid, State, Country
+    def fetch_page_before(self, call=None, before=None, limit=PAGE_SIZE):
+        """
+        Fetch up to limit QSOs that come just before the (ts_utc, rowid) key in display
+        order, i.e. the newer neighbours, returned in display order (newest first).
+        """
+        select = """
+            SELECT rowid, Call, Name, Date, Time, Band, Freq, Mode, Report, Grid, State, Country, ts_utc
             FROM logbook
-            WHERE Call=?
-            ORDER BY Date DESC, Time DESC
-            LIMIT ?
         """
-        return self.conn.execute(sql, (call,limit,)).fetchall()
+        where = ["Call=?"] if call else []
+        params = [call] if call else []
+        rows = []
+        if before[0] is None:
+            # Untimed QSOs come last, the ones before this key have larger rowids
+            sql = select + " WHERE " + " AND ".join(where + ["ts_utc IS NULL", "rowid > ?"]) + " ORDER BY rowid ASC LIMIT ?"
+            rows = self.conn.execute(sql, params + [before[1], limit]).fetchall()
+            if len(rows) == limit:
+                return rows[::-1]
+            keyset, key = ["ts_utc IS NOT NULL"], []
+        else:
+            keyset, key = ["(ts_utc, rowid) > (?, ?)"], list(before)
+        sql = select + " WHERE " + " AND ".join(where + keyset) + " ORDER BY ts_utc ASC, rowid ASC LIMIT ?"
+        rows += self.conn.execute(sql, params + key + [limit - len(rows)]).fetchall()
+        return rows[::-1]
+
+    def fetch_at(self, call=None, offset=0, limit=PAGE_SIZE):
+        """
+        Fetch up to limit QSOs starting at a position of the list, for jumps of the
+        scrollbar. OFFSET walks the index once, paging from there on is keyset again.
+        """
+        select = """
+            SELECT rowid, Call, Name, Date, Time, Band, Freq, Mode, Report, Grid, State, Country, ts_utc
+            FROM logbook
+        """
+        where = ["Call=?"] if call else []
+        params = [call] if call else []
+        timed = self.conn.execute("SELECT COUNT(*) FROM logbook WHERE " + " AND ".join(where + ["ts_utc IS NOT NULL"]), params).fetchone()[0]
+        rows = []
+        if offset < timed:
+            sql = select + " WHERE " + " AND ".join(where + ["ts_utc IS NOT NULL"]) + " ORDER BY ts_utc DESC, rowid DESC LIMIT ? OFFSET ?"
+            rows = self.conn.execute(sql, params + [limit, offset]).fetchall()
+            offset = timed
+        if len(rows) < limit:
+            sql = select + " WHERE " + " AND ".join(where + ["ts_utc IS NULL"]) + " ORDER BY rowid DESC LIMIT ? OFFSET ?"
+            rows += self.conn.execute(sql, params + [limit - len(rows), offset - timed]).fetchall()
+        return rows
+
+    def count_rows(self, call=None, before=None):
+        # Number of QSOs in the list, or only those ahead of the (ts_utc, rowid) key
+        where = ["Call=?"] if call else []
+        params = [call] if call else []
+        if before is None:
+            return self.conn.execute("SELECT COUNT(*) FROM logbook" + (" WHERE " + where[0] if where else ""), params).fetchone()[0]
+        if before[0] is None:
+            where_timed = where + ["ts_utc IS NOT NULL"]
+            where_untimed = where + ["ts_utc IS NULL", "rowid > ?"]
+            return (self.conn.execute("SELECT COUNT(*) FROM logbook WHERE " + " AND ".join(where_timed), params).fetchone()[0]
+                    + self.conn.execute("SELECT COUNT(*) FROM logbook WHERE " + " AND ".join(where_untimed), params + [before[1]]).fetchone()[0])
+        return self.conn.execute("SELECT COUNT(*) FROM logbook WHERE " + " AND ".join(where + ["(ts_utc, rowid) > (?, ?)"]), params + list(before)).fetchone()[0]
+
+    def fetch_last_qsos(self, limit=10):
+        return [row[:-1] for row in self.fetch_page(limit=limit)]
+
+    def fetch_qsos_by_call(self, call, limit=10):
+        return [row[:-1] for row in self.fetch_page(call=call, limit=limit)]
 
     def _on_select(self, event=None):
         # Call the callback with the rowid of what we just selected
@@ -114,35 +203,217 @@ class LastQSOs(ttk.Frame):
         if self.on_pick:
             self.on_pick(qso_id)
 
-    def refresh(self):
-        # Clear then repopulate with newest first
-        for iid in self.tree.get_children():
-            self.tree.delete(iid)
+    @staticmethod
+    def _sort_key(ts, rowid):
+        # Ascending order of this key is the display order: newest first, untimed last
+        return (ts is None, -(ts or 0), -rowid)
+
+    @staticmethod
+    def _page_key(sort_key):
+        # Back from a sort key to the (ts_utc, rowid) key fetch_page continues after
+        untimed, ts, rowid = sort_key
+        return (None if untimed else -ts, -rowid)
+
+    def _reset(self, call):
+        self.tree.delete(*self.tree.get_children())
+        self._call = call
+        self._order = []
+        self._offset = 0
+        try:
+            self._seq = self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM logbook_changes").fetchone()[0]
+        except sqlite3.Error:
+            self._seq = None
+        self._count()
+
+    def _count(self):
+        # Size of the whole list, for the scrollbar and the end of paging
+        limit = self._limit()
+        try:
+            count = self.count_rows(self._call)
+        except sqlite3.Error:
+            count = len(self._order)
+        self._total = count if limit is None else min(count, limit)
+
+    def _top_row(self):
+        # Index of the first visible Treeview row
+        return round(self.tree.yview()[0] * len(self._order)) if self._order else 0
+
+    def _show(self, top):
+        # Put Treeview row top at the top of the viewport
+        if self._order:
+            self.tree.yview_moveto(top / len(self._order))
 
+    def _evict(self, keep_top):
+        # Drop rows beyond WINDOW_ROWS from the side away from the viewport
+        excess = len(self._order) - self.WINDOW_ROWS
+        if excess <= 0:
+            return
+        top = self._top_row()
+        children = self.tree.get_children()
+        if keep_top:
+            self.tree.delete(*children[-excess:])
+            del self._order[-excess:]
+        else:
+            self.tree.delete(*children[:excess])
+            del self._order[:excess]
+            self._offset += excess
+            self._show(top - excess)
+
+    def _load_more(self):
+        # Append the next page below the window
+        self._load_pending.discard("below")
+        want = min(self.PAGE_SIZE, self._total - self._offset - len(self._order))
+        if want <= 0:
+            return
+        last = self._page_key(self._order[-1]) if self._order else None
         try:
-            rows = self.fetch_last_qsos(self.limit_var.get())
+            rows = self.fetch_page(self._call, last, want)
         except sqlite3.Error as e:
             # Show a simple error row if DB is unavailable
             #self.tree.insert("", "end", values=("DB error:", str(e), "", "", "", ""))
+            rows = []
+        for row in rows:
+            self.tree.insert("", "end", iid=str(row[0]), values=row[:-1])
+            self._order.append(self._sort_key(row[-1], row[0]))
+        if len(rows) < want:
+            self._count()  # Rows were deleted under us
+        self._evict(keep_top=False)
+
+    def _load_above(self):
+        # Prepend the page above the window
+        self._load_pending.discard("above")
+        want = min(self.PAGE_SIZE, self._offset)
+        if want <= 0 or not self._order:
             return
+        top = self._top_row()
+        try:
+            rows = self.fetch_page_before(self._call, self._page_key(self._order[0]), want)
+        except sqlite3.Error:
+            rows = []
+        for pos, row in enumerate(rows):
+            self.tree.insert("", pos, iid=str(row[0]), values=row[:-1])
+        self._order[:0] = [self._sort_key(row[-1], row[0]) for row in rows]
+        # Fewer rows than expected means the window now starts at the newest QSO
+        self._offset = self._offset - len(rows) if len(rows) == want else 0
+        self._show(top + len(rows))
+        self._evict(keep_top=True)
 
+    def _jump(self, target):
+        # Replace the window with the rows around position target of the list
+        start = max(0, min(target - self.PAGE_SIZE, self._total - self.WINDOW_ROWS))
+        try:
+            rows = self.fetch_at(self._call, start, min(self.WINDOW_ROWS, self._total - start))
+        except sqlite3.Error:
+            return
+        self.tree.delete(*self.tree.get_children())
         for row in rows:
-            self.tree.insert("", "end", values=row)
+            self.tree.insert("", "end", iid=str(row[0]), values=row[:-1])
+        self._order = [self._sort_key(row[-1], row[0]) for row in rows]
+        self._offset = start
+        self._show(target - start)
 
-    def lookup(self, call):
-        # Clear then repopulate with newest first
-        for iid in self.tree.get_children():
-            self.tree.delete(iid)
+    def _on_scroll(self, first, last):
+        # The Treeview moved: show where its window is in the whole list and
+        # fetch the neighbouring page once the viewport gets close to an end
+        first, last = float(first), float(last)
+        loaded = len(self._order)
+        if self._total and loaded:
+            self.vsb.set((self._offset + first * loaded) / self._total, (self._offset + last * loaded) / self._total)
+        else:
+            self.vsb.set(0, 1)
+        if last > 1 - self.EDGE and self._offset + loaded < self._total and "below" not in self._load_pending:
+            self._load_pending.add("below")
+            self.after_idle(self._load_more)
+        if first < self.EDGE and self._offset > 0 and "above" not in self._load_pending:
+            self._load_pending.add("above")
+            self.after_idle(self._load_above)
 
-        try:
-            rows = self.fetch_qsos_by_call(call, self.limit_var.get())
-        except sqlite3.Error as e:
-            # Show a simple error row if DB is unavailable
-            #self.tree.insert("", "end", values=("DB error:", str(e), "", "", "", ""))
+    def _on_scrollbar(self, *args):
+        # Arrows and paging scroll the Treeview, dragging can go anywhere in the list
+        if args[0] != "moveto" or not self._order:
+            self.tree.yview(*args)
             return
+        first, last = self.tree.yview()
+        visible = max(1, round((last - first) * len(self._order)))
+        target = max(0, min(int(float(args[1]) * self._total), self._total - visible))
+        if self._offset <= target and target + visible <= self._offset + len(self._order):
+            self._show(target - self._offset)
+        else:
+            self._jump(target)
+
+    def _remove_row(self, rowid):
+        iid = str(rowid)
+        if self.tree.exists(iid):
+            self._order.pop(self.tree.index(iid))
+            self.tree.delete(iid)
 
+    def _apply_changes(self):
+        """
+        Bring the most-recent view up to date from the change journal.
+        Only rows that changed are touched. Returns False when a full reload is needed.
+        """
+        if self._call is not None or self._seq is None:
+            return False
+        changes = self.conn.execute(
+            "SELECT seq, qso_id FROM logbook_changes WHERE seq > ? ORDER BY seq LIMIT ?",
+            (self._seq, self.MAX_DIFF + 1)).fetchall()
+        if not changes:
+            return True
+        if len(changes) > self.MAX_DIFF or changes[0][0] != self._seq + 1:
+            return False  # Too many changes, or the journal was pruned past us
+        changed = sorted({qso_id for _, qso_id in changes})
+        rows = self.conn.execute(
+            f"""SELECT rowid, Call, Name, Date, Time, Band, Freq, Mode, Report, Grid, State, Country, ts_utc
+                FROM logbook WHERE rowid IN ({",".join("?" * len(changed))})""", changed).fetchall()
+        for rowid in changed:
+            self._remove_row(rowid)
+        self._count()
+        # Changed rows go back in if they fall inside the window. Rows beyond either end
+        # turn up when scrolling, like any other, unless the window is at that end.
+        first = self._order[0] if self._order else None
+        last = self._order[-1] if self._order else None
+        at_end = self._offset + len(self._order) >= self._total
         for row in rows:
-            self.tree.insert("", "end", values=row)
+            key = self._sort_key(row[-1], row[0])
+            if first is not None and key < first and self._offset > 0:
+                continue
+            if last is not None and key > last and not at_end:
+                continue
+            pos = bisect_left(self._order, key)
+            self._order.insert(pos, key)
+            self.tree.insert("", pos, iid=str(row[0]), values=row[:-1])
+        if self._offset > 0 and self._order:
+            self._offset = self.count_rows(self._call, self._page_key(self._order[0]))
+        # Trim the tail back to the "Show last" limit
+        limit = self._limit()
+        if limit is not None and self._offset + len(self._order) > limit:
+            keep = max(0, limit - self._offset)
+            del self._order[keep:]
+            self.tree.delete(*self.tree.get_children()[keep:])
+        self._evict(keep_top=True)
+        self._seq = changes[-1][0]
+        if len(self._order) < self.PAGE_SIZE:
+            self._load_more()  # Deleted rows leave room to refill
+        return True
+
+    def reload(self):
+        # Clear then repopulate with newest first
+        self._reset(None)
+        self._load_more()
+
+    def refresh(self):
+        # Apply just the changes since the last refresh, rebuild only when that isn't possible
+        try:
+            if self._apply_changes():
+                return
+        except sqlite3.Error:
+            pass
+        self.reload()
+
+    def lookup(self, call):
+        # Clear then repopulate with newest first
+        self._reset(call)
+        self._load_more()
 
     def _schedule_autorefresh(self):
         # Light periodic refresh. Adjust interval (ms) as you like.
@@ -1,5 +1,80 @@
+import os
+import time
 import sqlite3
+import calendar
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from Qso import Qso
+from DupeIndex import DupeIndex
+import BandPlan
+from BandPlan import bands_for_freqs
+from Adif import read_adif_file, read_adif_range, find_record_ranges
+
+BUSY_TIMEOUT = 10  # Seconds a connection waits for another writer
+CACHE_SIZE = -16384  # Page cache per connection, negative means KiB (16 MiB)
+MMAP_SIZE = 256 << 20  # Memory-map up to 256 MiB of the database file
+CHANGES_KEPT = 10000  # Change journal entries kept for incremental view refreshes
+BATCH_SIZE = 5000  # Rows per executemany() call during bulk inserts
+INSERT_COLUMNS = "Call, Name, Date, Time, Band, Mode, Report, PropMode, Satellite, Grid, County, State, Country, CQ, Freq, Remarks, My_Grid, ts_utc, freq_hz"
+MERGE_COLUMNS = ["Name", "Report", "PropMode", "Satellite", "Grid", "County", "State", "Country", "CQ", "Freq", "Remarks"]
+FETCH_SIZE = 1000  # Rows per fetchmany() call when streaming QSOs
+EXPORT_CHUNK = 1000  # ADIF records joined per write() during export
+WRITE_BUFFER = 1 << 20  # 1 MiB file buffer for exports
+PARALLEL_MIN_BYTES = 32 << 20  # Files smaller than 32 MiB are parsed in-process
+CHUNK_BYTES = 8 << 20  # Parse large files in 8 MiB pieces so only a few are held in memory
+PROGRESS_EVERY = 1000  # Records between progress reports and cancel checks
+LOTW_TOLERANCE = 30 * 60  # LoTW matches QSO times within 30 minutes
+QSO_COLUMNS = "rowid, Call, Name, Date, Time, Band, Mode, Report, PropMode, Satellite, Grid, County, State, Country, CQ, Freq, Remarks, My_Grid"
+
+
+def to_ts_utc(date, time):
+    # Date is YYYY-MM-DD (or YYYYMMDD) and Time is HHMM or HHMMSS, both UTC
+    d = (date or "").replace("-", "")
+    t = (time or "").replace(":", "")
+    if len(t) == 4:
+        t += "00"
+    if len(d) != 8 or len(t) != 6 or not d.isdigit() or not t.isdigit():
+        return None
+    year, month, day, hour, minute, second = int(d[0:4]), int(d[4:6]), int(d[6:8]), int(t[0:2]), int(t[2:4]), int(t[4:6])
+    # Out of range values are bad input, not a reason to fail a whole import
+    if not (1 <= year and 1 <= month <= 12 and hour < 24 and minute < 60 and second < 60):
+        return None
+    if not 1 <= day <= calendar.monthrange(year, month)[1]:
+        return None
+    try:
+        return calendar.timegm((year, month, day, hour, minute, second, 0, 0, 0))
+    except (ValueError, OverflowError):
+        return None
+
+
+def to_freq_hz(freq):
+    # Freq is stored in MHz as text
+    try:
+        return int(round(float(freq) * 1000000))
+    except (TypeError, ValueError):
+        return None
+
+
+def mode_group(mode):
+    # LoTW confirms by mode group, so a logged USB matches a reported SSB
+    mode = (mode or "").upper()
+    if mode in ("", "NONE"):
+        return ""
+    if mode == "CW":
+        return "CW"
+    if mode in ("SSB", "USB", "LSB", "AM", "FM", "DIGITALVOICE", "C4FM", "DSTAR"):
+        return "PHONE"
+    if mode in ("SSTV", "ATV", "FAX"):
+        return "IMAGE"
+    return "DATA"
+
+
+def _parse_adif_range(job):
+    # Runs in a worker process, returns the parsed QSOs for one byte range of the file
+    adif_file, start, end, qso_id, my_grid, region = job
+    BandPlan.set_region(region)  # Workers do not inherit the GUI's settings
+    return [Qso.from_adif(qso_data, qso_id, my_grid) for qso_data in read_adif_range(adif_file, start, end)]
 
 
 class LogDatabase:
@@ -11,9 +86,36 @@ class LogDatabase:
         self.db_file = "qso_log.db"
         self.table_name = "logbook"
         self.my_grid = my_grid
-        self.conn = sqlite3.connect(self.db_file)
+        self.conn = sqlite3.connect(self.db_file, timeout=BUSY_TIMEOUT)
+        # WAL lets readers run alongside the writer; NORMAL sync is still crash-safe in WAL
+        self.conn.execute('PRAGMA journal_mode = WAL;')
+        self.conn.execute('PRAGMA synchronous = NORMAL;')
+        self._tune_connection(self.conn)
         self.cursor = self.conn.cursor()
+        self._dupes = None  # DupeIndex, loaded on first use
+        self._reader = None  # Read-only connection for streaming queries, opened on first use
         self.create_table()
+        self.prune_changes()
+
+    def _tune_connection(self, conn):
+        conn.execute(f'PRAGMA cache_size = {CACHE_SIZE};')
+        conn.execute(f'PRAGMA mmap_size = {MMAP_SIZE};')
+
+    def open_reader(self):
+        """
+        Open a read-only connection for views, stats and exports.
+        In WAL mode its reads never block inserts on the writer connection.
+        The caller owns (and closes) the connection, in the thread that opened it.
+        """
+        conn = sqlite3.connect(f'file:{self.db_file}?mode=ro', uri=True, timeout=BUSY_TIMEOUT)
+        conn.execute('PRAGMA query_only = ON;')
+        self._tune_connection(conn)
+        return conn
+
+    def reader(self):
+        if self._reader is None:
+            self._reader = self.open_reader()
+        return self._reader
 
     def create_table(self):
         create_table_sql = f'''
@@ -40,6 +142,192 @@ class LogDatabase:
         '''
         self.cursor.execute(create_table_sql)
         self.conn.commit()
+        self.migrate()
+
+    def _migrations(self):
+        # Schema upgrades in order, PRAGMA user_version records how many have been applied.
+        # Only ever append to this list, existing qso_log.db files are upgraded in place.
+        return [
+            self._migrate_v1,
+            self._migrate_v2,
+            self._migrate_v3,
+            self._migrate_v4,
+            self._migrate_v5,
+            self._migrate_v6,
+            self._migrate_v7,
+            self._migrate_v8,
+            self._migrate_v9,
+            self._migrate_v10,
+        ]
+
+    def migrate(self):
+        version = self.cursor.execute('PRAGMA user_version;').fetchone()[0]
+        migrations = self._migrations()
+        for target in range(version + 1, len(migrations) + 1):
+            try:
+                self.cursor.execute('BEGIN;')
+                migrations[target - 1]()
+                self.cursor.execute(f'PRAGMA user_version = {target};')
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def _migrate_v1(self):
+        # Indexes for the recent contacts pane, callsign history and dupe checks
+        self.cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{self.table_name}_date_time ON {self.table_name} (Date, Time);')
+        self.cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{self.table_name}_call_date_time ON {self.table_name} (Call, Date, Time);')
+        self.cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{self.table_name}_call_band_mode ON {self.table_name} (Call, Band, Mode);')
+
+    def _migrate_v2(self):
+        # Integer UTC timestamp and frequency next to the text columns
+        self.cursor.execute(f'ALTER TABLE {self.table_name} ADD COLUMN ts_utc INTEGER;')
+        self.cursor.execute(f'ALTER TABLE {self.table_name} ADD COLUMN freq_hz INTEGER;')
+        rows = self.conn.execute(f'SELECT rowid, Date, Time, Freq FROM {self.table_name};')
+        self.cursor.executemany(f'UPDATE {self.table_name} SET ts_utc = ?, freq_hz = ? WHERE rowid = ?;',
+                                ((to_ts_utc(date, time), to_freq_hz(freq), rowid) for rowid, date, time, freq in rows))
+        self.cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{self.table_name}_ts_utc ON {self.table_name} (ts_utc);')
+        self.cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{self.table_name}_call_ts_utc ON {self.table_name} (Call, ts_utc);')
+
+    def _migrate_v3(self):
+        # High-water marks for incremental exports, keyed by destination
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_state (
+            destination TEXT PRIMARY KEY,
+            high_water INTEGER NOT NULL DEFAULT 0,
+            synced_at INTEGER
+        );
+        ''')
+
+    def _migrate_v4(self):
+        # Trigger-maintained journal of changed rows so views can refresh incrementally
+        self.cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {self.table_name}_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            qso_id INTEGER NOT NULL,
+            op TEXT NOT NULL
+        );
+        ''')
+        for event, op, ref in (("INSERT", "I", "NEW"), ("UPDATE", "U", "NEW"), ("DELETE", "D", "OLD")):
+            self.cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {self.table_name}_{event.lower()}_journal AFTER {event} ON {self.table_name}
+            BEGIN
+                INSERT INTO {self.table_name}_changes (qso_id, op) VALUES ({ref}.rowid, '{op}');
+            END;
+            ''')
+
+    def _migrate_v5(self):
+        # Durable outbox of QSOs waiting to be uploaded, one row per QSO and destination
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS upload_outbox (
+            qso_id INTEGER NOT NULL,
+            destination TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt INTEGER NOT NULL DEFAULT 0,
+            queued_at INTEGER NOT NULL,
+            logid TEXT,
+            last_error TEXT,
+            PRIMARY KEY (qso_id, destination)
+        );
+        ''')
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_upload_outbox_due ON upload_outbox (destination, status, next_attempt);')
+        # A deleted QSO has nothing left to upload
+        self.cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {self.table_name}_delete_outbox AFTER DELETE ON {self.table_name}
+        BEGIN
+            DELETE FROM upload_outbox WHERE qso_id = OLD.rowid;
+        END;
+        ''')
+
+    def _migrate_v6(self):
+        # One row per upload attempt of a batch, so batched uploads can be audited
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS upload_batches (
+            batch_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            destination TEXT NOT NULL,
+            finished_at INTEGER NOT NULL,
+            sent INTEGER NOT NULL,
+            retry INTEGER NOT NULL,
+            failed INTEGER NOT NULL,
+            detail TEXT
+        );
+        ''')
+
+    def _migrate_v7(self):
+        # LoTW confirmation status, filled in by import_lotw_confirmations
+        self.cursor.execute(f'ALTER TABLE {self.table_name} ADD COLUMN lotw_qsl_rcvd TEXT;')
+        self.cursor.execute(f'ALTER TABLE {self.table_name} ADD COLUMN lotw_qsl_date TEXT;')
+
+    def _migrate_v8(self):
+        # Global change sequence: every insert or edit stamps the row with MAX(change_seq) + 1,
+        # so "everything new or changed since the last sync" is one range scan of the index
+        self.cursor.execute(f'ALTER TABLE {self.table_name} ADD COLUMN change_seq INTEGER;')
+        # Stamping a row is not a change the views need to hear about
+        self.cursor.execute(f'DROP TRIGGER IF EXISTS {self.table_name}_update_journal;')
+        self.cursor.execute(f'''
+        CREATE TRIGGER {self.table_name}_update_journal AFTER UPDATE ON {self.table_name}
+        WHEN NEW.change_seq IS OLD.change_seq
+        BEGIN
+            INSERT INTO {self.table_name}_changes (qso_id, op) VALUES (NEW.rowid, 'U');
+        END;
+        ''')
+        self.cursor.execute(f'UPDATE {self.table_name} SET change_seq = rowid;')
+        self.cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{self.table_name}_change_seq ON {self.table_name} (change_seq);')
+        stamp = f'''
+            UPDATE {self.table_name} SET change_seq = (SELECT COALESCE(MAX(change_seq), 0) + 1 FROM {self.table_name})
+            WHERE rowid = NEW.rowid;
+        '''
+        self.cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {self.table_name}_insert_change_seq AFTER INSERT ON {self.table_name}
+        BEGIN {stamp} END;
+        ''')
+        # Only edits of QSO data count, LoTW confirmations are not uploaded anywhere
+        self.cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {self.table_name}_update_change_seq AFTER UPDATE OF {", ".join(self.columns[1:])} ON {self.table_name}
+        BEGIN {stamp} END;
+        ''')
+        # change_seq each outbox entry was queued at, so a sync doesn't queue it twice
+        self.cursor.execute('ALTER TABLE upload_outbox ADD COLUMN queued_seq INTEGER;')
+        # The ADIF export mark counted rowids, which equal the backfilled change_seq
+        self.cursor.execute("UPDATE sync_state SET destination = 'ADIF' WHERE destination = 'adif';")
+
+    def _migrate_v9(self):
+        # Inserts bind change_seq from a counter read once per transaction (see _next_change_seq),
+        # the insert trigger only stamps rows added without one
+        self.cursor.execute(f'DROP TRIGGER IF EXISTS {self.table_name}_insert_change_seq;')
+        self.cursor.execute(f'''
+        CREATE TRIGGER {self.table_name}_insert_change_seq AFTER INSERT ON {self.table_name}
+        WHEN NEW.change_seq IS NULL
+        BEGIN
+            UPDATE {self.table_name} SET change_seq = (SELECT COALESCE(MAX(change_seq), 0) + 1 FROM {self.table_name})
+            WHERE rowid = NEW.rowid;
+        END;
+        ''')
+        # change_seq of the version last sent, NULL until the first successful upload.
+        # Rows sent before and queued again are edits, which QRZ must replace, not insert.
+        self.cursor.execute('ALTER TABLE upload_outbox ADD COLUMN sent_seq INTEGER;')
+        self.cursor.execute("UPDATE upload_outbox SET sent_seq = CASE WHEN status = 'sent' THEN COALESCE(queued_seq, 0) ELSE 0 END WHERE status = 'sent' OR logid IS NOT NULL;")
+
+    def _migrate_v10(self):
+        # Only stamp a new change_seq when an UPDATE really changed a value, so re-merging the
+        # same ADIF or saving an unedited QSO doesn't queue uploads and exports again
+        data_columns = self.columns[1:]
+        self.cursor.execute(f'DROP TRIGGER IF EXISTS {self.table_name}_update_change_seq;')
+        self.cursor.execute(f'''
+        CREATE TRIGGER {self.table_name}_update_change_seq AFTER UPDATE OF {", ".join(data_columns)} ON {self.table_name}
+        WHEN {" OR ".join(f"OLD.{col} IS NOT NEW.{col}" for col in data_columns)}
+        BEGIN
+            UPDATE {self.table_name} SET change_seq = (SELECT COALESCE(MAX(change_seq), 0) + 1 FROM {self.table_name})
+            WHERE rowid = NEW.rowid;
+        END;
+        ''')
+
+    def prune_changes(self, keep=CHANGES_KEPT):
+        # Readers that fall further behind than this just do a full refresh.
+        # Runs when the database opens and after every bulk operation, which journal a row per QSO
+        self.cursor.execute(f'DELETE FROM {self.table_name}_changes WHERE seq <= (SELECT MAX(seq) FROM {self.table_name}_changes) - ?;', (keep,))
+        self.conn.commit()
     
     def update_my_grid(self, new_grid):
         self.my_grid = new_grid
@@ -60,22 +348,219 @@ class LogDatabase:
             return 0 # No rows in table 
         return result[0]
 
-    def insert_qso(self, qso: Qso):
-        insert_sql = f'''
-        INSERT INTO {self.table_name} (Call, Name, Date, Time, Band, Mode, Report, PropMode, Satellite, Grid, County, State, Country, CQ, Freq, Remarks, My_Grid)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+    def _insert_sql(self, table_name=None):
+        # Rows of the log itself also bind change_seq, a staging table has no such column
+        if table_name:
+            return f'''
+            INSERT INTO {table_name} ({INSERT_COLUMNS})
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+            '''
+        return f'''
+        INSERT INTO {self.table_name} ({INSERT_COLUMNS}, change_seq)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
         '''
-        self.cursor.execute(insert_sql, (qso.callsign, qso.name, qso.date, qso.time, qso.band, qso.mode, qso.report, qso.prop_mode, qso.satellite, qso.grid, qso.county, qso.state, qso.country, qso.cq, qso.freq, qso.remarks, self.my_grid))
-        self.conn.commit()
 
-    def update_qso(self, qso: Qso):
+    def _next_change_seq(self):
+        # Takes the write lock first, so no other connection can hand out the same numbers
+        # before this transaction commits. Rows inserted in it use this value, +1, +2, ...
+        if not self.conn.in_transaction:
+            self.cursor.execute('BEGIN IMMEDIATE;')
+        return self.cursor.execute(f'SELECT COALESCE(MAX(change_seq), 0) + 1 FROM {self.table_name};').fetchone()[0]
+
+    def _insert_params(self, qso: Qso):
+        return (qso.callsign, qso.name, qso.date, qso.time, qso.band, qso.mode, qso.report, qso.prop_mode, qso.satellite, qso.grid, qso.county, qso.state, qso.country, qso.cq, qso.freq, qso.remarks, self.my_grid,
+                to_ts_utc(qso.date, qso.time), to_freq_hz(qso.freq))
+
+    def insert_qso(self, qso: Qso, destinations=()):
+        """
+        Log a QSO and queue it for upload to destinations in the same transaction,
+        so a crash can never leave a logged QSO that is not in the outbox.
+        Returns the rowid.
+        """
+        try:
+            self.cursor.execute(self._insert_sql(), self._insert_params(qso) + (self._next_change_seq(),))
+            rowid = self.cursor.lastrowid
+            for destination in destinations:
+                self._enqueue_uploads([rowid], destination)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        if self._dupes is not None:
+            self._dupes.add(rowid, qso.callsign, qso.band, qso.mode, to_ts_utc(qso.date, qso.time))
+        return rowid
+
+    def dupe_index(self):
+        if self._dupes is None:
+            self._dupes = DupeIndex()
+            for rowid, call, band, mode, ts in self.conn.execute(f'SELECT rowid, Call, Band, Mode, ts_utc FROM {self.table_name};'):
+                self._dupes.add(rowid, call, band, mode, ts)
+        return self._dupes
+
+    def find_dupe(self, qso: Qso):
+        """
+        Return the rowid of a logged QSO with the same call, band and mode within
+        the dupe window, or None. The QSO's own row is ignored when editing.
+        """
+        qso_id = int(qso.qso_id) if str(qso.qso_id).isdigit() else None
+        return self.dupe_index().find(qso.callsign, qso.band, qso.mode, to_ts_utc(qso.date, qso.time), exclude=qso_id)
+
+    def merge_qsos(self, merges):
+        """
+        Fill empty columns of existing rows from duplicate QSOs.
+        merges: iterable of (rowid, Qso). Returns the number of rows updated, rows where
+        the duplicate has nothing to add are left alone and not counted.
+        """
+        empty = "('', 'N/A', 'None')"
+        assignments = ", ".join(f"{col} = CASE WHEN {col} IS NULL OR {col} IN {empty} THEN ? ELSE {col} END" for col in MERGE_COLUMNS)
+        # Some empty column gets a value (a NULL parameter never matches NOT IN)
+        fills = " OR ".join(f"(({col} IS NULL OR {col} IN {empty}) AND ? NOT IN {empty})" for col in MERGE_COLUMNS)
+        merge_sql = f'UPDATE {self.table_name} SET {assignments}, freq_hz = COALESCE(freq_hz, ?) WHERE rowid = ? AND ({fills} OR (freq_hz IS NULL AND ? IS NOT NULL));'
+        params = []
+        for rowid, qso in merges:
+            values = (qso.name, qso.report, qso.prop_mode, qso.satellite, qso.grid, qso.county, qso.state, qso.country, qso.cq, qso.freq, qso.remarks)
+            freq_hz = to_freq_hz(qso.freq)
+            params.append(values + (freq_hz, rowid) + values + (freq_hz,))
+        try:
+            self.cursor.executemany(merge_sql, params)
+            merged = self.cursor.rowcount
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.prune_changes()
+        return merged
+
+    def repair_missing_bands(self, region=None):
+        """
+        Fill the Band of rows that have a frequency but no band, resolving the whole
+        column through the band plan in one pass. Returns (repaired, unresolved) counts.
+        """
+        rows = self.cursor.execute(f"SELECT rowid, freq_hz FROM {self.table_name} WHERE (Band IS NULL OR Band = '') AND freq_hz IS NOT NULL;").fetchall()
+        found = bands_for_freqs([freq_hz for _, freq_hz in rows], region)
+        params = [(band, rowid) for (rowid, _), band in zip(rows, found) if band]
+        try:
+            self.cursor.executemany(f'UPDATE {self.table_name} SET Band = ? WHERE rowid = ?;', params)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.prune_changes()
+        self._dupes = None  # Reload with the new bands on next use
+        return len(params), len(rows) - len(params)
+
+    def bulk_insert_qsos(self, qsos, batch_size=BATCH_SIZE, skip=None, cancel=None):
+        """
+        Insert an iterable of Qso objects with executemany inside a single transaction.
+        skip: optional callable, QSOs for which it returns True are not inserted.
+        cancel: optional threading.Event, switches to the staged path below so that
+        other connections can keep logging while a long import runs.
+        Returns (inserted, skipped, invalid) counts. Rolls back everything on error.
+        """
+        if cancel is not None:
+            return self._staged_insert_qsos(qsos, batch_size, skip, cancel)
+        insert_sql = self._insert_sql()
+        inserted = skipped = invalid = 0
+        batch = []
+        try:
+            change_seq = self._next_change_seq()
+            for qso in qsos:
+                if not qso.is_valid():
+                    invalid += 1
+                    continue
+                if skip and skip(qso):
+                    skipped += 1
+                    continue
+                batch.append(self._insert_params(qso) + (change_seq,))
+                change_seq += 1
+                if len(batch) >= batch_size:
+                    self.cursor.executemany(insert_sql, batch)
+                    inserted += len(batch)
+                    batch.clear()
+            if batch:
+                self.cursor.executemany(insert_sql, batch)
+                inserted += len(batch)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.prune_changes()
+        return inserted, skipped, invalid
+
+    def _staged_insert_qsos(self, qsos, batch_size, skip, cancel):
+        # Rows are first staged in a TEMP table, which never locks qso_log.db, then copied
+        # into the log batch_size rows per transaction so other connections can write in
+        # between. The rowid range of every copied batch is kept so a cancel or an error
+        # can delete exactly the rows this import added.
+        stage_sql = self._insert_sql("temp.import_stage")
+        copy_sql = f'''
+        INSERT INTO {self.table_name} ({INSERT_COLUMNS}, change_seq)
+        SELECT {INSERT_COLUMNS}, seq + ? FROM temp.import_stage WHERE seq > ? AND seq <= ? ORDER BY seq;
+        '''
+        inserted = skipped = invalid = 0
+        batch = []
+        copied = []
+        self.cursor.execute('DROP TABLE IF EXISTS temp.import_stage;')
+        self.cursor.execute(f'CREATE TEMP TABLE import_stage (seq INTEGER PRIMARY KEY, {INSERT_COLUMNS});')
+        try:
+            for qso in qsos:
+                if not qso.is_valid():
+                    invalid += 1
+                    continue
+                if skip and skip(qso):
+                    skipped += 1
+                    continue
+                batch.append(self._insert_params(qso))
+                if len(batch) >= batch_size:
+                    self._check_cancel(cancel)
+                    self.cursor.executemany(stage_sql, batch)
+                    self.conn.commit()
+                    inserted += len(batch)
+                    batch.clear()
+            if batch:
+                self.cursor.executemany(stage_sql, batch)
+                self.conn.commit()
+                inserted += len(batch)
+            for start in range(0, inserted, batch_size):
+                self._check_cancel(cancel)
+                # Staged rows are numbered from 1, so seq + offset continues the change sequence
+                offset = self._next_change_seq() - start - 1
+                self.cursor.execute(copy_sql, (offset, start, start + batch_size))
+                last = self.cursor.lastrowid
+                copied.append((last - self.cursor.rowcount + 1, last))
+                self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            for first, last in copied:
+                self.cursor.execute(f'DELETE FROM {self.table_name} WHERE rowid BETWEEN ? AND ?;', (first, last))
+            self.conn.commit()
+            raise
+        finally:
+            self.cursor.execute('DROP TABLE IF EXISTS temp.import_stage;')
+            self.prune_changes()  # Every copied or removed row left a journal entry
+        return inserted, skipped, invalid
+
+    def _check_cancel(self, cancel):
+        if cancel is not None and cancel.is_set():
+            raise RuntimeError("Cancelled by user")
+
+    def update_qso(self, qso: Qso, destinations=()):
+        # Edits are queued for upload to destinations in the same transaction, like insert_qso
         update_sql = f'''
         UPDATE {self.table_name}
-        SET Call = ?, Name = ?, Date = ?, Time = ?, Band = ?, Mode = ?, Report = ?, PropMode = ?, Satellite = ?, Grid = ?, County = ?, State = ?, Country = ?, CQ = ?, Freq = ?, Remarks = ?, My_Grid = ?
+        SET Call = ?, Name = ?, Date = ?, Time = ?, Band = ?, Mode = ?, Report = ?, PropMode = ?, Satellite = ?, Grid = ?, County = ?, State = ?, Country = ?, CQ = ?, Freq = ?, Remarks = ?, My_Grid = ?, ts_utc = ?, freq_hz = ?
         WHERE rowid = ?;
         '''
-        self.cursor.execute(update_sql, (qso.callsign, qso.name, qso.date, qso.time, qso.band, qso.mode, qso.report, qso.prop_mode, qso.satellite, qso.grid, qso.county, qso.state, qso.country, qso.cq, qso.freq, qso.remarks, self.my_grid, qso.qso_id))
-        self.conn.commit()  
+        try:
+            self.cursor.execute(update_sql, self._insert_params(qso) + (qso.qso_id,))
+            for destination in destinations:
+                self._enqueue_uploads([int(qso.qso_id)], destination)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        if self._dupes is not None:
+            self._dupes.add(int(qso.qso_id), qso.callsign, qso.band, qso.mode, to_ts_utc(qso.date, qso.time))
 
     def fetch_qso_by_id(self, qso_id):
         fetch_sql = f'SELECT * FROM {self.table_name} WHERE rowid = ?;'
@@ -86,104 +571,388 @@ class LogDatabase:
         delete_sql = f'DELETE FROM {self.table_name} WHERE rowid = ?;'
         self.cursor.execute(delete_sql, (qso_id,))
         self.conn.commit()
+        if self._dupes is not None:
+            self._dupes.remove(int(qso_id))
 
     def fetch_all_qsos(self):
         fetch_sql = f'SELECT * FROM {self.table_name};'
         self.cursor.execute(fetch_sql)
         return self.cursor.fetchall()
-    
-    def export_to_adif(self, adif_file, appVersion="1.0"):
+
+    def _qso_filter(self, date_from=None, date_to=None, band=None, mode=None, call=None, min_rowid=None, max_rowid=None, min_change_seq=None):
+        # Build the WHERE clause shared by iter_qsos and count_qsos
+        where = []
+        params = []
+        if date_from:
+            where.append("ts_utc >= ?")
+            params.append(to_ts_utc(date_from, "000000"))
+        if date_to:
+            where.append("ts_utc <= ?")
+            params.append(to_ts_utc(date_to, "235959"))
+        if band:
+            where.append("Band = ?")
+            params.append(band)
+        if mode:
+            where.append("Mode = ?")
+            params.append(mode)
+        if call:
+            call = call.upper()
+            where.append("Call GLOB ?" if "*" in call or "?" in call else "Call = ?")
+            params.append(call)
+        if min_rowid is not None:
+            where.append("rowid >= ?")
+            params.append(min_rowid)
+        if max_rowid is not None:
+            where.append("rowid <= ?")
+            params.append(max_rowid)
+        if min_change_seq is not None:
+            where.append("change_seq >= ?")
+            params.append(min_change_seq)
+        return (" WHERE " + " AND ".join(where) if where else ""), params
+
+    def count_qsos(self, date_from=None, date_to=None, band=None, mode=None, call=None, min_rowid=None, max_rowid=None, min_change_seq=None):
+        where, params = self._qso_filter(date_from, date_to, band, mode, call, min_rowid, max_rowid, min_change_seq)
+        return self.reader().execute(f'SELECT COUNT(*) FROM {self.table_name}{where};', params).fetchone()[0]
+
+    def iter_qsos(self, date_from=None, date_to=None, band=None, mode=None, call=None, min_rowid=None, max_rowid=None, min_change_seq=None, batch_size=FETCH_SIZE):
+        """
+        Stream QSOs matching the given filters, oldest first.
+        date_from/date_to: 'YYYY-MM-DD', inclusive. call: exact callsign or a pattern with * and ? wildcards.
+        min_rowid/max_rowid: inclusive rowid range. min_change_seq: only QSOs added or edited since then.
+        All predicates are evaluated by SQLite, rows are fetched batch_size at a time.
+        """
+        where, params = self._qso_filter(date_from, date_to, band, mode, call, min_rowid, max_rowid, min_change_seq)
+        # Column order matches Qso's constructor so rows map positionally
+        fetch_sql = f'SELECT {QSO_COLUMNS} FROM {self.table_name}{where} ORDER BY ts_utc, rowid;'
+        cursor = self.reader().cursor()  # Streams from the reader so inserts are never blocked
+        try:
+            cursor.execute(fetch_sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield Qso.from_row(row)
+        finally:
+            cursor.close()
+
+    def last_change_seq(self):
+        return self.reader().execute(f'SELECT COALESCE(MAX(change_seq), 0) FROM {self.table_name};').fetchone()[0]
+
+    def enqueue_changes(self, destination):
+        """
+        Queue every QSO added or edited since the last sync to destination in the upload
+        outbox, and move the destination's high-water mark. QSOs already queued at their
+        current change_seq (e.g. by live logging) are left alone.
+        Returns the number of QSOs queued.
+        """
+        high_water = self.get_high_water(destination)
+        try:
+            self.cursor.execute('BEGIN;')
+            last_seq = self.cursor.execute(f'SELECT COALESCE(MAX(change_seq), 0) FROM {self.table_name};').fetchone()[0]
+            self.cursor.execute(f'''
+            INSERT INTO upload_outbox (qso_id, destination, queued_at, queued_seq)
+            SELECT l.rowid, ?, ?, l.change_seq FROM {self.table_name} l
+            WHERE l.change_seq > ? AND l.change_seq <= ? AND NOT EXISTS
+                (SELECT 1 FROM upload_outbox o WHERE o.qso_id = l.rowid AND o.destination = ? AND o.queued_seq >= l.change_seq)
+            ON CONFLICT(qso_id, destination) DO UPDATE SET status = 'pending', attempts = 0, next_attempt = 0,
+                queued_at = excluded.queued_at, queued_seq = excluded.queued_seq, last_error = NULL;
+            ''', (destination, int(time.time()), high_water, last_seq, destination))
+            queued = self.cursor.rowcount
+            self.cursor.execute('''
+            INSERT INTO sync_state (destination, high_water, synced_at) VALUES (?, ?, strftime('%s', 'now'))
+            ON CONFLICT(destination) DO UPDATE SET high_water = excluded.high_water, synced_at = excluded.synced_at;
+            ''', (destination, last_seq))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return queued
+
+    def get_high_water(self, destination):
+        self.cursor.execute('SELECT high_water FROM sync_state WHERE destination = ?;', (destination,))
+        result = self.cursor.fetchone()
+        if result is None:
+            return 0  # Never synced
+        return result[0]
+
+    def set_high_water(self, destination, high_water):
+        self.cursor.execute('''
+        INSERT INTO sync_state (destination, high_water, synced_at) VALUES (?, ?, strftime('%s', 'now'))
+        ON CONFLICT(destination) DO UPDATE SET high_water = excluded.high_water, synced_at = excluded.synced_at;
+        ''', (destination, high_water))
+        self.conn.commit()
+
+    def enqueue_uploads(self, qso_ids, destination):
+        """
+        Queue QSOs for upload to destination ('QRZ', 'LOTW').
+        A QSO that is already queued, sent or failed is reset to pending.
+        """
+        self._enqueue_uploads(qso_ids, destination)
+        self.conn.commit()
+
+    def _enqueue_uploads(self, qso_ids, destination):
+        # Outbox rows for enqueue_uploads, insert_qso and update_qso, the caller commits
+        now = int(time.time())
+        self.cursor.executemany(f'''
+        INSERT INTO upload_outbox (qso_id, destination, queued_at, queued_seq)
+        VALUES (?, ?, ?, (SELECT change_seq FROM {self.table_name} WHERE rowid = ?))
+        ON CONFLICT(qso_id, destination) DO UPDATE SET status = 'pending', attempts = 0, next_attempt = 0,
+            queued_at = excluded.queued_at, queued_seq = excluded.queued_seq, last_error = NULL;
+        ''', ((qso_id, destination, now, qso_id) for qso_id in qso_ids))
+
+    def due_uploads(self, destination, limit, now=None):
+        # Pending QSOs whose backoff has expired, oldest first, as (attempts, Qso, sent_before, logid).
+        # sent_before: an earlier version was uploaded, logid is its remote id if the service gave one
+        now = int(time.time()) if now is None else now
+        self.cursor.execute(f'''
+        SELECT o.attempts, o.sent_seq IS NOT NULL, o.logid, {", ".join("l." + c for c in QSO_COLUMNS.split(", "))}
+        FROM upload_outbox o JOIN {self.table_name} l ON l.rowid = o.qso_id
+        WHERE o.destination = ? AND o.status = 'pending' AND o.next_attempt <= ?
+        ORDER BY o.queued_at, o.qso_id LIMIT ?;
+        ''', (destination, now, limit))
+        return [(row[0], Qso.from_row(row[3:]), bool(row[1]), row[2]) for row in self.cursor.fetchall()]
+
+    def pending_uploads(self, destination):
+        """
+        Return (count, oldest queued_at, earliest next_attempt) of the pending uploads for destination.
+        """
+        self.cursor.execute("SELECT COUNT(*), MIN(queued_at), MIN(next_attempt) FROM upload_outbox WHERE destination = ? AND status = 'pending';", (destination,))
+        return self.cursor.fetchone()
+
+    def record_uploads(self, destination, sent=(), retry=(), failed=()):
+        """
+        Store upload outcomes of one batch in one transaction.
+        sent: (qso_id, logid) pairs, a None logid keeps the one of an earlier upload.
+        retry: (qso_id, next_attempt, error). failed: (qso_id, error).
+        """
+        errors = [entry[-1] for entry in list(retry) + list(failed)]
+        self.cursor.executemany("UPDATE upload_outbox SET status = 'sent', attempts = attempts + 1, logid = COALESCE(?, logid), sent_seq = queued_seq, last_error = NULL WHERE qso_id = ? AND destination = ?;",
+                                ((logid, qso_id, destination) for qso_id, logid in sent))
+        self.cursor.executemany("UPDATE upload_outbox SET attempts = attempts + 1, next_attempt = ?, last_error = ? WHERE qso_id = ? AND destination = ?;",
+                                ((next_attempt, error, qso_id, destination) for qso_id, next_attempt, error in retry))
+        self.cursor.executemany("UPDATE upload_outbox SET status = 'failed', attempts = attempts + 1, last_error = ? WHERE qso_id = ? AND destination = ?;",
+                                ((error, qso_id, destination) for qso_id, error in failed))
+        self.cursor.execute('INSERT INTO upload_batches (destination, finished_at, sent, retry, failed, detail) VALUES (?, ?, ?, ?, ?, ?);',
+                            (destination, int(time.time()), len(sent), len(retry), len(failed), errors[-1] if errors else None))
+        self.conn.commit()
+
+    def last_upload_batch(self, destination):
+        # (finished_at, sent, retry, failed, detail) of the latest batch, or None
+        self.cursor.execute('SELECT finished_at, sent, retry, failed, detail FROM upload_batches WHERE destination = ? ORDER BY batch_id DESC LIMIT 1;', (destination,))
+        return self.cursor.fetchone()
+
+    def retry_failed_uploads(self, destination):
+        self.cursor.execute("UPDATE upload_outbox SET status = 'pending', attempts = 0, next_attempt = 0 WHERE destination = ? AND status = 'failed';", (destination,))
+        self.conn.commit()
+        return self.cursor.rowcount
+
+    def outbox_stats(self):
+        # {destination: {status: count}}
+        stats = {}
+        for destination, status, count in self.cursor.execute('SELECT destination, status, COUNT(*) FROM upload_outbox GROUP BY destination, status;').fetchall():
+            stats.setdefault(destination, {})[status] = count
+        return stats
+
+    def export_to_adif(self, adif_file, appVersion="1.0", date_from=None, date_to=None, band=None, mode=None, call=None, since_last_export=False, progress=None, cancel=None):
+        """
+        Write QSOs matching the filters (see iter_qsos) to an ADIF file.
+        since_last_export: only QSOs added or edited after the previous unfiltered export.
+        Records are joined EXPORT_CHUNK at a time and written through a large buffer.
+        progress(records, done, total) is called after every chunk. If cancel (a
+        threading.Event) is set, the partial file is removed.
+        """
+        filtered = any((date_from, date_to, band, mode, call))
+        min_change_seq = self.get_high_water("ADIF") + 1 if since_last_export else None
+        # Read before the export starts, a change made while it runs goes out again next time
+        high_water = self.last_change_seq()
+        total = self.count_qsos(date_from, date_to, band, mode, call, min_change_seq=min_change_seq) if progress else 0
+        count = 0
         try:
-            with open(adif_file, 'w') as f:
+            with open(adif_file, 'w', buffering=WRITE_BUFFER) as f:
                 # Write ADIF header
-                f.write("Generated by QsoLogBook " + "v" + appVersion + "\n")
-                f.write("<ADIF_VER:5>3.0.5\n")
-                f.write("<PROGRAMID:10>QsoLogBook\n")
-                f.write("<EOH>\n")
-                
-                # Write each QSO
-                for row in self.fetch_all_qsos():
-                    qso = Qso(
-                        qso_id=row[self.adif_col.index("row_id")],
-                        callsign=row[self.adif_col.index("call")],
-                        name=row[self.adif_col.index("name")],
-                        date=row[self.adif_col.index("qso_date")],
-                        time=row[self.adif_col.index("time_on")],
-                        band=row[self.adif_col.index("band")],
-                        mode=row[self.adif_col.index("mode")],
-                        report=row[self.adif_col.index("rst_rcvd")],
-                        prop_mode=row[self.adif_col.index("prop_mode")],
-                        satellite=row[self.adif_col.index("sat_name")],
-                        grid=row[self.adif_col.index("gridsquare")],
-                        county=row[self.adif_col.index("county")],
-                        state=row[self.adif_col.index("state")],
-                        country=row[self.adif_col.index("country")],
-                        cq=row[self.adif_col.index("cqz")],
-                        freq=row[self.adif_col.index("freq")],
-                        remarks=row[self.adif_col.index("remarks")],
-                        my_grid=row[self.adif_col.index("my_gridsquare")]
-                    )
-                    f.write(qso.to_adif())
+                f.write("Generated by QsoLogBook " + "v" + appVersion + "\n"
+                        "<ADIF_VER:5>3.0.5\n"
+                        "<PROGRAMID:10>QsoLogBook\n"
+                        "<EOH>\n")
+
+                # Write the QSOs a chunk at a time
+                chunk = []
+                for qso in self.iter_qsos(date_from, date_to, band, mode, call, min_change_seq=min_change_seq):
+                    chunk.append(qso)
+                    if len(chunk) >= EXPORT_CHUNK:
+                        self._check_cancel(cancel)
+                        f.write(Qso.to_adif_many(chunk))
+                        count += len(chunk)
+                        chunk.clear()
+                        if progress:
+                            progress(count, count, total)
+                if chunk:
+                    f.write(Qso.to_adif_many(chunk))
+                    count += len(chunk)
         except Exception as e:
+            if cancel is not None and cancel.is_set() and os.path.exists(adif_file):
+                os.remove(adif_file)
             return False, str(e)
-    
-        return True, "Export successful"
 
-    def import_from_adif(self, adif_file):
+        # A filtered export is a subset, it doesn't move the "since last export" mark
+        if not filtered:
+            self.set_high_water("ADIF", high_water)
+        return True, f"Export successful: {count} QSOs"
+
+    def _qsos_from_adif(self, adif_file, progress=None):
+        qso_num = self.get_last_rowid()
+        for qso_data in read_adif_file(adif_file, progress=progress):
+            qso_num += 1
+            yield Qso.from_adif(qso_data, str(qso_num + 1), self.my_grid)
+
+    def _qsos_from_adif_parallel(self, adif_file, workers, progress=None):
+        # Cut the file at <eor> boundaries and parse the pieces in worker processes.
+        # Results are consumed in submission order, so rows are inserted in file order
+        # just like the serial path. Pieces are at most about CHUNK_BYTES and only
+        # 2 * workers + 1 are in flight, so memory stays bounded whatever the file size.
+        # The caller runs on a thread of a multi-threaded GUI, where fork() can deadlock,
+        # so workers are started by a fork server (or spawned) instead.
+        size = os.path.getsize(adif_file)
+        ranges = find_record_ranges(adif_file, max(workers, -(-size // CHUNK_BYTES)))
+        total = ranges[-1][1] if ranges else 0
+        next_id = str(self.get_last_rowid() + 1)
+        pending = deque()
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method)) as executor:
+            for start, end in ranges:
+                job = (adif_file, start, end, next_id, self.my_grid, BandPlan.current_region)
+                pending.append((end, executor.submit(_parse_adif_range, job)))
+                if len(pending) > workers * 2:
+                    yield from self._drain_parsed(pending, total, progress)
+            while pending:
+                yield from self._drain_parsed(pending, total, progress)
+
+    def _drain_parsed(self, pending, total, progress):
+        end, future = pending.popleft()
+        yield from future.result()
+        if progress:
+            progress(end, total)
+
+    def import_from_adif(self, adif_file, workers=None, progress=None, dupes="skip", cancel=None):
+        """
+        Import an ADIF file through the bulk insert path.
+        workers: number of parser processes, None picks one per core for files
+        larger than PARALLEL_MIN_BYTES.
+        progress(records, done_bytes, total_bytes) is called every PROGRESS_EVERY records.
+        dupes: 'skip' drops QSOs already in the log, 'merge' fills empty fields of
+        the logged QSO from the imported one, 'force' imports them anyway.
+        cancel: optional threading.Event, setting it rolls the whole import back.
+        """
+        if workers is None:
+            workers = (os.cpu_count() or 1) if os.path.getsize(adif_file) >= PARALLEL_MIN_BYTES else 1
+        index = self.dupe_index() if dupes != "force" else None
+        merges = []
+        pending_id = [0]  # QSOs from this file get negative ids until they are committed
+
+        def is_dupe(qso):
+            ts = to_ts_utc(qso.date, qso.time)
+            rowid = index.find(qso.callsign, qso.band, qso.mode, ts)
+            if rowid is None:
+                pending_id[0] -= 1
+                index.add(pending_id[0], qso.callsign, qso.band, qso.mode, ts)
+                return False
+            if dupes == "merge" and rowid > 0:
+                merges.append((rowid, qso))
+            return True
+
+        position = [0, os.path.getsize(adif_file)]
+
+        def on_bytes(done, total):
+            position[0] = done
+
+        def counted(qsos):
+            for records, qso in enumerate(qsos, 1):
+                if records % PROGRESS_EVERY == 0:
+                    self._check_cancel(cancel)
+                    if progress:
+                        progress(records, position[0], position[1])
+                yield qso
+
         try:
-            with open(adif_file, 'r') as f:
-                content = f.read()
-            
-            records = content.split("<eor>") # Split on <eor> tags
-            print(f"Found {len(records)} records in ADIF file.")
-
-            qso_num = self.get_last_rowid()
-            for record in records:
-                qso_data = {}
-                for col in self.adif_col:
-                    start_tag = f"<{col}:"
-                    if start_tag in record:
-                        start_idx = record.index(start_tag) + len(start_tag)
-                        end_idx = record.index(">", start_idx)
-                        length = int(record[start_idx:end_idx])
-                        value_start = end_idx + 1
-                        value_end = value_start + length
-                        qso_data[col] = record[value_start:value_end].strip()
-                    else:
-                        qso_data[col] = ""
-                
-                qso_num += 1
-                qso = Qso(
-                    qso_id = str(qso_num + 1),
-                    callsign=qso_data.get("call", ""),
-                    name=qso_data.get("name", ""),
-                    #date=qso_data.get("qso_date", ""),
-                    # Convert date from YYYYMMDD to YYYY-MM-DD
-                    date=f"{qso_data.get('qso_date', '')[0:4]}-{qso_data.get('qso_date', '')[4:6]}-{qso_data.get('qso_date', '')[6:8]}",
-                    time=qso_data.get("time_on", ""),
-                    band=qso_data.get("band", ""),
-                    mode=qso_data.get("mode", ""),
-                    report=qso_data.get("rst_rcvd", ""),
-                    prop_mode=qso_data.get("prop_mode", ""),
-                    satellite=qso_data.get("sat_name", ""),
-                    grid=qso_data.get("gridsquare", ""),
-                    county=qso_data.get("county", ""),
-                    state=qso_data.get("state", ""),
-                    country=qso_data.get("country", ""),
-                    cq=qso_data.get("cqz", ""),
-                    freq=qso_data.get("freq", ""),
-                    remarks=qso_data.get("remarks", ""),
-                    my_grid=qso_data.get("my_gridsquare", self.my_grid)
-                )
-                if qso.is_valid():
-                    self.insert_qso(qso)
-                else:
-                    print(f"Skipping invalid QSO: {qso}")
+            if workers > 1:
+                qsos = self._qsos_from_adif_parallel(adif_file, workers, on_bytes)
+                order = f"parallel, {workers} workers, file order"
+            else:
+                qsos = self._qsos_from_adif(adif_file, on_bytes)
+                order = "serial, file order"
+            inserted, skipped, invalid = self.bulk_insert_qsos(counted(qsos), skip=is_dupe if index is not None else None, cancel=cancel)
+            merged = self.merge_qsos(merges) if merges else 0
+        except Exception as e:
+            return False, str(e)
+        finally:
+            self._dupes = None  # Reload with real rowids on next use
+
+        return True, f"Import successful ({order}): {inserted} imported, {merged} merged, {skipped - merged} duplicates skipped, {invalid} invalid"
+
+    def import_lotw_confirmations(self, report_file, progress=None, cancel=None, tolerance=LOTW_TOLERANCE):
+        """
+        Merge a LoTW lotwreport.adi file into the log.
+        Records are streamed and matched on (call, band, mode group, time within tolerance)
+        through a DupeIndex hash of the log, so every record costs one lookup.
+        The logged QSO nearest in time wins when several fall within the tolerance.
+        progress(records, done_bytes, total_bytes) is called every PROGRESS_EVERY records.
+        Confirmations are written BATCH_SIZE rows at a time, a cancelled merge keeps
+        what was already written (running it again is harmless).
+        """
+        index = DupeIndex(tolerance)
+        confirmed = set()
+        for rowid, call, band, mode, ts, qsl in self.conn.execute(f'SELECT rowid, Call, Band, Mode, ts_utc, lotw_qsl_rcvd FROM {self.table_name};'):
+            index.add(rowid, call, band, mode_group(mode), ts)
+            if qsl == "Y":
+                confirmed.add(rowid)
+        update_sql = f"UPDATE {self.table_name} SET lotw_qsl_rcvd = 'Y', lotw_qsl_date = ? WHERE rowid = ?;"
+        position = [0, os.path.getsize(report_file)]
 
+        def on_bytes(done, total):
+            position[0] = done
+
+        updates = []
+        records = matched = already = unmatched = 0
+        try:
+            for qso_data in read_adif_file(report_file, progress=on_bytes):
+                records += 1
+                if records % PROGRESS_EVERY == 0:
+                    self._check_cancel(cancel)
+                    if progress:
+                        progress(records, position[0], position[1])
+                if qso_data.get("qsl_rcvd", "").upper() != "Y":
+                    continue  # Uploaded but not confirmed yet
+                group = qso_data.get("app_lotw_modegroup") or mode_group(qso_data.get("mode"))
+                ts = to_ts_utc(qso_data.get("qso_date"), qso_data.get("time_on"))
+                rowid = index.closest(qso_data.get("call"), qso_data.get("band"), group, ts)
+                if rowid is None:
+                    unmatched += 1
+                elif rowid in confirmed:
+                    already += 1
+                else:
+                    confirmed.add(rowid)
+                    qsl_date = qso_data.get("qslrdate", "")
+                    updates.append((f"{qsl_date[0:4]}-{qsl_date[4:6]}-{qsl_date[6:8]}" if len(qsl_date) == 8 else qsl_date, rowid))
+                    matched += 1
+                    if len(updates) >= BATCH_SIZE:
+                        self.cursor.executemany(update_sql, updates)
+                        self.conn.commit()
+                        updates = []
+            if updates:
+                self.cursor.executemany(update_sql, updates)
+                self.conn.commit()
         except Exception as e:
+            self.conn.rollback()
             return False, str(e)
+        self.prune_changes()
+        return True, f"LoTW merge successful: {matched} newly confirmed, {already} already confirmed, {unmatched} not found in the log"
 
-        return True, "Import successful"
+    def reset_dupe_index(self):
+        # Another connection changed the log, rebuild the index on next use
+        self._dupes = None
 
     def close(self):
+        if self._reader is not None:
+            self._reader.close()
         self.conn.close()
\ No newline at end of file
@@ -1,8 +1,21 @@
 # lotw_sign_and_upload.py
+import os
 import subprocess, pathlib
+import tempfile
 import configparser
 import requests
 import Crypto
+from Qso import Qso
+
+TQSL_TIMEOUT = 600  # Seconds one tqsl run may take to sign and upload a batch
+TQSL_SENT = (0, 9)  # Uploaded, 9 when some QSOs were skipped as duplicates or out of range
+TQSL_NONE_SENT = 8  # Nothing uploaded: every QSO was a duplicate already in LoTW or out of range
+TQSL_RETRY = (3, 11)  # LoTW server error or no connection, try again later
+BATCH_SIZE = 50  # QSOs signed per tqsl run
+BATCH_DELAY = 300  # Seconds a QSO may wait for the batch to fill up
+REPORT_URL = "https://lotw.arrl.org/lotwuser/lotwreport.adi"
+REPORT_TIMEOUT = 300  # LoTW can take minutes to build a large report
+DOWNLOAD_CHUNK = 1 << 16
 
 
 class Lotw:
@@ -14,6 +27,8 @@ class Lotw:
         self._certificate = config.get('LOTW', 'certificate', fallback="")
         self._cert_password = Crypto.decrypt_text(config.get('LOTW', 'cert_password', fallback=""))
         self._agent = "QsoLogBook/1.0"
+        self.batch_size = config.getint('LOTW', 'batch_size', fallback=BATCH_SIZE)
+        self.batch_delay = config.getint('LOTW', 'batch_delay', fallback=BATCH_DELAY)
 
     def reload_config(self, config: configparser.ConfigParser):
         self._username = config.get('LOTW', 'username', fallback="")
@@ -22,24 +37,68 @@ class Lotw:
         self._certificate = config.get('LOTW', 'certificate', fallback="")
         self._cert_password = Crypto.decrypt_text(config.get('LOTW', 'cert_password', fallback=""))
         self._agent = "QsoLogBook/1.0"
-        
-    def tqsl_sign_and_upload(self, qso, duplicate_policy: str = "compliant") -> tuple[bool, str]:
+        self.batch_size = config.getint('LOTW', 'batch_size', fallback=BATCH_SIZE)
+        self.batch_delay = config.getint('LOTW', 'batch_delay', fallback=BATCH_DELAY)
+
+    def _run_tqsl(self, adif, duplicate_policy):
+        # Each run gets its own temp file, so overlapping uploads never share an input file
+        fd, adif_file = tempfile.mkstemp(prefix="qsolog_", suffix=".adi")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(adif)
+            cmd = ["tqsl", "-d", "-u", "-x",
+                "-a", duplicate_policy,
+                "-l", self._location,
+                adif_file]
+            if self._cert_password:
+                cmd[1:1] = ["-p", self._cert_password]  # insert after 'tqsl'
+            return subprocess.run(cmd, capture_output=True, text=True, timeout=TQSL_TIMEOUT)
+        finally:
+            os.remove(adif_file)
+
+    def upload_qsos(self, qsos, duplicate_policy: str = "compliant"):
         """
-        Sign ADIF -> TQ8 with TQSL.
-        duplicate_policy: one of 'ask','abort','compliant','all'
-        Returns path to .tq8 file.
+        Sign and upload a batch of QSOs with a single tqsl run, for UploadQueue.
+        tqsl loads the certificate and connects to LoTW once for the whole batch.
+        Returns (qso_id, status, detail) per QSO, tqsl reports one outcome for all of them.
         """
-        with open("qso.adi", "w") as f:
-            f.write(qso)
-        cmd = ["tqsl", "-d", "-u",
-            "-a", duplicate_policy,
-            "-l", self._location,
-            "qso.adi"]
-        if self._cert_password:
-            cmd[1:1] = ["-p", self._cert_password]  # insert after 'tqsl'
-        # TQSL writes status to stderr; success code 0 means “signed/saved or signed/uploaded”
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            return True, result
-        except Exception as e:
-            return False, str(e)
+            result = self._run_tqsl(Qso.to_adif_many(qsos), duplicate_policy)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            return [(qso.qso_id, "retry", f"tqsl failed: {e}") for qso in qsos]
+        output = (result.stderr or result.stdout or "").strip().splitlines()
+        detail = f"tqsl exit {result.returncode}: {output[-1] if output else 'no output'}"
+        if result.returncode in TQSL_SENT:
+            status = "sent"
+        elif result.returncode == TQSL_NONE_SENT and duplicate_policy == "compliant":
+            # Re-queued edits and re-syncs are mostly QSOs LoTW already has, which tqsl
+            # skips under the compliant policy. Nothing is left to send for them.
+            status = "sent"
+        elif result.returncode in TQSL_RETRY:
+            status = "retry"
+        else:
+            status = "failed"
+        return [(qso.qso_id, status, None if status == "sent" else detail) for qso in qsos]
+
+    def download_report(self, report_file, since=None, timeout=REPORT_TIMEOUT):
+        """
+        Download the LoTW confirmations report (lotwreport.adi) into report_file.
+        since: 'YYYY-MM-DD', only confirmations received on or after this date.
+        The response is streamed to disk, large reports never sit in memory.
+        """
+        if not self._username or not self._password:
+            raise ValueError("Missing LoTW credentials")
+        params = {"login": self._username, "password": self._password, "qso_query": "1", "qso_qsl": "yes", "qso_qsldetail": "yes"}
+        if since:
+            params["qso_qslsince"] = since
+        with requests.get(REPORT_URL, params=params, stream=True, timeout=timeout, headers={"User-Agent": self._agent}) as r:
+            r.raise_for_status()
+            head = b""
+            with open(report_file, "wb") as f:
+                for chunk in r.iter_content(DOWNLOAD_CHUNK):
+                    if len(head) < DOWNLOAD_CHUNK:
+                        head += chunk
+                    f.write(chunk)
+        # A failed login still answers 200, with an HTML page instead of ADIF
+        if b"<eoh>" not in head.lower():
+            raise RuntimeError("LoTW did not return a report, please check the LoTW username and password")
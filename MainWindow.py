@@ -0,0 +1,968 @@
+# MainWindow.py
+# The QsoLogBook main window. main() builds it and runs the Tk loop, importing
+# the module has no side effects.
+import configparser
+import os
+import queue
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from QrzApi import QrzApi
+from Lotw import Lotw
+from Qso import Qso
+from Cat import open_cat, DRIVERS
+from Cat import bands, modes
+import BandPlan
+from LastQSOs import LastQSOs
+from ConfigWindow import ConfigWindow
+from ExportWindow import ExportWindow
+from ProgressWindow import ProgressWindow
+from UploadQueue import UploadQueue
+from LogDatabase import LogDatabase as Db
+from pathlib import Path
+from datetime import datetime, timezone
+from tkinter import *
+from tkinter import ttk
+from tkinter import filedialog
+from tkinter import messagebox
+
+
+appVersion = "0.6"
+
+POLL_INTERVAL_MS = 50  # Check the CAT reader's snapshot for new Radio Settings (if connected)
+
+propModes = ["N/A", "AS", "AUR", "BS", "EME", "ES", "F2", "GWAVE", "INTERNET", "LOS", "MS", "RPT", "SAT", "TR"]
+
+app = None  # The Tk root, created by main()
+lotw = None
+ldb = None
+qrz_logged_in = False
+qrz = None
+cat_connected = False
+cat = None
+background_job = None
+outboxes = {}  # UploadQueue workers by outbox destination
+
+# Concurrent callsign lookups
+LOOKUP_POLL_MS = 20  # How often the Tk loop checks for lookup results
+lookup_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="lookup")
+lookup_results = queue.Queue()
+lookup_futures = []
+lookup_generation = 0
+lookup_pending = 0
+autofilled = {}  # Entry: value the last lookup filled in
+
+
+# Application exit function
+def app_exit():
+    close = messagebox.askyesno("Exit?", "Are you sure you want to exit the application?", parent=app)
+    if close:
+        if background_job and background_job.is_running():
+            background_job.cancel()
+            background_job.thread.join()  # Let the import roll back before closing
+        lookup_pool.shutdown(wait=True, cancel_futures=True)
+        for outbox in outboxes.values():
+            outbox.stop()  # Unsent QSOs stay in the outbox for the next session
+        last_qsos.conn.close()
+        ldb.close()
+        if qrz:
+            qrz.close()
+        if cat:
+            cat.disconnect()
+        app.destroy()
+
+
+# Message box functions
+def showInfo(message):
+    response = messagebox.showinfo("Status", message, parent=app)
+    return response
+
+def showWarning(message):
+    response = messagebox.showwarning("Warning", message, parent=app)
+    return response
+
+def showError(message):
+    response = messagebox.showerror("Error", message, parent=app)
+    return response
+
+
+# A basic type-to-complete behavior for a ttk.Combobox in state='normal'
+def attach_autocomplete_to_combobox(cb, values):
+    type_buffer = {"last": 0}
+
+    def on_keyrelease(event):
+        # Ignore nav/control keys so we don't fight the user
+        if event.keysym in ("BackSpace","Left","Right","Home","End","Up","Down",
+                            "Return","Escape","Tab"):
+            return
+
+        typed = cb.get()
+        if not typed:
+            return
+
+        # Find first prefix match
+        match = next((v for v in values if v.lower().startswith(typed.lower())), None)
+        if match:
+            cb.set(match)
+            # put the cursor after what the user typed, and select the remainder
+            cb.icursor(len(typed))
+            cb.select_range(len(typed), "end")
+
+    cb.bind("<KeyRelease>", on_keyrelease)
+
+
+# To accommodate custom <Tab> order
+def focus_next_widget(event, next_widget):
+    next_widget.focus_set()
+    return "break"  # prevent default tab behavior
+
+
+# Read config file
+config = configparser.ConfigParser()
+config_file = 'config.ini'
+
+
+# LoTW Login
+def lotw_login():
+    global lotw
+    if 'LOTW' not in config or 'location' not in config['LOTW'] or 'upload' not in config['LOTW']:
+        showWarning("Config file is missing LOTW location or upload. Please update the config.ini file.")
+        return
+    if shutil.which("tqsl"):
+        showInfo("TQSL installation found in PATH.")
+    else:
+        showWarning("TQSL is NOT installed or not in PATH.")
+    try:
+        lotw = Lotw(config)
+        # One tqsl run signs a whole batch, flushed when it is full or its oldest QSO has waited long enough
+        start_outbox("LOTW", lambda qsos, replace: lotw.upload_qsos(qsos), batch_size=lotw.batch_size, min_batch=lotw.batch_size, max_delay=lotw.batch_delay)
+    except Exception as e:
+        showError(f"An error occurred during LOTW class initialization: {str(e)}")
+
+
+# QRZ Login
+def qrz_login():
+    global qrz_logged_in, qrz
+    # Check if already logged in
+    if qrz and qrz_logged_in:
+        showInfo("Already logged into QRZ.com")
+        return
+    if 'QRZ' not in config or 'username' not in config['QRZ'] or 'password' not in config['QRZ']:
+        showWarning("Config file is missing QRZ username or password. Please update the config.ini file.")
+        return
+    try:
+        if qrz:
+            qrz.close()  # Drop the pooled connections of a failed earlier attempt
+        qrz = QrzApi(config)
+        qrz_logged_in = qrz.login()
+        if qrz_logged_in:
+            # qrz is looked up on every batch, so a later re-login is picked up
+            start_outbox("QRZ", lambda qsos, replace: qrz.upload_qsos(qsos, replace=replace))
+            showInfo("Successfully logged into QRZ.com")
+        else:
+            showError(f"Failed to log into QRZ. Please check your credentials.")
+    except Exception as e:
+        showError(f"An error occurred during QRZ login: {str(e)}")
+
+
+# Drain an upload outbox in the background once its service is connected
+def start_outbox(destination, send, **thresholds):
+    if destination not in outboxes:
+        outboxes[destination] = UploadQueue(destination, send, ldb.my_grid, **thresholds)
+    else:
+        outboxes[destination].wake()
+
+
+def upload_destinations():
+    # Outboxes a newly logged or edited QSO goes to. It is queued even when the
+    # service is down, the outbox worker uploads it later.
+    return [destination for destination in ("QRZ", "LOTW") if config.getboolean(destination, 'upload', fallback=False)]
+
+
+def wake_outboxes(destinations):
+    for destination in destinations:
+        if destination in outboxes:
+            outboxes[destination].wake()
+
+
+# CAT Connect
+def cat_connect():
+    global cat_connected, cat
+    # Check if already connected
+    if cat and cat_connected:
+        showInfo("Already connected to CAT")
+        return
+    config.read(config_file)
+    try:
+        if cat:
+            cat.disconnect()  # Release the port of a lost or earlier connection
+        cat = open_cat(config)
+        cat_connected = cat.connect()
+        if cat_connected:
+            showInfo(f"Successfully connected {cat.describe()}.")
+        else:
+            showError(f"Failed to connect to {cat.describe()}.")
+    except Exception as e:
+        showError(f"An error occurred during CAT connection: {str(e)}")
+
+
+# Ask how an import should treat QSOs that are already in the log
+def ask_dupe_policy():
+    choice = {"policy": None}
+    dlg = Toplevel(app)
+    dlg.title("Duplicate QSOs")
+    dlg.transient(app)
+    dlg.grab_set()
+    policy_var = StringVar(dlg, value="skip")
+    Label(dlg, text="QSOs that are already in the log should be:").pack(padx=20, pady=(10, 5), anchor="w")
+    Radiobutton(dlg, text="Skipped", variable=policy_var, value="skip").pack(padx=30, anchor="w")
+    Radiobutton(dlg, text="Merged (fill in empty fields of the logged QSO)", variable=policy_var, value="merge").pack(padx=30, anchor="w")
+    Radiobutton(dlg, text="Imported anyway", variable=policy_var, value="force").pack(padx=30, anchor="w")
+
+    def ok():
+        choice["policy"] = policy_var.get()
+        dlg.destroy()
+
+    Button(dlg, text="OK", width=8, command=ok).pack(pady=10)
+    app.wait_window(dlg)
+    return choice["policy"]
+
+
+# Menu functions
+def import_log():
+    global background_job
+    if background_job and background_job.is_running():
+        showWarning("An import or export is already running.")
+        return
+    adif_file = filedialog.askopenfilename(initialdir=".", title="Select .adi File", filetypes=(("adif files", "*.adi"), ("all files", "*.*")))
+    if not adif_file:
+        return
+    dupes = ask_dupe_policy()
+    if dupes is None:
+        return  # Import cancelled
+    my_grid = ldb.my_grid
+
+    # Runs on the worker thread with its own database connection
+    def work(progress, cancel):
+        worker_db = Db(my_grid)
+        try:
+            return worker_db.import_from_adif(adif_file, progress=progress, dupes=dupes, cancel=cancel)
+        finally:
+            worker_db.close()
+
+    def done(result):
+        success, reason = result
+        ldb.reset_dupe_index()
+        if success:
+            showInfo(f"ADIF log imported successfully.\n{reason}")
+            clear_entries()
+        else:
+            showError(f"Failed to import ADIF log: {reason}")
+
+    background_job = ProgressWindow(app, "Importing ADIF log", work, done)
+
+def export_log():
+    global background_job
+    if background_job and background_job.is_running():
+        showWarning("An import or export is already running.")
+        return
+    dlg = ExportWindow(app, bands, modes)
+    app.wait_window(dlg.top)
+    if dlg.filters is None:
+        return  # Export cancelled
+    adif_file = filedialog.asksaveasfilename(initialdir=".", title="Save .adi File", defaultextension=".adi", filetypes=(("adif files", "*.adi"), ("all files", "*.*")))
+    if not adif_file:
+        return
+    filters = dlg.filters
+    my_grid = ldb.my_grid
+
+    # Runs on the worker thread with its own database connection
+    def work(progress, cancel):
+        worker_db = Db(my_grid)
+        try:
+            return worker_db.export_to_adif(adif_file, appVersion, progress=progress, cancel=cancel, **filters)
+        finally:
+            worker_db.close()
+
+    def done(result):
+        success, reason = result
+        if success:
+            showInfo(f"ADIF log exported successfully.\n{reason}")
+        else:
+            showError(f"Failed to export ADIF log: {reason}")
+
+    background_job = ProgressWindow(app, "Exporting ADIF log", work, done)
+
+def import_lotw_confirmations():
+    global background_job
+    if background_job and background_job.is_running():
+        showWarning("An import or export is already running.")
+        return
+    download = False
+    if lotw:
+        download = messagebox.askyesnocancel("LoTW Confirmations", "Download new confirmations from LoTW?\n\nChoose No to merge a lotwreport.adi file from disk instead.", parent=app)
+        if download is None:
+            return
+    report_file = None
+    if not download:
+        report_file = filedialog.askopenfilename(initialdir=".", title="Select lotwreport.adi File", filetypes=(("adif files", "*.adi"), ("all files", "*.*")))
+        if not report_file:
+            return
+    my_grid = ldb.my_grid
+    last_download = ldb.get_high_water("LOTW_QSL")
+
+    # Runs on the worker thread with its own database connection
+    def work(progress, cancel):
+        worker_db = Db(my_grid)
+        merge_file = report_file
+        try:
+            if download:
+                fd, merge_file = tempfile.mkstemp(prefix="lotwreport_", suffix=".adi")
+                os.close(fd)
+                started = int(time.time())
+                # Ask for a day of overlap, confirmations already merged are just counted again
+                since = datetime.fromtimestamp(last_download - 86400, timezone.utc).strftime('%Y-%m-%d') if last_download else None
+                lotw.download_report(merge_file, since)
+            result = worker_db.import_lotw_confirmations(merge_file, progress=progress, cancel=cancel)
+            if download and result[0]:
+                worker_db.set_high_water("LOTW_QSL", started)
+            return result
+        finally:
+            if download and merge_file:
+                os.remove(merge_file)
+            worker_db.close()
+
+    def done(result):
+        success, reason = result
+        if success:
+            showInfo(reason)
+            last_qsos.refresh()
+        else:
+            showError(f"Failed to merge LoTW confirmations: {reason}")
+
+    background_job = ProgressWindow(app, "Merging LoTW confirmations", work, done)
+
+# Work out the band of logged QSOs that have a frequency but no band
+def repair_missing_bands():
+    try:
+        repaired, unresolved = ldb.repair_missing_bands()
+    except Exception as e:
+        showError(f"An error occurred while repairing bands: {str(e)}")
+        return
+    last_qsos.refresh()
+    showInfo(f"Band filled in for {repaired} QSOs." + (f"\n{unresolved} frequencies are outside the region {BandPlan.current_region} band plan." if unresolved else ""))
+
+def config_settings():
+    global qrz_logged_in, qrz, cat_connected, cat
+    dlg = ConfigWindow(app, config)
+    app.wait_window(dlg.top)
+    # After the dialog is closed, reload the config
+    if qrz and qrz_logged_in:
+        qrz.reload_config(config)
+        qrz_logged_in = qrz.login()
+        if qrz_logged_in:
+            showInfo("Successfully re-logged into QRZ.com")
+        else:
+            showError(f"Failed to re-log into QRZ. Please check your credentials.")
+    # If CAT was connected, reconnect with new settings
+    if cat and cat_connected:
+        if config.getboolean('CAT', 'auto_con', fallback=False):
+            driver = config['CAT'].get('driver', fallback='serial').strip().lower()
+            if driver != cat.name and driver in DRIVERS:
+                # A different driver needs a new object, not just new settings
+                cat.disconnect()
+                cat = open_cat(config)
+                reconnected = cat.connect()
+            else:
+                reconnected = cat.reload_config(config)
+            if reconnected:
+                showInfo(f"Successfully reconnected {cat.describe()}.")
+            else:
+                cat_connected = False
+                showError(f"Failed to reconnect to {cat.describe()}.")
+        else:
+            cat.disconnect()
+            cat_connected = False
+            showInfo("CAT disconnected due to auto connect being disabled.")
+    elif config.getboolean('CAT', 'auto_con', fallback=False):
+        cat_connect()
+    # If LoTW was initialized, reload its config
+    if lotw:
+        lotw.reload_config(config)
+        if "LOTW" in outboxes:
+            outboxes["LOTW"].batch_size = outboxes["LOTW"].min_batch = lotw.batch_size
+            outboxes["LOTW"].max_delay = lotw.batch_delay
+    BandPlan.set_region(config.get('MY_DETAILS', 'iaru_region', fallback=BandPlan.DEFAULT_REGION))
+    # Update my_grid in the database if it was changed
+    if 'MY_DETAILS' in config and 'my_grid' in config['MY_DETAILS']:
+        new_grid = config['MY_DETAILS']['my_grid']
+        ldb.update_my_grid(new_grid)
+    else:
+        showWarning("Config file is missing my_grid. Please update the config.ini file.")
+
+
+def show_cache_stats():
+    if not qrz:
+        showWarning("Please log into QRZ first.")
+        return
+    stats = qrz.cache_stats()
+    showInfo(f"QRZ lookup cache: {stats['entries']} callsigns\n"
+             f"Hits: {stats['hits']}, stale hits: {stats['stale_hits']}, misses: {stats['misses']}\n"
+             f"Hit rate: {stats['hit_rate']:.0%}")
+
+
+def show_upload_queue():
+    stats = ldb.outbox_stats()
+    if not stats:
+        showInfo("The upload queue is empty.")
+        return
+    lines = []
+    failed = {}
+    for destination, counts in sorted(stats.items()):
+        lines.append(f"{destination}: {counts.get('pending', 0)} pending, {counts.get('sent', 0)} sent, {counts.get('failed', 0)} failed")
+        batch = ldb.last_upload_batch(destination)
+        if batch:
+            finished_at, sent, retry, failed_count, detail = batch
+            when = datetime.fromtimestamp(finished_at, timezone.utc).strftime('%Y-%m-%d %H:%M')
+            lines.append(f"  Last batch {when} UTC: {sent} sent, {retry} to retry, {failed_count} failed" + (f" ({detail})" if detail else ""))
+        if counts.get('failed'):
+            failed[destination] = counts['failed']
+    if not failed:
+        showInfo("\n".join(lines))
+        return
+    question = ", ".join(f"{count} {destination}" for destination, count in failed.items())
+    if messagebox.askyesno("Upload Queue", "\n".join(lines) + f"\n\nRetry the failed uploads ({question})?", parent=app):
+        for destination in failed:
+            ldb.retry_failed_uploads(destination)
+            if destination in outboxes:
+                outboxes[destination].wake()
+
+
+# Queue everything added or edited since the last sync to a destination
+def sync_changes(destination):
+    try:
+        queued = ldb.enqueue_changes(destination)
+    except Exception as e:
+        showError(f"An error occurred while queueing changes for {destination}: {str(e)}")
+        return
+    if destination in outboxes:
+        outboxes[destination].wake()
+        showInfo(f"{queued} new or changed QSOs queued for {destination}.")
+    else:
+        showInfo(f"{queued} new or changed QSOs queued for {destination}.\nThey are uploaded once you connect to {destination}.")
+
+def display_qso_number(id: int):
+    qsoNumberEntry.delete(0, END)
+    qsoNumberEntry.insert(0, str(id))
+
+
+# Button function (Clear)
+def clear_entries():
+    callsignEntry.delete(0, END)
+    nameEntry.delete(0, END)
+    dateEntry.delete(0, END)
+    timeEntry.delete(0, END)
+    #band_var.set(bands[0])
+    #mode_var.set(modes[0])
+    reportEntry.delete(0, END)
+    propMode_var.set(propModes[0])
+    satelliteEntry.delete(0, END)
+    satelliteEntry.insert(0, "None")
+    gridEntry.delete(0, END)
+    countyEntry.delete(0, END)
+    stateEntry.delete(0, END)
+    countryEntry.delete(0, END)
+    cqEntry.delete(0, END)
+    freqEntry.delete(0, END)
+    remarksEntry.delete(0, END)
+    autofilled.clear()
+    display_qso_number(ldb.get_last_rowid() + 1)
+    last_qsos.refresh()
+    callsignEntry.focus_set()
+
+
+# Show what the radio reported, leaving fields alone when a value is missing
+def show_radio_settings(freq, band, mode):
+    if freq is not None:
+        freqEntry.delete(0, END)
+        freqEntry.insert(0, freq)
+    if band is not None:
+        band_var.set(band)
+    if mode is not None:
+        mode_var.set(mode)
+
+
+# Periodic CAT update. The CAT reader thread owns the serial port, this only
+# copies its latest snapshot into the form when the radio state has changed.
+radio_version = 0
+
+def update_radio_settings():
+    global radio_version, cat_connected
+    if cat and cat_connected:
+        if cat.error:
+            cat.disconnect()  # Close the port, the reader thread has already stopped
+            cat_connected = False
+            showError(f"CAT connection lost: {cat.error}")
+        else:
+            version, freq, band, mode = cat.snapshot()
+            if version != radio_version:
+                radio_version = version
+                show_radio_settings(freq, band, mode)
+    app.after(POLL_INTERVAL_MS, update_radio_settings)
+
+
+def show_call_info(call_info):
+    # A lookup may answer after the operator has started typing, so only fill fields
+    # that are empty or still hold what the previous lookup put there
+    def value(key):
+        return str(call_info.get(key) or '')
+    name = value('fname') + ' ' + value('name') if value('fname') and value('name') else ''
+    for entry, text in ((nameEntry, name), (gridEntry, value('grid')), (countyEntry, value('county')),
+                        (stateEntry, value('state')), (countryEntry, value('country')), (cqEntry, value('cqzone'))):
+        current = entry.get()
+        if current and current != autofilled.get(entry):
+            continue
+        entry.delete(0, END)
+        entry.insert(0, text)
+        autofilled[entry] = text
+
+
+# Lookup results arrive from the thread pool and are applied on the Tk thread.
+# Every lookup gets a new generation, results of older lookups are dropped.
+def poll_lookup_results():
+    global lookup_pending
+    try:
+        while True:
+            generation, source, future = lookup_results.get_nowait()
+            lookup_pending -= 1
+            if generation != lookup_generation:
+                continue  # A newer lookup has started
+            if future.cancelled():
+                continue
+            try:
+                result = future.result()
+            except Exception as e:
+                showError(f"An error occurred during {source} lookup: {str(e)}")
+                continue
+            if source == "QRZ":
+                show_call_info(result['Callsign'])
+    except queue.Empty:
+        pass
+    if lookup_pending > 0:
+        app.after(LOOKUP_POLL_MS, poll_lookup_results)
+
+
+def start_lookup(generation, source, func, *args):
+    global lookup_pending
+    future = lookup_pool.submit(func, *args)
+    future.add_done_callback(lambda f: lookup_results.put((generation, source, f)))
+    lookup_futures.append(future)
+    lookup_pending += 1
+    if lookup_pending == 1:
+        app.after(LOOKUP_POLL_MS, poll_lookup_results)
+
+
+# Button function (Lookup)
+def lookup_call(event=None):
+    global lookup_generation
+    callsignEntry_value = callsignEntry.get().strip().upper()
+    if callsignEntry_value == "":
+        showWarning("Please enter a callsign to look up.")
+        callsignEntry.focus_set()
+        return "break"
+    if not qrz_logged_in:
+        showWarning("Please log into QRZ first.")
+        callsignEntry.focus_set()
+        return "break"
+    callsignEntry.delete(0, END)
+    callsignEntry.insert(0, callsignEntry_value)
+    # Supersede any lookup still in flight
+    for future in lookup_futures:
+        future.cancel()
+    lookup_futures.clear()
+    lookup_generation += 1
+    # QRZ answers on the lookup pool, the radio settings come from the CAT reader snapshot
+    start_lookup(lookup_generation, "QRZ", qrz.lookup, callsignEntry_value)
+    if cat_connected:
+        show_radio_settings(*cat.get_freq_band_mode())
+    current_time = datetime.now(timezone.utc)
+    dateEntry.delete(0, END)
+    dateEntry.insert(0, current_time.strftime('%Y-%m-%d'))
+    timeEntry.delete(0, END)
+    timeEntry.insert(0, current_time.strftime('%H%M'))
+    # Local history is an index lookup on the Tk thread's own connection
+    last_qsos.lookup(callsignEntry_value)
+    nameEntry.focus_set()
+    return "break"
+
+
+# Follow a typed frequency with the band it falls in
+def set_band_from_freq():
+    freq = freqEntry.get().strip()
+    if freq:
+        # An out-of-band frequency clears the band, so a stale one is never logged
+        band_var.set(BandPlan.band_for_mhz(freq) or "")
+
+
+# Button function (Log QSO)
+def log_qso(event=None):
+    new_qso = Qso(
+        qso_id = qsoNumberEntry.get().strip(),
+        callsign = callsignEntry.get().strip().upper(),
+        name = nameEntry.get().strip(),
+        date = dateEntry.get().strip(),
+        time = timeEntry.get().strip(),
+        band = band_var.get().strip() or BandPlan.band_for_mhz(freqEntry.get().strip()) or "",
+        mode = mode_var.get(),
+        report = reportEntry.get().strip(),
+        prop_mode = propMode_var.get(),
+        satellite = satelliteEntry.get().strip(),
+        grid = gridEntry.get().strip().upper(),
+        county = countyEntry.get().strip(),
+        state = stateEntry.get().strip().upper(),
+        country = countryEntry.get().strip(),
+        cq = cqEntry.get().strip(),
+        freq = freqEntry.get().strip(),
+        remarks = remarksEntry.get().strip(),
+        my_grid = ldb.my_grid
+    )
+
+    if not new_qso.is_valid():
+        showWarning("Please fill in at least Callsign, Date, Time, Band and Mode fields.")
+        return
+    destinations = upload_destinations()
+    try:
+        if int(new_qso.qso_id) > ldb.get_last_rowid():
+            dupe_id = ldb.find_dupe(new_qso)
+            if dupe_id is not None:
+                log_anyway = messagebox.askyesno("Possible Dupe", f"{new_qso.callsign} was already logged on {new_qso.band} {new_qso.mode} at about this time (QSO ID {dupe_id}).\nLog it anyway?", parent=app)
+                if not log_anyway:
+                    return
+            ldb.insert_qso(new_qso, destinations)
+            wake_outboxes(destinations)
+            showInfo(f"QSO with {new_qso.callsign} logged successfully.")
+        else:
+            ldb.update_qso(new_qso, destinations)
+            wake_outboxes(destinations)
+            showInfo(f"QSO ID {new_qso.qso_id} updated successfully.")
+    except Exception as e:
+        showError(f"An error occurred while logging the QSO: {str(e)}")
+
+    clear_entries()
+    
+
+def next_qso_in_db():
+    display_qso_number(ldb.get_last_rowid() + 1)
+    
+
+def load_qso_from_db():
+    rowid = qsoNumberEntry.get().strip()
+    if rowid == "":
+        showWarning("Please enter a QSO number to load.")
+        return
+    try:
+        qso = ldb.fetch_qso_by_id(rowid)
+        if qso is None:
+            showWarning(f"No QSO found with ID {rowid}.")
+            return
+        # Assuming the order of columns in the database matches the following:
+        # (rowid, Call, Name, Date, Time, Band, Mode, Report, PropMode, Satellite, Grid, County, State, Country, CQ, ITU, Remarks, My_Grid)
+        callsignEntry.delete(0, END)
+        callsignEntry.insert(0, qso[Db.columns.index("Call")])
+        nameEntry.delete(0, END)
+        nameEntry.insert(0, qso[Db.columns.index("Name")])
+        dateEntry.delete(0, END)
+        dateEntry.insert(0, qso[Db.columns.index("Date")])
+        timeEntry.delete(0, END)
+        timeEntry.insert(0, qso[Db.columns.index("Time")])
+        band_var.set(qso[Db.columns.index("Band")])
+        mode_var.set(qso[Db.columns.index("Mode")])
+        reportEntry.delete(0, END)
+        reportEntry.insert(0, qso[Db.columns.index("Report")])
+        propMode_var.set(qso[Db.columns.index("PropMode")])
+        satelliteEntry.delete(0, END)
+        satelliteEntry.insert(0, qso[Db.columns.index("Satellite")])
+        gridEntry.delete(0, END)
+        gridEntry.insert(0, qso[Db.columns.index("Grid")])
+        countyEntry.delete(0, END)
+        countyEntry.insert(0, qso[Db.columns.index("County")])
+        stateEntry.delete(0, END)
+        stateEntry.insert(0, qso[Db.columns.index("State")])
+        countryEntry.delete(0, END)
+        countryEntry.insert(0, qso[Db.columns.index("Country")])
+        cqEntry.delete(0, END)
+        cqEntry.insert(0, qso[Db.columns.index("CQ")])
+        freqEntry.delete(0, END)
+        freqEntry.insert(0, qso[Db.columns.index("Freq")])
+        remarksEntry.delete(0, END)
+        remarksEntry.insert(0, qso[Db.columns.index("Remarks")])
+    except Exception as e:
+        showError(f"An error occurred while loading QSO: {str(e)}")
+
+def delete_qso_from_db():
+    rowid = qsoNumberEntry.get().strip()
+    if rowid == "":
+        showWarning("Please enter a QSO number to delete.")
+        return
+    try:
+        qso = ldb.fetch_qso_by_id(rowid)
+        if qso is None:
+            showWarning(f"No QSO found with ID {rowid}.")
+            return
+        confirm = messagebox.askyesno("Delete QSO Entry", f"Are you sure you want to delete QSO ID {rowid}?", parent=app)
+        if confirm:
+            ldb.delete_qso(rowid)
+            showInfo(f"QSO ID {rowid} has been deleted.")
+            clear_entries()
+    except Exception as e:
+        showError(f"An error occurred while deleting QSO: {str(e)}")
+
+
+def main():
+    # The window and its widgets are module globals so the handlers above can reach them
+    global app, band_var, mode_var, propMode_var, ldb, my_grid, last_qsos, menubar, file_menu, connect_menu
+    global config_menu, previewFrame, qsoFrame, callsignLabel, callsignEntry, nameLabel, nameEntry, dateLabel
+    global dateEntry, timeLabel, timeEntry, bandLabel, bandMenu, modeLabel, modeMenu, reportLabel
+    global reportEntry, propModeLabel, propModeMenu, satelliteLabel, satelliteEntry, gridLabel, gridEntry
+    global countyLabel, countyEntry, stateLabel, stateEntry, countryLabel, countryEntry, cqLabel, cqEntry
+    global freqLabel, freqEntry, remarksLabel, remarksEntry, qsoNumberEntry, lookupButton, logButton
+    global clearButton, nextButton, loadButton, deleteButton
+    app = Tk()
+    app.title('QSO Log Book by W9EN - v' + appVersion)
+
+    # Some global variables
+    band_var = StringVar(app)
+    band_var.set("160M") # default value
+
+    mode_var = StringVar(app)
+    mode_var.set(modes[0]) # default value
+    propMode_var = StringVar(app)
+    propMode_var.set(propModes[0]) # default value
+
+    app.protocol("WM_DELETE_WINDOW", app_exit)
+    if Path(config_file).exists():
+        config.read(config_file)
+    else:
+        showError("No config file found. Please create a config.ini file.")
+    BandPlan.set_region(config.get('MY_DETAILS', 'iaru_region', fallback=BandPlan.DEFAULT_REGION))
+
+
+    # Open the Log Database
+    if 'MY_DETAILS' in config and 'my_grid' in config['MY_DETAILS']:
+        my_grid = config['MY_DETAILS']['my_grid']
+        ldb = Db(my_grid)
+    else:
+        showWarning("Config file is missing my_grid. Please update the config.ini file.")
+        ldb = Db()  # Use default values
+
+
+    # Create the File menu
+    menubar = Menu(app)
+    file_menu = Menu(menubar, tearoff=0)
+    file_menu.add_command(label="Import ADIF", command=import_log)
+    file_menu.add_command(label="Export ADIF", command=export_log)
+    file_menu.add_command(label="Import LoTW Confirmations", command=import_lotw_confirmations)
+    file_menu.add_command(label="Repair Missing Bands", command=repair_missing_bands)
+    file_menu.add_separator()
+    file_menu.add_command(label="Upload Changes to QRZ", command=lambda: sync_changes("QRZ"))
+    file_menu.add_command(label="Upload Changes to LoTW", command=lambda: sync_changes("LOTW"))
+    file_menu.add_separator()
+    file_menu.add_command(label="Exit", command=app_exit)
+    menubar.add_cascade(label="File", menu=file_menu)
+
+    # Create the Connect menu
+    connect_menu = Menu(menubar, tearoff=0)
+    connect_menu.add_command(label="Connect CAT", command=cat_connect)
+    connect_menu.add_command(label="Connect QRZ", command=qrz_login)
+    connect_menu.add_command(label="Connect LoTW", command=lotw_login)
+    menubar.add_cascade(label="Connect", menu=connect_menu)
+
+    # Create the Config menu
+    config_menu = Menu(menubar, tearoff=0)
+    config_menu.add_command(label="Settings", command=config_settings)
+    config_menu.add_command(label="QRZ Cache Stats", command=show_cache_stats)
+    config_menu.add_command(label="Upload Queue", command=show_upload_queue)
+    menubar.add_cascade(label="Config", menu=config_menu)
+
+    # Root view
+    previewFrame = LabelFrame(app, text="Recent Contacts", padx=5, pady=5)
+    previewFrame.grid(row=0, column=0, padx=5, pady=5)  # Set the frame position
+    previewFrame.grid_columnconfigure(0, minsize=972)
+
+    qsoFrame = LabelFrame(app, text="QSO Entry", padx=5, pady=5)
+    qsoFrame.grid(row=1, column=0, padx=5, pady=5)  # Set the frame position
+    minColumnWidth = 106
+    qsoFrame.grid_columnconfigure(0, minsize=minColumnWidth)
+    qsoFrame.grid_columnconfigure(1, minsize=minColumnWidth)
+    qsoFrame.grid_columnconfigure(2, minsize=minColumnWidth)
+    qsoFrame.grid_columnconfigure(3, minsize=minColumnWidth)
+    qsoFrame.grid_columnconfigure(4, minsize=minColumnWidth)
+    qsoFrame.grid_columnconfigure(5, minsize=minColumnWidth)
+    qsoFrame.grid_columnconfigure(6, minsize=minColumnWidth)
+    qsoFrame.grid_columnconfigure(7, minsize=minColumnWidth)
+    qsoFrame.grid_columnconfigure(8, minsize=minColumnWidth)
+
+    # QSO Entry Frame
+    callsignLabel = Label(qsoFrame, text="Callsign")  # Create a label widget
+    callsignLabel.grid(row=0, column=0)  # Put the label into the window
+    callsignEntry = Entry(qsoFrame, width=10, borderwidth=2)  # Create an input box
+    callsignEntry.grid(row=1, column=0)  # Set the input box position
+
+    nameLabel = Label(qsoFrame, text="Name")  # Create a label widget
+    nameLabel.grid(row=0, column=1)  # Put the label into the window
+    nameEntry = Entry(qsoFrame, width=10, borderwidth=2)  # Create an input box
+    nameEntry.grid(row=1, column=1)  # Set the input box position
+
+    dateLabel = Label(qsoFrame, text="Date")  # Create a label widget
+    dateLabel.grid(row=0, column=2)  # Put the label into the window
+    dateEntry = Entry(qsoFrame, width=10, borderwidth=2)  # Create an input box
+    dateEntry.grid(row=1, column=2)  # Set the input box position
+
+    timeLabel = Label(qsoFrame, text="Time")  # Create a label widget
+    timeLabel.grid(row=0, column=3)  # Put the label into the window
+    timeEntry = Entry(qsoFrame, width=10, borderwidth=2)  # Create an input box
+    timeEntry.grid(row=1, column=3)  # Set the input box position
+
+    bandLabel = Label(qsoFrame, text="Band")  # Create a label widget
+    bandLabel.grid(row=0, column=4)  # Put the label into the window
+    bandMenu = ttk.Combobox(qsoFrame, textvariable=band_var, values=bands, state="normal")
+    bandMenu.grid(row=1, column=4, padx=5, pady=5)
+    bandMenu.config(width=8)
+    attach_autocomplete_to_combobox(bandMenu, bands)
+
+    modeLabel = Label(qsoFrame, text="Mode")  # Create a label widget
+    modeLabel.grid(row=0, column=6)  # Put the label into the window
+    modeMenu = ttk.Combobox(qsoFrame, textvariable=mode_var, values=modes, state="normal")
+    modeMenu.grid(row=1, column=6, padx=5, pady=5)
+    modeMenu.config(width=10)
+    attach_autocomplete_to_combobox(modeMenu, modes)
+
+    reportLabel = Label(qsoFrame, text="Report")  # Create a label widget
+    reportLabel.grid(row=2, column=5)  # Put the label into the window
+    reportEntry = Entry(qsoFrame, width=10, borderwidth=2)  # Create an input box
+    reportEntry.grid(row=3, column=5)  # Set the input box position
+
+    propModeLabel = Label(qsoFrame, text="PropMode")  # Create a label widget
+    propModeLabel.grid(row=0, column=7)  # Put the label into the window
+    propModeMenu = ttk.Combobox(qsoFrame, textvariable=propMode_var, values=propModes, state="normal")
+    propModeMenu.grid(row=1, column=7, padx=5, pady=5)
+    propModeMenu.config(width=10)
+    attach_autocomplete_to_combobox(propModeMenu, propModes)
+
+    satelliteLabel = Label(qsoFrame, text="Satellite")  # Create a label widget
+    satelliteLabel.grid(row=0, column=8)  # Put the label into the window
+    satelliteEntry = Entry(qsoFrame, width=10, borderwidth=2)  # Create an input box
+    satelliteEntry.grid(row=1, column=8)  # Set the input box position  
+    satelliteEntry.insert(0, "None")
+
+    gridLabel = Label(qsoFrame, text="Grid")  # Create a label widget
+    gridLabel.grid(row=2, column=0)  # Put the label into the window
+    gridEntry = Entry(qsoFrame, width=10, borderwidth=2)  # Create an input box
+    gridEntry.grid(row=3, column=0)  # Set the input box position
+
+    countyLabel = Label(qsoFrame, text="County")  # Create a label widget
+    countyLabel.grid(row=2, column=1)  # Put the label into the window
+    countyEntry = Entry(qsoFrame, width=10, borderwidth=2)  # Create an input box
+    countyEntry.grid(row=3, column=1)  # Set the input box position
+
+    stateLabel = Label(qsoFrame, text="State")  # Create a label widget
+    stateLabel.grid(row=2, column=2)  # Put the label into the window
+    stateEntry = Entry(qsoFrame, width=10, borderwidth=2)  # Create an input box
+    stateEntry.grid(row=3, column=2)  # Set the input box position
+
+    countryLabel = Label(qsoFrame, text="Country")  # Create a label widget
+    countryLabel.grid(row=2, column=3)  # Put the label into the window
+    countryEntry = Entry(qsoFrame, width=10, borderwidth=2)  # Create an input box
+    countryEntry.grid(row=3, column=3)  # Set the input box position
+
+    cqLabel = Label(qsoFrame, text="CQ Zone")  # Create a label widget
+    cqLabel.grid(row=2, column=4)  # Put the label into the window
+    cqEntry = Entry(qsoFrame, width=10, borderwidth=2)  # Create an input box
+    cqEntry.grid(row=3, column=4)  # Set the input box position
+
+    freqLabel = Label(qsoFrame, text="Freq MHz")  # Create a label widget
+    freqLabel.grid(row=0, column=5)  # Put the label into the window
+    freqEntry = Entry(qsoFrame, width=10, borderwidth=2)  # Create an input box
+    freqEntry.grid(row=1, column=5)  # Set the input box position
+
+    remarksLabel = Label(qsoFrame, text="Remarks")  # Create a label widget
+    remarksLabel.grid(row=2, column=6, columnspan=3)  # Put the label into the window
+    remarksEntry = Entry(qsoFrame, width=42, borderwidth=2)  # Create an input box
+    remarksEntry.grid(row=3, column=6, columnspan=3)  # Set the input box position
+
+    qsoNumberEntry = Entry(qsoFrame, width=10, borderwidth=2)  # Create an input box
+    qsoNumberEntry.grid(row=5, column=8)  # Set the input box
+
+    # Recent Contacts Frame
+    last_qsos = LastQSOs(previewFrame, ldb.open_reader(), display_qso_number)
+    last_qsos.pack(fill="both", expand=True)
+    last_qsos.refresh()
+
+    # Buttons
+    lookupButton = Button(qsoFrame, text="Lookup", command=lookup_call)
+    lookupButton.grid(row=5, column=0, padx=5, pady=5)
+    lookupButton.config(width=8)
+    lookupButton.bind("<Return>", lambda e: lookup_call())
+
+    logButton = Button(qsoFrame, text="Log QSO", command=log_qso)
+    logButton.grid(row=5, column=1, padx=5, pady=5)
+    logButton.config(width=8)
+    logButton.bind("<Return>", lambda e: log_qso())
+
+    clearButton = Button(qsoFrame, text="Clear", command=clear_entries)
+    clearButton.grid(row=5, column=2, padx=5, pady=5)
+    clearButton.config(width=8)
+    clearButton.bind("<Return>", lambda e: clear_entries())
+
+    nextButton = Button(qsoFrame, text="Next Log Entry", command=next_qso_in_db)
+    nextButton.grid(row=5, column=5, padx=5, pady=5)
+    nextButton.config(width=10)
+    nextButton.bind("<Return>", lambda e: next_qso_in_db())
+
+    loadButton = Button(qsoFrame, text="Edit Log Entry", command=load_qso_from_db)
+    loadButton.grid(row=5, column=6, padx=5, pady=5)
+    loadButton.config(width=10)
+    loadButton.bind("<Return>", lambda e: load_qso_from_db())
+
+    deleteButton = Button(qsoFrame, text="Delete Log Entry", command=delete_qso_from_db)
+    deleteButton.grid(row=5, column=7, padx=5, pady=5)
+    deleteButton.config(width=12)
+    deleteButton.bind("<Return>", lambda e: delete_qso_from_db())
+
+
+    # Set the focus order when <Tab> is pressed
+    callsignEntry.bind("<Tab>", lambda e: focus_next_widget(e, lookupButton))
+    nameEntry.bind("<Tab>", lambda e: focus_next_widget(e, reportEntry))
+    reportEntry.bind("<Tab>", lambda e: focus_next_widget(e, remarksEntry))
+    remarksEntry.bind("<Tab>", lambda e: focus_next_widget(e, logButton))
+    freqEntry.bind("<FocusOut>", lambda e: set_band_from_freq())
+    callsignEntry.focus_set()
+
+
+    # Configure the menu bar
+    app.config(menu=menubar)
+
+    # Load initial data
+    display_qso_number(ldb.get_last_rowid() + 1)
+
+    app.attributes('-topmost', True)
+    app.update()
+
+    # Check auto connect and auto upload settings
+    if config.getboolean('CAT', 'auto_con', fallback=False):
+        cat_connect()
+    if config.getboolean('QRZ', 'upload', fallback=False):
+        qrz_login()
+    if config.getboolean('LOTW', 'upload', fallback=False):
+        lotw_login()
+
+    # Start periodic CAT updates
+    app.after(POLL_INTERVAL_MS, update_radio_settings)
+
+    # Keep the window open
+    app.mainloop()
+
+
+if __name__ == "__main__":
+    main()
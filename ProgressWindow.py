@@ -0,0 +1,88 @@
+# ProgressWindow.py
+import queue
+import threading
+import time
+from tkinter import *
+from tkinter import ttk
+
+
+class ProgressWindow:
+
+    POLL_MS = 100  # How often the Tk loop picks up progress from the worker
+
+    def __init__(self, parent, title, work, on_done):
+        """
+        Run work(progress, cancel) on a worker thread and show its progress.
+        progress(records, done, total) may be called from the worker thread,
+        cancel is a threading.Event set by the Cancel button.
+        on_done(result) is called on the Tk thread with work's return value.
+        The window is not modal, so the rest of the application stays usable.
+        """
+        self.parent = parent
+        self.work = work
+        self.on_done = on_done
+        self.cancel_event = threading.Event()
+        self._queue = queue.Queue()
+        self._started = time.monotonic()
+        self.top = Toplevel(parent)
+        self.top.title(title)
+        self.top.transient(parent) # stay on top of parent
+        self.top.protocol("WM_DELETE_WINDOW", self.cancel)
+        self._build_ui(title)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.top.after(self.POLL_MS, self._poll)
+
+    def _build_ui(self, title):
+        self.statusLabel = Label(self.top, text=f"{title}, please wait...", width=50, anchor="w")
+        self.statusLabel.pack(padx=20, pady=(20, 5))
+        self.progressBar = ttk.Progressbar(self.top, orient="horizontal", length=360, mode="determinate", maximum=1.0)
+        self.progressBar.pack(padx=20, pady=5)
+        self.cancelButton = Button(self.top, text="Cancel", width=8, command=self.cancel)
+        self.cancelButton.pack(pady=(5, 15))
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.cancelButton.config(state=DISABLED)
+        self.statusLabel.config(text="Cancelling, rolling back...")
+
+    def is_running(self):
+        return self.thread.is_alive()
+
+    def _run(self):
+        try:
+            result = self.work(self._progress, self.cancel_event)
+        except Exception as e:
+            result = (False, str(e))
+        self._queue.put(("done", result))
+
+    def _progress(self, records, done, total):
+        # Worker thread: never touch Tk here, just hand the numbers over
+        self._queue.put(("progress", (records, done, total)))
+
+    def _poll(self):
+        latest = None
+        try:
+            while True:
+                kind, data = self._queue.get_nowait()
+                if kind == "done":
+                    self.top.destroy()
+                    self.on_done(data)
+                    return
+                latest = data
+        except queue.Empty:
+            pass
+        if latest and not self.cancel_event.is_set():
+            self._show_progress(*latest)
+        self.top.after(self.POLL_MS, self._poll)
+
+    def _show_progress(self, records, done, total):
+        elapsed = time.monotonic() - self._started
+        rate = records / elapsed if elapsed > 0 else 0
+        fraction = done / total if total else 0
+        text = f"{records} QSOs, {rate:.0f} QSOs/s"
+        if 0 < fraction < 1:
+            eta = elapsed * (1 - fraction) / fraction
+            text += f", about {eta:.0f} s left"
+        self.progressBar["value"] = fraction
+        self.statusLabel.config(text=text)
@@ -1,11 +1,17 @@
 import requests
+import threading
+from requests.adapters import HTTPAdapter
 from Qso import Qso
+from QrzCache import QrzCache, DEFAULT_TTL_DAYS, DEFAULT_MAX_ENTRIES
 import configparser
 import Crypto
 from urllib.parse import quote
 import xml.etree.ElementTree as ET
 from xml.etree.ElementTree import ParseError
 
+POOL_CONNECTIONS = 2   # One pool per host: xmldata.qrz.com and logbook.qrz.com
+POOL_MAXSIZE = 8       # Kept-alive connections per host, enough for the lookup pool and uploads
+
 
 class QrzApi:
 
@@ -18,6 +24,19 @@ class QrzApi:
         self._xml_url = "https://xmldata.qrz.com/xml"
         self._xmlns_url = "http://xmldata.qrz.com"
         self._agent = "QsoLogBook/1.0"
+        self._cache = QrzCache(
+            ttl_days=config.getfloat('QRZ', 'cache_ttl_days', fallback=DEFAULT_TTL_DAYS),
+            max_entries=config.getint('QRZ', 'cache_size', fallback=DEFAULT_MAX_ENTRIES),
+            stale_ok=config.getboolean('QRZ', 'cache_stale_ok', fallback=True))
+        self._revalidating = set()  # Callsigns being refreshed in the background
+        self._revalidating_lock = threading.Lock()  # Lookups run on several pool threads
+        self._login_lock = threading.Lock()
+        # One keep-alive session for all requests, so TCP and TLS handshakes are paid once
+        self._http = requests.Session()
+        self._http.headers["User-Agent"] = self._agent
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+        self._http.mount("https://", adapter)
+        self._http.mount("http://", adapter)
 
     def reload_config(self, config: configparser.ConfigParser):
         self._username = config.get('QRZ', 'username', fallback="")
@@ -25,6 +44,9 @@ class QrzApi:
         self._api_key = Crypto.decrypt_text(config.get('QRZ', 'api_key', fallback=""))
         self._session_key = ""  # Clear session key on config reload
         self._agent = "QsoLogBook/1.0"
+        self._cache.ttl = config.getfloat('QRZ', 'cache_ttl_days', fallback=DEFAULT_TTL_DAYS) * 86400
+        self._cache.max_entries = config.getint('QRZ', 'cache_size', fallback=DEFAULT_MAX_ENTRIES)
+        self._cache.stale_ok = config.getboolean('QRZ', 'cache_stale_ok', fallback=True)
         
     def _to_int(self, x):
         try: return int(x) if x is not None and x != "" else None
@@ -106,6 +128,7 @@ class QrzApi:
                 "SubExp":  self._get(session_el, "SubExp", ns),   # free-form time string from QRZ
                 "GMTime":  self._get(session_el, "GMTime", ns),   # free-form time string
                 "Remark":  self._get(session_el, "Remark", ns),
+                "Error":   self._get(session_el, "Error", ns),
             }
 
         return {"Callsign": callsign, "Session": session}
@@ -116,12 +139,12 @@ class QrzApi:
         url = (f"{self._xml_url}?username={self._username};"
                f"password={self._password};agent={self._agent}")
         try:
-            r = requests.get(url, timeout=timeout)
+            r = self._http.get(url, timeout=timeout)
             r.raise_for_status()
             data = self.parse_qrz_xml(r.text)
             key = data.get("Session", {}).get("Key")
             if not key:
-                err = data.get("Session", {}).get("Error", "No session key in response")
+                err = data.get("Session", {}).get("Error") or "No session key in response"
                 raise RuntimeError(f"QRZ login failed: {err}")
             self._session_key = key
             return True
@@ -130,16 +153,81 @@ class QrzApi:
             preview = r.text[:400] if "r" in locals() else ""
             raise RuntimeError(f"QRZ login XML parse failed: {pe}\nPreview: {preview}")
 
-    def lookup(self, callsign: str, timeout=10):
-        # We need the session key to continue
-        if not self._session_key:
-            raise RuntimeError("Not logged in")
+    def _relogin(self, expired_key, timeout=10):
+        # Several lookup threads may see the same expired key, only the first one logs in again.
+        # The old key stays set until login replaces it, so lookups starting meanwhile don't
+        # fail with "Not logged in".
+        with self._login_lock:
+            if self._session_key == expired_key:
+                self.login(timeout)
+
+    def _query(self, callsign, timeout=10):
         url = f"{self._xml_url}?s={self._session_key};callsign={callsign}"
-        r = requests.get(url, timeout=timeout)
+        r = self._http.get(url, timeout=timeout)
         r.raise_for_status()
         return self.parse_qrz_xml(r.text)
 
-    def upload_qso(self, qso: Qso, timeout=10):
+    def _fetch(self, callsign: str, timeout=10):
+        # We need the session key to continue
+        if not self._session_key:
+            raise RuntimeError("Not logged in")
+        session_key = self._session_key
+        data = self._query(callsign, timeout)
+        # QRZ answers without a session key once the session has timed out or been
+        # invalidated ("Not found" answers still carry the key). Log in again and retry once.
+        if not data["Session"].get("Key"):
+            self._relogin(session_key, timeout)
+            data = self._query(callsign, timeout)
+            if not data["Session"].get("Key"):
+                err = data["Session"].get("Error") or "No session key in response"
+                raise RuntimeError(f"QRZ session lost: {err}")
+        if data["Callsign"]:
+            self._cache.put(callsign, data)  # Don't cache "not found" answers
+        return data
+
+    def _revalidate(self, callsign: str, timeout=10):
+        try:
+            self._fetch(callsign, timeout)
+        except Exception:
+            pass  # Keep serving the stale entry, the next lookup tries again
+        finally:
+            with self._revalidating_lock:
+                self._revalidating.discard(callsign)
+
+    def lookup(self, callsign: str, timeout=10):
+        callsign = callsign.upper()
+        data, fresh = self._cache.get(callsign)
+        if data is not None and fresh:
+            return data
+        if data is not None and self._cache.stale_ok:
+            # Serve the stale entry now and refresh it in the background
+            with self._revalidating_lock:
+                start = callsign not in self._revalidating
+                self._revalidating.add(callsign)
+            if start:
+                threading.Thread(target=self._revalidate, args=(callsign, timeout), daemon=True).start()
+            return data
+        try:
+            return self._fetch(callsign, timeout)
+        except requests.RequestException:
+            if data is not None:
+                return data  # Offline, stale data beats no data
+            raise
+
+    def cache_stats(self):
+        return self._cache.stats()
+
+    def close(self):
+        self._http.close()
+        self._cache.close()
+
+    def upload_qso(self, qso: Qso, timeout=10, replace=False, logid=None):
+        """
+        Insert one QSO into the QRZ logbook.
+        replace: the QSO was uploaded before and has been edited, overwrite the QRZ record
+        instead of getting a duplicate. logid: the QRZ id of that record, so it is found
+        even when the call, band or time changed.
+        """
         if not self._session_key:
             raise RuntimeError("Not logged in")
         if not self._api_key:
@@ -149,14 +237,19 @@ class QrzApi:
         # Query parameters
         action = "insert"
         adif = qso.to_adif()
+        if replace and logid:
+            logid = str(logid)
+            adif = adif.replace("<eor>", f"<app_qrzlog_logid:{len(logid)}>{logid} <eor>")
         #print("ADIF:", adif)
         # URL-encode ADIF
         adif_encoded = quote(adif, safe="")
         #print("Encoded ADIF:", adif_encoded)
         # Full URL
         url = self._log_url + "?key=" + self._api_key + "&action=" + action + "&adif=" + adif_encoded
+        if replace:
+            url += "&option=REPLACE"
         try:
-            response = requests.get(url, timeout=timeout)
+            response = self._http.get(url, timeout=timeout)
             response.raise_for_status()
             # Parse response
             result = count = logid = reason = None
@@ -174,4 +267,37 @@ class QrzApi:
         except requests.RequestException as e:
             raise RuntimeError(f"QSO upload failed: {e}")
         return result, count, logid, reason
+
+    def upload_qsos(self, qsos, timeout=10, replace=None):
+        """
+        Upload QSOs for UploadQueue. The logbook API takes one record per request,
+        so they go out back to back over the pooled keep-alive connection.
+        replace: {qso_id: QRZ logid or None} of edited QSOs that replace an earlier upload.
+        Returns (qso_id, status, detail) per QSO.
+        """
+        replace = replace or {}
+        results = []
+        for i, qso in enumerate(qsos):
+            try:
+                result, count, logid, reason = self.upload_qso(qso, timeout, qso.qso_id in replace, replace.get(qso.qso_id))
+            except ValueError as e:
+                results.append((qso.qso_id, "failed", str(e)))
+                continue
+            except RuntimeError as e:
+                # QRZ is unreachable or we are logged out, the rest of the batch waits for the retry
+                results.extend((other.qso_id, "retry", str(e)) for other in qsos[i:])
+                break
+            if result in ("OK", "REPLACE"):
+                results.append((qso.qso_id, "sent", logid))
+            elif result == "FAIL" and reason and "duplicate" in reason.lower():
+                if qso.qso_id in replace:
+                    # QRZ kept its old record, so the edit did not arrive
+                    results.append((qso.qso_id, "failed", reason))
+                else:
+                    results.append((qso.qso_id, "sent", None))  # Already in the QRZ logbook
+            elif result == "AUTH":
+                results.append((qso.qso_id, "retry", reason or "Invalid API key"))
+            else:
+                results.append((qso.qso_id, "failed", reason or f"QRZ result {result}"))
+        return results
         
\ No newline at end of file
@@ -0,0 +1,100 @@
+# QrzCache.py
+# Local SQLite cache of parsed QRZ callsign lookups with TTL and LRU eviction.
+import json
+import sqlite3
+import threading
+import time
+
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_ENTRIES = 20000
+EVICT_EVERY = 100  # Puts between checks of the size cap
+
+
+class QrzCache:
+
+    def __init__(self, db_file="qrz_cache.db", ttl_days=DEFAULT_TTL_DAYS, max_entries=DEFAULT_MAX_ENTRIES, stale_ok=True):
+        """
+        ttl_days: entries older than this are stale and trigger a new lookup.
+        max_entries: least recently used entries beyond this are evicted.
+        stale_ok: serve stale entries right away while they are refreshed
+        (stale-while-revalidate). Stale entries are always served when QRZ is unreachable.
+        """
+        self.ttl = ttl_days * 86400
+        self.max_entries = max_entries
+        self.stale_ok = stale_ok
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()  # Lookups may come from worker threads
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        # Losing the cache is harmless, so skip fsyncs entirely
+        self._conn.execute('PRAGMA journal_mode = WAL;')
+        self._conn.execute('PRAGMA synchronous = OFF;')
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS qrz_cache (
+            callsign TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        );
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_qrz_cache_last_used ON qrz_cache (last_used);')
+        self._conn.commit()
+
+    def get(self, callsign):
+        """
+        Return (data, fresh) for a callsign, or (None, False) if it isn't cached.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT data, fetched_at FROM qrz_cache WHERE callsign = ?;', (callsign,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None, False
+            self._conn.execute('UPDATE qrz_cache SET last_used = ? WHERE callsign = ?;', (now, callsign))
+            self._conn.commit()
+            fresh = now - row[1] < self.ttl
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+        return json.loads(row[0]), fresh
+
+    def put(self, callsign, data):
+        now = time.time()
+        with self._lock:
+            self._conn.execute('''
+            INSERT INTO qrz_cache (callsign, data, fetched_at, last_used) VALUES (?, ?, ?, ?)
+            ON CONFLICT(callsign) DO UPDATE SET data = excluded.data, fetched_at = excluded.fetched_at, last_used = excluded.last_used;
+            ''', (callsign, json.dumps(data), now, now))
+            # Evict the least recently used entries beyond the size cap, checked now and
+            # then rather than on every put, so the cap may be overshot by up to EVICT_EVERY entries
+            self._puts += 1
+            if self._puts % EVICT_EVERY == 0:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        excess = self._conn.execute('SELECT COUNT(*) FROM qrz_cache;').fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._conn.execute('''
+            DELETE FROM qrz_cache WHERE callsign IN
+                (SELECT callsign FROM qrz_cache ORDER BY last_used ASC LIMIT ?);
+            ''', (excess,))
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM qrz_cache;').fetchone()[0]
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,5 +1,36 @@
+from operator import attrgetter
+from BandPlan import band_for_mhz
+
 
 class Qso:
+
+    # Attribute order matches LogDatabase.columns, so database rows map positionally
+    __slots__ = ("qso_id", "callsign", "name", "date", "time", "band", "mode", "report", "prop_mode", "satellite", "grid", "county", "state", "country", "cq", "freq", "remarks", "my_grid")
+
+    # ADIF tag for each exported attribute, plus placeholder values that mean "not set"
+    _adif_fields = (
+        ("callsign", "call", ()),
+        ("name", "name", ()),
+        ("date", "qso_date", ()),
+        ("time", "time_on", ()),
+        ("band", "band", ()),
+        ("mode", "mode", ()),
+        ("report", "rst_rcvd", ()),
+        ("prop_mode", "prop_mode", ("N/A",)),
+        ("satellite", "sat_name", ("None",)),
+        ("grid", "gridsquare", ()),
+        ("county", "county", ()),
+        ("state", "state", ()),
+        ("country", "country", ()),
+        ("cq", "cqz", ()),
+        ("freq", "freq", ()),
+        ("remarks", "remarks", ()),
+        ("my_grid", "my_gridsquare", ()),
+    )
+    _adif_values = attrgetter(*(attr for attr, _, _ in _adif_fields))
+    _adif_tags = tuple((f"<{tag}:", empty, attr == "date") for attr, tag, empty in _adif_fields)
+    _row_values = attrgetter(*__slots__)
+
     def __init__(self, qso_id, callsign="", name="", date="", time="", band="", mode="", report="", prop_mode="", satellite="", grid="", county="", state="", country="", cq="", freq="", remarks="", my_grid=""):
         self.qso_id = qso_id
         self.callsign = callsign
@@ -20,48 +51,61 @@ class Qso:
         self.remarks = remarks
         self.my_grid = my_grid
 
+    @classmethod
+    def from_row(cls, row):
+        # row is (rowid, Call, Name, Date, Time, ...) in LogDatabase.columns order
+        return cls(*row[:len(cls.__slots__)])
+
+    @classmethod
+    def from_adif(cls, qso_data, qso_id, my_grid=""):
+        # qso_data is one record from Adif, keyed by lower-case field name
+        qso_date = qso_data.get("qso_date", "")
+        return cls(
+            qso_id = qso_id,
+            callsign=qso_data.get("call", ""),
+            name=qso_data.get("name", ""),
+            # Convert date from YYYYMMDD to YYYY-MM-DD
+            date=f"{qso_date[0:4]}-{qso_date[4:6]}-{qso_date[6:8]}",
+            time=qso_data.get("time_on", ""),
+            # Records without a band get it from their frequency
+            band=qso_data.get("band") or band_for_mhz(qso_data.get("freq")) or "",
+            mode=qso_data.get("mode", ""),
+            report=qso_data.get("rst_rcvd", ""),
+            prop_mode=qso_data.get("prop_mode", ""),
+            satellite=qso_data.get("sat_name", ""),
+            grid=qso_data.get("gridsquare", ""),
+            county=qso_data.get("county", ""),
+            state=qso_data.get("state", ""),
+            country=qso_data.get("country", ""),
+            cq=qso_data.get("cqz", ""),
+            freq=qso_data.get("freq", ""),
+            remarks=qso_data.get("remarks", ""),
+            my_grid=qso_data.get("my_gridsquare", my_grid)
+        )
+
+    def to_row(self):
+        return self._row_values(self)
+
     def __str__(self):
         return f"QSO(ID={self.qso_id}, Call={self.callsign}, Date={self.date}, Time={self.time}, Band={self.band}, Mode={self.mode}), Report={self.report})"
-    
+
     def is_valid(self):
-        if self.qso_id == "" or not self.qso_id.isdigit() or self.callsign == "" or self.date == "" or self.time == "" or self.band == "" or self.mode == "":
+        if self.qso_id == "" or not str(self.qso_id).isdigit() or self.callsign == "" or self.date == "" or self.time == "" or self.band == "" or self.mode == "":
             return False
         return True
 
     def to_adif(self):
-        adif_str = f"<call:{len(self.callsign)}>{self.callsign} "
-        if self.name:
-            adif_str += f"<name:{len(self.name)}>{self.name} "
-        if self.date:
-            adif_date = self.date.replace("-", "")
-            adif_str += f"<qso_date:{len(adif_date)}>{adif_date} "
-        if self.time:
-            adif_str += f"<time_on:{len(self.time)}>{self.time} "
-        if self.band:
-            adif_str += f"<band:{len(self.band)}>{self.band} "
-        if self.mode:
-            adif_str += f"<mode:{len(self.mode)}>{self.mode} "
-        if self.report:
-            adif_str += f"<rst_rcvd:{len(self.report)}>{self.report} "
-        if self.prop_mode != "N/A":
-            adif_str += f"<prop_mode:{len(self.prop_mode)}>{self.prop_mode} "
-        if self.satellite != "None":
-            adif_str += f"<sat_name:{len(self.satellite)}>{self.satellite} "
-        if self.grid:
-            adif_str += f"<gridsquare:{len(self.grid)}>{self.grid} "
-        if self.county:
-            adif_str += f"<county:{len(self.county)}>{self.county} "
-        if self.state:
-            adif_str += f"<state:{len(self.state)}>{self.state} "
-        if self.country:
-            adif_str += f"<country:{len(self.country)}>{self.country} "
-        if self.cq:
-            adif_str += f"<cqz:{len(self.cq)}>{self.cq} "
-        if self.freq:
-            adif_str += f"<freq:{len(self.freq)}>{self.freq} "
-        if self.remarks:
-            adif_str += f"<remarks:{len(self.remarks)}>{self.remarks} "
-        if self.my_grid:
-            adif_str += f"<my_gridsquare:{len(self.my_grid)}>{self.my_grid} "
-        adif_str += "<eor>\n"
-        return adif_str
+        parts = []
+        for (start_tag, empty, is_date), value in zip(self._adif_tags, self._adif_values(self)):
+            if value is None or value == "" or value in empty:
+                continue
+            value = str(value)
+            if is_date:
+                value = value.replace("-", "")
+            parts.append(f"{start_tag}{len(value)}>{value} ")
+        parts.append("<eor>\n")
+        return "".join(parts)
+
+    @staticmethod
+    def to_adif_many(qsos):
+        return "".join([qso.to_adif() for qso in qsos])
@@ -0,0 +1,105 @@
+# UploadQueue.py
+# Background worker that drains the upload_outbox table of qso_log.db for one destination.
+# Logging only writes an outbox row, the network is never touched on the Tk thread,
+# and QSOs queued while a service is down are sent once it is reachable again.
+import threading
+import time
+from LogDatabase import LogDatabase as Db
+
+UPLOAD_BATCH = 50  # QSOs handed to send() at a time
+BACKOFF_BASE = 30  # Seconds before the first retry, doubled on every further attempt
+BACKOFF_MAX = 3600  # Never wait longer than an hour between retries
+MAX_ATTEMPTS = 10  # Give up (status 'failed') after this many attempts
+IDLE_WAIT = 60  # Seconds between outbox checks when nothing is pending
+
+
+def backoff(attempts):
+    return min(BACKOFF_BASE * 2 ** attempts, BACKOFF_MAX)
+
+
+class UploadQueue:
+
+    def __init__(self, destination, send, my_grid, batch_size=UPLOAD_BATCH, min_batch=1, max_delay=0):
+        """
+        destination: outbox destination this worker drains ('QRZ', 'LOTW').
+        send(qsos, replace): runs on the worker thread and returns (qso_id, status, detail) for every
+        QSO, status 'sent' (detail is the remote log id), 'retry' or 'failed' (detail is the reason).
+        replace maps the qso_id of QSOs uploaded before and queued again after an edit to the
+        remote log id of that upload (None if the service didn't return one).
+        An exception from send() retries the whole batch.
+        min_batch/max_delay: wait until min_batch QSOs are pending or the oldest has waited
+        max_delay seconds before sending.
+        """
+        self.destination = destination
+        self.send = send
+        self.my_grid = my_grid
+        self.batch_size = batch_size
+        self.min_batch = min_batch
+        self.max_delay = max_delay
+        self.last_error = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f"upload-{destination}", daemon=True)
+        self.thread.start()
+
+    def wake(self):
+        # Something was queued, check the outbox now instead of at the next timeout
+        self._wake.set()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        self.thread.join(timeout)
+
+    def _run(self):
+        worker_db = Db(self.my_grid)  # SQLite connections belong to the thread that opened them
+        try:
+            while not self._stop.is_set():
+                try:
+                    wait = self._drain(worker_db)
+                except Exception as e:
+                    self.last_error = str(e)
+                    wait = IDLE_WAIT
+                self._wake.wait(wait)
+                self._wake.clear()
+        finally:
+            worker_db.close()
+
+    def _drain(self, worker_db):
+        # Send batches until nothing is due, then return how long to sleep
+        while not self._stop.is_set():
+            count, oldest, next_due = worker_db.pending_uploads(self.destination)
+            if not count:
+                return IDLE_WAIT
+            now = time.time()
+            if next_due > now:
+                return next_due - now
+            if count < self.min_batch and now - oldest < self.max_delay:
+                return oldest + self.max_delay - now
+            due = worker_db.due_uploads(self.destination, self.batch_size, now)
+            if not due:
+                return IDLE_WAIT
+            self._send_batch(worker_db, due)
+        return 0
+
+    def _send_batch(self, worker_db, due):
+        attempts = {qso.qso_id: tries for tries, qso, _, _ in due}
+        qsos = [qso for _, qso, _, _ in due]
+        replace = {qso.qso_id: logid for _, qso, sent_before, logid in due if sent_before}
+        try:
+            results = self.send(qsos, replace)
+        except Exception as e:
+            results = [(qso.qso_id, "retry", str(e)) for qso in qsos]
+        answered = {qso_id for qso_id, _, _ in results}
+        results += [(qso.qso_id, "retry", "No result") for qso in qsos if qso.qso_id not in answered]
+        now = int(time.time())
+        sent, retry, failed = [], [], []
+        for qso_id, status, detail in results:
+            if status == "sent":
+                sent.append((qso_id, detail))
+            elif status == "retry" and attempts[qso_id] + 1 < MAX_ATTEMPTS:
+                retry.append((qso_id, now + backoff(attempts[qso_id]), detail))
+            else:
+                failed.append((qso_id, detail))
+        worker_db.record_uploads(self.destination, sent, retry, failed)
+        self.last_error = (retry or failed)[-1][-1] if retry or failed else None
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# VirtualRadio.py
+# A pseudo-terminal that answers the FA/MD CAT dialect like a Kenwood/Yaesu-style radio,
+# so Cat can be exercised and measured without a transceiver on /dev/ttyUSB0.
+# Replies can be delayed, jittered, fragmented, dropped or mixed with garbage bytes.
+import argparse
+import configparser
+import os
+import random
+import select
+import threading
+import time
+import tty
+from Cat import modes
+
+GARBAGE = b"\x00\xff\r\n#~?@"  # Bytes a noisy line might add, never a ';'
+
+
+class VirtualRadio:
+
+    def __init__(self, freq_cmd="FA", mode_cmd="MD", delay_ms=0, jitter_ms=0,
+                 fragment=0.0, garbage=0.0, drop=0.0, auto_info=True, seed=None):
+        """
+        delay_ms/jitter_ms: reply delay, plus a uniform random 0..jitter_ms.
+        fragment: probability a reply is written in several pieces.
+        garbage: probability of noise bytes before a reply.
+        drop: probability a query gets no reply at all.
+        auto_info: answer AI commands, otherwise reply '?;' like a radio without AI.
+        """
+        self.freq_cmd = freq_cmd
+        self.mode_cmd = mode_cmd
+        self.delay = delay_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.fragment = fragment
+        self.garbage = garbage
+        self.drop = drop
+        self.supports_ai = auto_info
+        self.ai = 0
+        self.freq = 14074000
+        self.mode = modes.index("DIGI")
+        self.queries = 0
+        self._random = random.Random(seed)
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)  # No echo or line editing until the client configures the port
+        self.port = os.ttyname(self._slave)
+        self.thread = threading.Thread(target=self._serve, name="virtual-radio", daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self._stop.set()
+        self.thread.join()
+        os.close(self._master)
+        os.close(self._slave)
+
+    def tune(self, freq=None, mode=None):
+        # Turn the dial: change the radio state and push it if auto-information is on
+        if freq is not None:
+            self.freq = freq
+            if self.ai:
+                self._reply(f"{self.freq_cmd}{self.freq:011d};")
+        if mode is not None:
+            self.mode = mode
+            if self.ai:
+                self._reply(f"{self.mode_cmd}{self.mode};")
+
+    def _serve(self):
+        buffer = b""
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._master], [], [], 0.05)
+            if not ready:
+                continue
+            try:
+                buffer += os.read(self._master, 1024)
+            except OSError:
+                continue  # Client closed the port, wait for the next one
+            *commands, buffer = buffer.split(b";")
+            for command in commands:
+                reply = self._answer(command.decode("ascii", errors="ignore").strip())
+                if reply:
+                    self._reply(reply)
+
+    def _answer(self, command):
+        if command == self.freq_cmd:
+            self.queries += 1
+            return f"{self.freq_cmd}{self.freq:011d};"
+        if command == self.mode_cmd:
+            self.queries += 1
+            return f"{self.mode_cmd}{self.mode};"
+        if command.startswith(self.freq_cmd) and command[len(self.freq_cmd):].isdigit():
+            self.freq = int(command[len(self.freq_cmd):])
+            return None
+        if command.startswith("AI") and self.supports_ai:
+            if command == "AI":
+                return f"AI{self.ai};"
+            if command[2:].isdigit():
+                self.ai = int(command[2:])
+            return None
+        return "?;"
+
+    def _reply(self, reply):
+        if self._random.random() < self.drop:
+            return
+        wait = self.delay + self._random.uniform(0, self.jitter)
+        if wait > 0:
+            time.sleep(wait)
+        data = reply.encode("ascii")
+        if self._random.random() < self.garbage:
+            data = bytes(self._random.choice(GARBAGE) for _ in range(self._random.randint(1, 8))) + data
+        self._send_bytes(data)
+
+    def _send_bytes(self, data):
+        with self._write_lock:
+            if self._random.random() < self.fragment and len(data) > 1:
+                cut = self._random.randint(1, len(data) - 1)
+                os.write(self._master, data[:cut])
+                time.sleep(0.002)
+                os.write(self._master, data[cut:])
+            else:
+                os.write(self._master, data)
+
+
+def radio_from_args(args):
+    config = configparser.ConfigParser()
+    config.read(args.config)
+    cat = config['CAT'] if 'CAT' in config else {}
+    return VirtualRadio(
+        freq_cmd=cat.get('freq_cmd', 'FA'), mode_cmd=cat.get('mode_cmd', 'MD'),
+        delay_ms=args.delay, jitter_ms=args.jitter, fragment=args.fragment, garbage=args.garbage,
+        drop=args.drop, auto_info=not args.no_ai, seed=args.seed)
+
+
+def add_radio_arguments(parser):
+    parser.add_argument("--config", default="config.ini", help="config file with the [CAT] command dialect")
+    parser.add_argument("--delay", type=float, default=5, help="reply delay in ms")
+    parser.add_argument("--jitter", type=float, default=5, help="extra random reply delay in ms")
+    parser.add_argument("--fragment", type=float, default=0.0, help="probability a reply is split")
+    parser.add_argument("--garbage", type=float, default=0.0, help="probability of noise before a reply")
+    parser.add_argument("--drop", type=float, default=0.0, help="probability a reply is lost")
+    parser.add_argument("--no-ai", action="store_true", help="behave like a radio without auto-information")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for repeatable runs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Virtual CAT radio on a pseudo-terminal")
+    add_radio_arguments(parser)
+    parser.add_argument("--sweep", type=float, default=0, help="retune by 1 kHz every this many seconds")
+    args = parser.parse_args()
+    radio = radio_from_args(args)
+    print(f"Virtual radio on {radio.port}, set com_port = {radio.port} in [CAT]. Ctrl-C to stop.")
+    try:
+        while True:
+            time.sleep(args.sweep or 1)
+            if args.sweep:
+                radio.tune(freq=radio.freq + 1000)
+    except KeyboardInterrupt:
+        radio.close()
@@ -15,14 +15,22 @@ mkdir -p $PKGDIR/usr/share/doc/${APP}
 
 # Project files:
 cp QsoLogBook.py \
+   MainWindow.py \
+   Adif.py \
+   BandPlan.py \
    Cat.py \
    ConfigWindow.py \
    Crypto.py \
+   DupeIndex.py \
+   ExportWindow.py \
    LastQSOs.py \
    LogDatabase.py \
+   ProgressWindow.py \
    Lotw.py \
    QrzApi.py \
+   QrzCache.py \
    Qso.py \
+   UploadQueue.py \
    QsoLogBook.py \
    config.ini \
    $PKGDIR/usr/share/${APP}/
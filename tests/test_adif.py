@@ -0,0 +1,78 @@
+# Tests for the streaming ADIF tokenizer and the record range splitter.
+import os
+import tempfile
+import unittest
+
+from Adif import find_record_ranges, parse_adif_chunks, read_adif_file, read_adif_range
+
+SAMPLE = ("Exported log <ADIF_VER:5>3.1.4 <PROGRAMID:9>QsoLogBook\n<EOH>\n"
+          "<CALL:5>K1ABC <QSO_DATE:8>20250101 <TIME_ON:4>1200 <BAND:3>20M <MODE:2>CW <EOR>\n"
+          "<call:5>K2ABC<qso_date:8:d>20250102<time_on:6>130000<band:3>40m<mode:3>SSB<eor>\n"
+          "<Call:4>W9EN <Name:4>José <Comment:10>has <a> tag <eOr>\n")
+
+EXPECTED = [
+    {"call": "K1ABC", "qso_date": "20250101", "time_on": "1200", "band": "20M", "mode": "CW"},
+    {"call": "K2ABC", "qso_date": "20250102", "time_on": "130000", "band": "40m", "mode": "SSB"},
+    {"call": "W9EN", "name": "José", "comment": "has <a> ta"},
+]
+
+
+class ParseAdifChunksTest(unittest.TestCase):
+
+    def test_header_is_dropped_and_tags_are_case_insensitive(self):
+        self.assertEqual(list(parse_adif_chunks([SAMPLE])), EXPECTED)
+
+    def test_tags_and_values_split_across_chunks(self):
+        for size in (1, 2, 3, 7, 64):
+            chunks = [SAMPLE[i:i + size] for i in range(0, len(SAMPLE), size)]
+            self.assertEqual(list(parse_adif_chunks(chunks)), EXPECTED, f"chunk size {size}")
+
+    def test_file_without_header(self):
+        self.assertEqual(list(parse_adif_chunks(["<call:5>K1ABC<eor>"])), [{"call": "K1ABC"}])
+
+    def test_empty_and_unterminated_records_are_not_yielded(self):
+        records = list(parse_adif_chunks(["<eor><eor><call:5>K1ABC<eor><call:5>K2ABC<band:3>20M"]))
+        self.assertEqual(records, [{"call": "K1ABC"}])
+
+    def test_bad_lengths(self):
+        # A length that isn't a number reads as empty, the text after it is skipped
+        self.assertEqual(list(parse_adif_chunks(["<call:x>K1ABC<band:3>20M<eor>"])), [{"call": "", "band": "20M"}])
+        # A length running past the end of the data never yields a record
+        self.assertEqual(list(parse_adif_chunks(["<call:5>K1ABC<eor><call:50>K2ABC<eor>"])), [{"call": "K1ABC"}])
+
+
+class AdifFileTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".adi")
+        with os.fdopen(fd, "wb") as f:
+            f.write(SAMPLE.encode("utf-8"))
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_multibyte_characters_split_across_reads(self):
+        progress = []
+        records = list(read_adif_file(self.path, chunk_size=1, progress=lambda done, total: progress.append((done, total))))
+        self.assertEqual(records, EXPECTED)
+        size = os.path.getsize(self.path)
+        self.assertEqual(progress[-1], (size, size))
+
+    def test_ranges_end_at_records_and_cover_the_file(self):
+        for count in (1, 2, 3, 10):
+            ranges = find_record_ranges(self.path, count)
+            self.assertEqual(ranges[0][0], 0)
+            self.assertEqual(ranges[-1][1], os.path.getsize(self.path))
+            for (_, end), (start, _) in zip(ranges, ranges[1:]):
+                self.assertEqual(end, start)
+            records = [record for start, end in ranges for record in read_adif_range(self.path, start, end)]
+            self.assertEqual(records, EXPECTED, f"{count} ranges")
+
+    def test_empty_file_has_no_ranges(self):
+        open(self.path, "wb").close()
+        self.assertEqual(find_record_ranges(self.path, 4), [])
+        self.assertEqual(list(read_adif_file(self.path)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
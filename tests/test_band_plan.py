@@ -0,0 +1,51 @@
+# Tests for the IARU band plan lookups.
+import unittest
+
+import BandPlan
+from BandPlan import REGION_EDGES, band_for_freq, band_for_mhz, bands_for_freqs
+from Cat import bands
+
+
+class BandPlanTest(unittest.TestCase):
+
+    def tearDown(self):
+        BandPlan.set_region(BandPlan.DEFAULT_REGION)
+
+    def test_every_band_is_in_the_band_menu(self):
+        for region, edges in REGION_EDGES.items():
+            for _, _, band in edges:
+                self.assertIn(band, bands, f"region {region}")
+
+    def test_tables_are_sorted_and_do_not_overlap(self):
+        for edges in REGION_EDGES.values():
+            for (low, high, _), (next_low, _, _) in zip(edges, edges[1:]):
+                self.assertLess(low, high)
+                self.assertLess(high, next_low)
+
+    def test_band_edges(self):
+        self.assertEqual(band_for_freq(14000000), "20M")
+        self.assertEqual(band_for_freq(14350000), "20M")
+        self.assertIsNone(band_for_freq(14350001))
+        self.assertIsNone(band_for_freq(100))
+        self.assertIsNone(band_for_freq(None))
+
+    def test_regions_differ(self):
+        self.assertEqual(band_for_mhz("3.900", region=2), "80M")
+        self.assertIsNone(band_for_mhz("3.900", region=1))
+        BandPlan.set_region(1)
+        self.assertEqual(band_for_mhz("70.2"), "4M")
+        BandPlan.set_region("bad")
+        self.assertEqual(BandPlan.current_region, BandPlan.DEFAULT_REGION)
+
+    def test_band_for_mhz_ignores_bad_input(self):
+        self.assertEqual(band_for_mhz(7.074), "40M")
+        self.assertIsNone(band_for_mhz(""))
+        self.assertIsNone(band_for_mhz("abc"))
+
+    def test_bands_for_freqs_matches_single_lookups(self):
+        freqs = [14074000, None, 7074000, 15000000, 14074000, 136000]
+        self.assertEqual(bands_for_freqs(freqs), [band_for_freq(hz) for hz in freqs])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,256 @@
+# Tests for the CAT drivers against stand-in radios.
+import configparser
+import socket
+import threading
+import time
+import unittest
+from unittest import mock
+
+from Cat import Cat, RigctldCat, open_cat
+from VirtualRadio import VirtualRadio
+
+WAIT = 3.0  # Seconds a test waits for the reader thread to catch up
+
+
+def wait_for(condition, timeout=WAIT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class FakeRigctld:
+    """
+    Answers '+f' and '+m' like rigctld with the extended response protocol, one client
+    at a time. freq_error/mode_error make the answer an 'RPRT <error>' line instead,
+    split sends every answer a byte at a time, drop() closes the client connection.
+    """
+
+    def __init__(self):
+        self.freq = 14074000
+        self.mode = "PKTUSB"
+        self.freq_error = self.mode_error = None
+        self.split = False
+        self.connections = 0
+        self.queries = 0
+        self._client = None
+        self._server = socket.create_server(("127.0.0.1", 0))
+        self._server.settimeout(0.05)
+        self.port = self._server.getsockname()[1]
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        self._server.close()
+        self.drop()
+        self._thread.join()
+
+    def drop(self):
+        # Shut the client connection down, the serving thread closes it
+        client, self._client = self._client, None
+        if client:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass  # Already gone
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                continue
+            self.connections += 1
+            self._client = client
+            try:
+                self._talk(client)
+            except OSError:
+                pass  # Dropped
+            client.close()
+
+    def _talk(self, client):
+        client.settimeout(0.05)
+        buffer = b""
+        while not self._stop.is_set() and self._client is client:
+            try:
+                data = client.recv(1024)
+            except socket.timeout:
+                continue
+            if not data:
+                return
+            buffer += data
+            *commands, buffer = buffer.split(b"\n")
+            for command in commands:
+                command = command.decode("ascii").strip()
+                if command == "q":
+                    return
+                self._send(client, self._answer(command))
+
+    def _answer(self, command):
+        self.queries += 1
+        if command == "+f":
+            if self.freq_error is not None:
+                return f"get_freq:\nRPRT {self.freq_error}\n"
+            return f"get_freq:\nFrequency: {self.freq}\nRPRT 0\n"
+        if command == "+m":
+            if self.mode_error is not None:
+                return f"get_mode:\nRPRT {self.mode_error}\n"
+            return f"get_mode:\nMode: {self.mode}\nPassband: 3000\nRPRT 0\n"
+        return "RPRT -4\n"  # Not implemented
+
+    def _send(self, client, answer):
+        data = answer.encode("ascii")
+        if self.split:
+            for i in range(len(data)):
+                client.sendall(data[i:i + 1])
+        else:
+            client.sendall(data)
+
+
+def rigctld_config(port):
+    config = configparser.ConfigParser()
+    config["CAT"] = {"driver": "rigctld", "rigctld_host": "127.0.0.1", "rigctld_port": str(port), "poll_ms": "20"}
+    return config
+
+
+class RigctldCatTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rig = FakeRigctld()
+        self.cat = open_cat(rigctld_config(self.rig.port))
+
+    def tearDown(self):
+        self.cat.disconnect()
+        self.rig.close()
+
+    def test_open_cat_selects_rigctld(self):
+        self.assertIsInstance(self.cat, RigctldCat)
+
+    def test_extended_responses_are_parsed(self):
+        self.assertTrue(self.cat.connect())
+        self.assertTrue(wait_for(lambda: self.cat.get_freq_band_mode() == ("14.074", "20M", "DIGI")))
+
+    def test_answers_split_across_reads_are_parsed(self):
+        self.rig.split = True
+        self.rig.freq, self.rig.mode = 7030000, "CW"
+        self.assertTrue(self.cat.connect())
+        self.assertTrue(wait_for(lambda: self.cat.get_freq_band_mode() == ("7.03", "40M", "CW")))
+
+    def test_changes_bump_the_snapshot_version(self):
+        self.cat.connect()
+        self.assertTrue(wait_for(lambda: self.cat.snapshot()[1] == "14.074"))
+        version = self.cat.snapshot()[0]
+        self.rig.freq = 14075000
+        self.assertTrue(wait_for(lambda: self.cat.snapshot()[1] == "14.075"))
+        self.assertGreater(self.cat.snapshot()[0], version)
+
+    def test_out_of_band_frequency_clears_the_band(self):
+        self.cat.connect()
+        self.assertTrue(wait_for(lambda: self.cat.snapshot()[2] == "20M"))
+        self.rig.freq = 15000000  # Between 20M and 17M
+        self.assertTrue(wait_for(lambda: self.cat.get_freq_band_mode()[:2] == ("15.0", "")))
+
+    def test_rprt_error_keeps_polling(self):
+        self.rig.freq_error = -11  # Feature not available
+        self.cat.connect()
+        self.assertTrue(wait_for(lambda: self.cat.get_freq_band_mode() == (None, None, "DIGI")))
+        queries = self.rig.queries
+        self.assertTrue(wait_for(lambda: self.rig.queries >= queries + 6))  # Each RPRT closed its query
+        self.rig.freq_error = None
+        self.assertTrue(wait_for(lambda: self.cat.snapshot()[1] == "14.074"))
+        self.assertIsNone(self.cat.error)
+
+    def test_dropped_connection_is_reported(self):
+        self.cat.connect()
+        self.assertTrue(wait_for(lambda: self.cat.snapshot()[1] == "14.074"))
+        self.rig.drop()
+        self.assertTrue(wait_for(lambda: self.cat.error is not None))
+
+    def test_reconnect_after_a_drop(self):
+        self.cat.connect()
+        self.assertTrue(wait_for(lambda: self.cat.snapshot()[1] == "14.074"))
+        self.rig.drop()
+        self.assertTrue(wait_for(lambda: self.cat.error is not None))
+        self.cat.disconnect()
+        self.rig.freq = 3573000
+        self.assertTrue(self.cat.connect())
+        self.assertIsNone(self.cat.error)
+        self.assertTrue(wait_for(lambda: self.cat.get_freq_band_mode()[:2] == ("3.573", "80M")))
+        self.assertEqual(self.rig.connections, 2)
+
+    def test_connect_fails_without_rigctld(self):
+        port = self.rig.port
+        self.rig.close()
+        self.rig = FakeRigctld()  # For tearDown
+        cat = RigctldCat(rigctld_config(port))
+        self.assertFalse(cat.connect())
+        self.assertFalse(cat.is_open())
+
+
+def serial_config(port, auto_info="AI2"):
+    config = configparser.ConfigParser()
+    config["CAT"] = {"com_port": port, "baudrate": "38400", "freq_cmd": "FA", "mode_cmd": "MD", "auto_info": auto_info, "poll_ms": "20"}
+    return config
+
+
+@mock.patch("Cat.AI_TIMEOUT", 0.2)
+@mock.patch("Cat.AI_KEEPALIVE", 0.2)
+class SerialAutoInfoTest(unittest.TestCase):
+
+    def setUp(self):
+        self.radio = VirtualRadio(delay_ms=0, jitter_ms=0, seed=1)
+        self.cat = Cat(serial_config(self.radio.port))
+
+    def tearDown(self):
+        self.cat.disconnect()
+        self.radio.close()
+
+    def queries_in(self, seconds):
+        queries = self.radio.queries
+        time.sleep(seconds)
+        return self.radio.queries - queries
+
+    def test_auto_info_replaces_polling(self):
+        self.assertTrue(self.cat.connect())
+        self.assertTrue(wait_for(lambda: self.cat.auto_info_active))
+        self.assertLess(self.queries_in(0.5), 12)  # Only the keepalives, polling would be ~50
+        self.radio.tune(freq=7074000)
+        self.assertTrue(wait_for(lambda: self.cat.snapshot()[1] == "7.074"))
+        self.assertTrue(self.cat.auto_info_active)
+
+    def test_tuning_out_of_band_clears_the_band(self):
+        self.cat.connect()
+        self.assertTrue(wait_for(lambda: self.cat.snapshot()[2] == "20M"))
+        self.radio.tune(freq=14500000)
+        self.assertTrue(wait_for(lambda: self.cat.get_freq_band_mode()[:2] == ("14.5", "")))
+
+    def test_radio_leaving_auto_info_falls_back_to_polling(self):
+        self.cat.connect()
+        self.assertTrue(wait_for(lambda: self.cat.auto_info_active))
+        self.radio.ai = 0  # Switched off and on again, the radio no longer pushes changes
+        self.assertTrue(wait_for(lambda: not self.cat.auto_info_active))
+        self.radio.tune(freq=3573000)
+        self.assertTrue(wait_for(lambda: self.cat.snapshot()[1] == "3.573"))
+        self.assertGreater(self.queries_in(0.5), 12)
+
+    def test_unanswered_keepalive_falls_back_to_polling(self):
+        self.cat.connect()
+        self.assertTrue(wait_for(lambda: self.cat.auto_info_active))
+        self.radio.supports_ai = False  # AI; is answered with '?;'
+        self.assertTrue(wait_for(lambda: not self.cat.auto_info_active))
+        self.assertGreater(self.queries_in(0.5), 12)
+
+    def test_radio_without_auto_info_is_polled(self):
+        self.radio.supports_ai = False
+        self.cat.connect()
+        self.assertTrue(wait_for(lambda: self.cat.snapshot()[1] == "14.074"))
+        self.assertFalse(self.cat.auto_info_active)
+        self.assertGreater(self.queries_in(0.5), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
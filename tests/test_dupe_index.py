@@ -0,0 +1,52 @@
+# Tests for the in-memory duplicate index.
+import unittest
+
+from DupeIndex import DupeIndex
+
+WINDOW = 15 * 60
+
+
+class DupeIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = DupeIndex(WINDOW)
+        self.index.add(1, "K1ABC", "20M", "CW", 10 * WINDOW)
+
+    def test_same_call_band_and_mode_within_the_window_is_a_dupe(self):
+        self.assertEqual(self.index.find("k1abc", "20m", "cw", 10 * WINDOW + 60), 1)
+        self.assertEqual(self.index.find("K1ABC", "20M", "CW", 10 * WINDOW - WINDOW), 1)  # Previous slot
+        self.assertEqual(self.index.find("K1ABC", "20M", "CW", 11 * WINDOW), 1)  # Next slot, window edge
+
+    def test_other_band_mode_call_or_time_is_not_a_dupe(self):
+        self.assertIsNone(self.index.find("K1ABC", "40M", "CW", 10 * WINDOW))
+        self.assertIsNone(self.index.find("K1ABC", "20M", "SSB", 10 * WINDOW))
+        self.assertIsNone(self.index.find("K2ABC", "20M", "CW", 10 * WINDOW))
+        self.assertIsNone(self.index.find("K1ABC", "20M", "CW", 11 * WINDOW + 1))
+
+    def test_exclude_skips_the_qso_being_edited(self):
+        self.assertIsNone(self.index.find("K1ABC", "20M", "CW", 10 * WINDOW, exclude=1))
+
+    def test_missing_call_or_time_never_matches(self):
+        self.index.add(2, "", "20M", "CW", 10 * WINDOW)
+        self.index.add(3, "K3ABC", "20M", "CW", None)
+        self.assertEqual(len(self.index), 1)
+        self.assertIsNone(self.index.find("K1ABC", "20M", "CW", None))
+
+    def test_add_moves_and_remove_drops_a_qso(self):
+        self.index.add(1, "K1ABC", "40M", "CW", 10 * WINDOW)  # Edited band
+        self.assertIsNone(self.index.find("K1ABC", "20M", "CW", 10 * WINDOW))
+        self.assertEqual(self.index.find("K1ABC", "40M", "CW", 10 * WINDOW), 1)
+        self.index.remove(1)
+        self.index.remove(1)  # Removing twice is harmless
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(self.index._buckets, {})
+
+    def test_closest_picks_the_nearest_qso(self):
+        self.index.add(2, "K1ABC", "20M", "CW", 10 * WINDOW + 300)
+        self.assertEqual(self.index.closest("K1ABC", "20M", "CW", 10 * WINDOW + 200), 2)
+        self.assertEqual(self.index.closest("K1ABC", "20M", "CW", 10 * WINDOW - 100), 1)
+        self.assertIsNone(self.index.closest("K1ABC", "20M", "CW", 12 * WINDOW))
+
+
+if __name__ == "__main__":
+    unittest.main()
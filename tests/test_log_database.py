@@ -0,0 +1,137 @@
+# Tests for the change sequence, merges, LoTW confirmations and the upload outbox of LogDatabase.
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from LogDatabase import LogDatabase
+from Qso import Qso
+
+
+def make_qso(i, **fields):
+    return Qso(str(i), fields.pop("callsign", f"K{i}ABC"), date="2025-01-01", time="%04d" % (1200 + i % 60), band="20M", mode="CW", **fields)
+
+
+class LogDatabaseTest(unittest.TestCase):
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        os.chdir(tempfile.mkdtemp())  # qso_log.db is created in the working directory
+        self.db = LogDatabase("FN31")
+
+    def tearDown(self):
+        self.db.close()
+        os.chdir(self._cwd)
+
+    def change_seqs(self):
+        return [row[0] for row in self.db.conn.execute('SELECT change_seq FROM logbook ORDER BY rowid;')]
+
+    def test_inserts_continue_the_change_sequence(self):
+        self.db.bulk_insert_qsos([make_qso(i) for i in range(1, 4)])
+        self.db.insert_qso(make_qso(4))
+        self.db.bulk_insert_qsos([make_qso(i) for i in range(5, 9)], batch_size=3, cancel=threading.Event())
+        self.assertEqual(self.change_seqs(), list(range(1, 9)))
+        self.assertEqual(self.db.last_change_seq(), 8)
+
+    def test_rows_inserted_without_change_seq_are_stamped(self):
+        self.db.insert_qso(make_qso(1))
+        self.db.conn.execute("INSERT INTO logbook (Call, Date, Time, Band, Mode, My_Grid) VALUES ('K2ABC', '2025-01-01', '1300', '20M', 'CW', 'FN31');")
+        self.db.conn.commit()
+        self.assertEqual(self.change_seqs(), [1, 2])
+
+    def test_edits_move_the_change_sequence(self):
+        self.db.bulk_insert_qsos([make_qso(i) for i in range(1, 4)])
+        self.db.update_qso(make_qso(1, remarks="edited"))
+        self.assertEqual(self.change_seqs(), [4, 2, 3])
+
+    def test_updates_that_change_nothing_keep_the_change_seq(self):
+        self.db.bulk_insert_qsos([make_qso(i, freq="14.074") for i in range(1, 3)])
+        self.db.update_qso(make_qso(1, freq="14.074"))
+        self.db.repair_missing_bands()
+        self.assertEqual(self.change_seqs(), [1, 2])
+        self.assertEqual(self.db.enqueue_changes("QRZ"), 2)
+        self.db.update_qso(make_qso(2, freq="14.074"))
+        self.assertEqual(self.db.enqueue_changes("QRZ"), 0)
+        self.db.update_qso(make_qso(2, freq="14.075"))
+        self.assertEqual(self.change_seqs(), [1, 3])
+
+    def test_merge_counts_only_rows_it_changes(self):
+        self.db.bulk_insert_qsos([make_qso(i, grid="FN42") for i in range(1, 3)])
+        self.assertEqual(self.db.merge_qsos([(1, make_qso(1, grid="EN53")), (2, make_qso(2, name="Bob"))]), 1)
+        self.assertEqual(self.change_seqs(), [1, 3])
+        self.assertEqual(self.db.merge_qsos([(2, make_qso(2, name="Bob")), (1, make_qso(1))]), 0)
+        self.assertEqual(self.change_seqs(), [1, 3])
+        row = self.db.fetch_qso_by_id(1)
+        self.assertIn("FN42", row)  # Logged values are never overwritten
+        self.assertNotIn("EN53", row)
+
+    def test_lotw_confirmations_match_the_nearest_qso(self):
+        self.db.bulk_insert_qsos([
+            Qso("1", "K1ABC", date="2025-01-01", time="1200", band="20M", mode="CW"),
+            Qso("2", "K1ABC", date="2025-01-01", time="1215", band="20M", mode="CW"),
+            Qso("3", "K2ABC", date="2025-01-01", time="1300", band="40M", mode="USB"),
+            Qso("4", "K3ABC", date="2025-01-01", time="1400", band="20M", mode="FT8"),
+        ])
+        with open("lotwreport.adi", "w") as f:
+            f.write("<PROGRAMID:4>LoTW<EOH>\n"
+                    "<CALL:5>K1ABC<BAND:3>20m<MODE:2>CW<QSO_DATE:8>20250101<TIME_ON:6>121400<QSL_RCVD:1>Y<QSLRDATE:8>20250105<EOR>\n"
+                    "<CALL:5>K2ABC<BAND:3>40M<MODE:3>SSB<APP_LOTW_MODEGROUP:5>PHONE<QSO_DATE:8>20250101<TIME_ON:6>132500<QSL_RCVD:1>Y<QSLRDATE:8>20250106<EOR>\n"
+                    "<CALL:5>K3ABC<BAND:3>20M<MODE:3>FT8<QSO_DATE:8>20250101<TIME_ON:6>150000<QSL_RCVD:1>Y<QSLRDATE:8>20250107<EOR>\n"
+                    "<CALL:5>K1ABC<BAND:3>20M<MODE:2>CW<QSO_DATE:8>20250101<TIME_ON:6>120000<QSL_RCVD:1>N<EOR>\n")
+        self.assertEqual(self.db.import_lotw_confirmations("lotwreport.adi"),
+                         (True, "LoTW merge successful: 2 newly confirmed, 0 already confirmed, 1 not found in the log"))
+        rows = self.db.conn.execute('SELECT lotw_qsl_rcvd, lotw_qsl_date FROM logbook ORDER BY rowid;').fetchall()
+        self.assertEqual(rows, [(None, None), ("Y", "2025-01-05"), ("Y", "2025-01-06"), (None, None)])
+        # Merging the same report again is harmless
+        self.assertEqual(self.db.import_lotw_confirmations("lotwreport.adi")[1],
+                         "LoTW merge successful: 0 newly confirmed, 2 already confirmed, 1 not found in the log")
+
+    def test_edit_of_an_uploaded_qso_is_queued_as_a_replacement(self):
+        qso_id = self.db.insert_qso(make_qso(1))
+        self.db.enqueue_uploads([qso_id], "QRZ")
+        [(attempts, qso, sent_before, logid)] = self.db.due_uploads("QRZ", 10)
+        self.assertEqual((attempts, qso.qso_id, sent_before, logid), (0, qso_id, False, None))
+        self.db.record_uploads("QRZ", sent=[(qso_id, 77)])
+        self.assertEqual(self.db.due_uploads("QRZ", 10), [])
+
+        self.db.update_qso(make_qso(qso_id, callsign="K1ABD"))
+        self.assertEqual(self.db.enqueue_changes("QRZ"), 1)
+        [(_, qso, sent_before, logid)] = self.db.due_uploads("QRZ", 10)
+        self.assertEqual((qso.callsign, sent_before, logid), ("K1ABD", True, "77"))
+        # A replacement answered without a logid keeps the known one
+        self.db.record_uploads("QRZ", sent=[(qso_id, None)])
+        self.db.enqueue_uploads([qso_id], "QRZ")
+        self.assertEqual(self.db.due_uploads("QRZ", 10)[0][2:], (True, "77"))
+
+    def test_logged_qso_is_queued_in_the_same_transaction(self):
+        qso_id = self.db.insert_qso(make_qso(1), ["QRZ", "LOTW"])
+        self.assertEqual(self.db.outbox_stats(), {"QRZ": {"pending": 1}, "LOTW": {"pending": 1}})
+        with mock.patch.object(self.db, "_enqueue_uploads", side_effect=sqlite3.OperationalError("disk I/O error")):
+            with self.assertRaises(sqlite3.OperationalError):
+                self.db.insert_qso(make_qso(2), ["QRZ"])
+            with self.assertRaises(sqlite3.OperationalError):
+                self.db.update_qso(make_qso(qso_id, remarks="edited"), ["QRZ"])
+        self.assertEqual(self.db.get_current_row_count(), 1)  # Neither the QSO nor the edit without its outbox row
+        self.assertEqual(self.db.fetch_qso_by_id(qso_id)[16], "")
+        self.assertEqual(self.db.outbox_stats(), {"QRZ": {"pending": 1}, "LOTW": {"pending": 1}})
+
+    def test_edit_is_queued_again(self):
+        qso_id = self.db.insert_qso(make_qso(1), ["QRZ"])
+        self.db.record_uploads("QRZ", sent=[(qso_id, 3)])
+        self.db.update_qso(make_qso(qso_id, remarks="edited"), ["QRZ"])
+        [(_, qso, sent_before, logid)] = self.db.due_uploads("QRZ", 10)
+        self.assertEqual((qso.remarks, sent_before, logid), ("edited", True, "3"))
+
+    def test_sync_does_not_requeue_unchanged_qsos(self):
+        qso_id = self.db.insert_qso(make_qso(1))
+        self.db.enqueue_uploads([qso_id], "QRZ")
+        self.assertEqual(self.db.enqueue_changes("QRZ"), 0)
+        self.db.record_uploads("QRZ", sent=[(qso_id, 5)])
+        self.assertEqual(self.db.enqueue_changes("QRZ"), 0)
+        self.assertEqual(self.db.pending_uploads("QRZ")[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+# Tests for Lotw.upload_qsos with a stub tqsl script on PATH.
+import configparser
+import os
+import stat
+import tempfile
+import unittest
+
+os.environ["HOME"] = tempfile.mkdtemp()  # Crypto creates its key file in the home directory
+
+from Lotw import Lotw
+from Qso import Qso
+
+# Records its arguments and input file, prints a status line and exits with $TQSL_EXIT
+STUB_TQSL = """#!/bin/sh
+dir="$(dirname "$0")"
+for last in "$@"; do :; done
+echo "$@" > "$dir/args"
+echo "$last" > "$dir/input_path"
+cp "$last" "$dir/input"
+echo "tqsl stub: exit ${TQSL_EXIT:-0}" >&2
+exit ${TQSL_EXIT:-0}
+"""
+
+
+class LotwUploadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.bin_dir = tempfile.mkdtemp()
+        tqsl = os.path.join(self.bin_dir, "tqsl")
+        with open(tqsl, "w") as f:
+            f.write(STUB_TQSL)
+        os.chmod(tqsl, os.stat(tqsl).st_mode | stat.S_IXUSR)
+        self._environ = dict(os.environ)
+        os.environ["PATH"] = self.bin_dir + os.pathsep + os.environ.get("PATH", "")
+        config = configparser.ConfigParser()
+        config["LOTW"] = {"location": "Home"}
+        self.lotw = Lotw(config)
+        self.qsos = [Qso(str(i), "K1ABC", date="2025-01-01", time="120%d" % i, band="20M", mode="CW") for i in (1, 2)]
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self._environ)
+
+    def upload(self, exit_code):
+        os.environ["TQSL_EXIT"] = str(exit_code)
+        return self.lotw.upload_qsos(self.qsos)
+
+    def statuses(self, results):
+        return {status for _, status, _ in results}
+
+    def test_signs_the_whole_batch_in_one_run(self):
+        self.assertEqual(self.upload(0), [("1", "sent", None), ("2", "sent", None)])
+        with open(os.path.join(self.bin_dir, "input")) as f:
+            adif = f.read()
+        self.assertEqual(adif.count("<eor>"), 2)
+        with open(os.path.join(self.bin_dir, "args")) as f:
+            args = f.read().split()
+        self.assertEqual(args[args.index("-l") + 1], "Home")
+
+    def test_partial_upload_is_sent(self):
+        self.assertEqual(self.statuses(self.upload(9)), {"sent"})
+
+    def test_batch_of_duplicates_is_sent(self):
+        self.assertEqual(self.upload(8), [("1", "sent", None), ("2", "sent", None)])
+        with open(os.path.join(self.bin_dir, "args")) as f:
+            args = f.read().split()
+        self.assertEqual(args[args.index("-a") + 1], "compliant")
+
+    def test_nothing_processed_is_failed_with_tqsl_output_when_not_compliant(self):
+        os.environ["TQSL_EXIT"] = "8"
+        results = self.lotw.upload_qsos(self.qsos, duplicate_policy="all")
+        self.assertEqual(self.statuses(results), {"failed"})
+        self.assertEqual(results[0][2], "tqsl exit 8: tqsl stub: exit 8")
+
+    def test_server_errors_are_retried(self):
+        for code in (3, 11):
+            self.assertEqual(self.statuses(self.upload(code)), {"retry"})
+
+    def test_other_errors_are_failed(self):
+        for code in (1, 2, 4, 5, 6, 7, 10):
+            self.assertEqual(self.statuses(self.upload(code)), {"failed"})
+
+    def test_temp_file_is_removed(self):
+        for code in (0, 8):
+            self.upload(code)
+            with open(os.path.join(self.bin_dir, "input_path")) as f:
+                self.assertFalse(os.path.exists(f.read().strip()))
+
+    def test_missing_tqsl_is_retried_and_removes_temp_file(self):
+        os.environ["PATH"] = tempfile.mkdtemp()  # No tqsl anywhere
+        tmp = tempfile.mkdtemp()
+        old_tempdir, tempfile.tempdir = tempfile.tempdir, tmp
+        try:
+            results = self.lotw.upload_qsos(self.qsos)
+        finally:
+            tempfile.tempdir = old_tempdir
+        self.assertEqual(self.statuses(results), {"retry"})
+        self.assertEqual(os.listdir(tmp), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
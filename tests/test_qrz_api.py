@@ -0,0 +1,269 @@
+# Tests for QrzApi against a stand-in QRZ server on a loopback port.
+import configparser
+import os
+import re
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+os.environ["HOME"] = tempfile.mkdtemp()  # Crypto creates its key file in the home directory
+
+from QrzApi import QrzApi
+from Qso import Qso
+
+XMLNS = "http://xmldata.qrz.com"
+
+
+class FakeQrz(ThreadingHTTPServer):
+    """
+    Answers the XML lookup API on /xml and the logbook API on /api, counting logins
+    and TCP connections. expire() invalidates the current session key.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeQrzHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.logins = 0
+        self.session_key = None
+        self.api_key = "APIKEY"
+        self.uploads = []
+        self.options = []
+        self.records = {}  # logid: ADIF record in the QRZ logbook
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def expire(self):
+        with self.lock:
+            self.session_key = None
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class FakeQrzHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"  # Keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, body, content_type="text/xml"):
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        if path == "/xml":
+            # The XML API separates parameters with ';'
+            params = dict(item.split("=", 1) for item in query.split(";") if "=" in item)
+            self._reply(self._xml(params))
+        elif path == "/api":
+            params = dict(item.split("=", 1) for item in query.split("&") if "=" in item)
+            self._reply(self._logbook(params), "text/plain")
+        else:
+            self.send_error(404)
+
+    def _xml(self, params):
+        server = self.server
+        with server.lock:
+            if "username" in params:
+                if params.get("password") != "secret":
+                    return self._session(error="Username/password incorrect")
+                server.logins += 1
+                server.session_key = f"KEY{server.logins}"
+                return self._session(key=server.session_key)
+            if params.get("s") != server.session_key or server.session_key is None:
+                return self._session(error="Session Timeout")
+            call = params.get("callsign", "").upper()
+            key = server.session_key
+        return (f'<?xml version="1.0" ?><QRZDatabase xmlns="{XMLNS}">'
+                f'<Callsign><call>{call}</call><name>Test</name><grid>EN53xh</grid></Callsign>'
+                f'<Session><Key>{key}</Key></Session></QRZDatabase>')
+
+    @staticmethod
+    def _session(key=None, error=None):
+        inner = (f"<Key>{key}</Key>" if key else "") + (f"<Error>{error}</Error>" if error else "")
+        return f'<?xml version="1.0" ?><QRZDatabase xmlns="{XMLNS}"><Session>{inner}</Session></QRZDatabase>'
+
+    def _logbook(self, params):
+        # QRZ keeps one record per call, date, time and band. OPTION=REPLACE overwrites the
+        # record named by app_qrzlog_logid, or else the duplicate, instead of failing.
+        server = self.server
+        if params.get("key") != server.api_key:
+            return "RESULT=AUTH&REASON=invalid api key"
+        adif = unquote(params.get("adif", ""))
+        replace = params.get("option", "").upper() == "REPLACE"
+        with server.lock:
+            server.uploads.append(adif)
+            server.options.append(params.get("option"))
+            fields = adif_fields(adif)
+            logid = fields.get("app_qrzlog_logid")
+            if not (replace and logid in server.records):
+                key = [fields.get(tag) for tag in ("call", "qso_date", "time_on", "band")]
+                logid = next((i for i, record in server.records.items()
+                              if [adif_fields(record).get(tag) for tag in ("call", "qso_date", "time_on", "band")] == key), None)
+                if logid and not replace:
+                    return "RESULT=FAIL&REASON=Unable to add QSO to database: duplicate&EXTENDED="
+            if logid:
+                server.records[logid] = adif
+                return f"RESULT=REPLACE&LOGID={logid}&COUNT=1"
+            logid = str(len(server.uploads))
+            server.records[logid] = adif
+            return f"RESULT=OK&LOGID={logid}&COUNT=1"
+
+
+def adif_fields(adif):
+    return {tag.lower(): value for tag, value in re.findall(r"<(\w+):\d+>(\S*)", adif)}
+
+
+def make_config(password="secret", api_key="APIKEY"):
+    config = configparser.ConfigParser()
+    config["QRZ"] = {"username": "W9EN", "password": password, "api_key": api_key}
+    return config
+
+
+class QrzApiTest(unittest.TestCase):
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        os.chdir(tempfile.mkdtemp())  # qrz_cache.db is created in the working directory
+        self.server = FakeQrz()
+        self.qrz = self.make_qrz()
+
+    def tearDown(self):
+        self.qrz.close()
+        self.server.stop()
+        os.chdir(self._cwd)
+
+    def make_qrz(self, **config):
+        qrz = QrzApi(make_config(**config))
+        qrz._xml_url = self.server.url + "/xml"
+        qrz._log_url = self.server.url + "/api"
+        return qrz
+
+    def test_requests_reuse_one_keep_alive_connection(self):
+        self.assertTrue(self.qrz.login())
+        for call in ("K1ABC", "K2ABC", "K3ABC", "K4ABC"):
+            self.assertEqual(self.qrz.lookup(call)["Callsign"]["call"], call)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_login_with_wrong_password_fails(self):
+        qrz = self.make_qrz(password="wrong")
+        try:
+            with self.assertRaisesRegex(RuntimeError, "Username/password incorrect"):
+                qrz.login()
+        finally:
+            qrz.close()
+
+    def test_expired_session_logs_in_again(self):
+        self.qrz.login()
+        self.server.expire()
+        self.assertEqual(self.qrz.lookup("K1ABC")["Callsign"]["call"], "K1ABC")
+        self.assertEqual(self.server.logins, 2)
+        self.assertEqual(self.qrz._session_key, "KEY2")
+
+    def test_expired_session_is_renewed_once_by_concurrent_lookups(self):
+        self.qrz.login()
+        self.server.expire()
+        errors = []
+
+        def lookup(call):
+            try:
+                self.qrz._fetch(call)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=lookup, args=(f"K{i}XYZ",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.server.logins, 2)
+
+    def test_lookup_is_served_from_cache(self):
+        self.qrz.login()
+        self.qrz.lookup("K1ABC")
+        self.server.expire()  # A second request would have to log in again
+        self.assertEqual(self.qrz.lookup("k1abc")["Callsign"]["call"], "K1ABC")
+        self.assertEqual(self.server.logins, 1)
+
+    def test_upload_sends_qsos_and_returns_log_ids(self):
+        self.qrz.login()
+        qsos = [Qso(str(i), "K1ABC", date="2025-01-01", time="120%d" % i, band="20M", mode="CW") for i in (1, 2)]
+        self.assertEqual(self.qrz.upload_qsos(qsos), [("1", "sent", 1), ("2", "sent", 2)])
+        self.assertIn("<call:5>K1ABC", self.server.uploads[0])
+
+    def test_duplicate_of_a_first_upload_counts_as_sent(self):
+        self.qrz.login()
+        qso = Qso("1", "K1ABC", date="2025-01-01", time="1200", band="20M", mode="CW")
+        self.qrz.upload_qsos([qso])
+        self.assertEqual(self.qrz.upload_qsos([qso]), [("1", "sent", None)])
+        self.assertEqual(self.server.options, [None, None])
+
+    def test_edited_qso_replaces_its_record_by_logid(self):
+        self.qrz.login()
+        qso = Qso("1", "K1ABC", date="2025-01-01", time="1200", band="20M", mode="CW")
+        self.assertEqual(self.qrz.upload_qsos([qso]), [("1", "sent", 1)])
+        qso.callsign, qso.band = "K1ABD", "40M"  # Key fields changed
+        self.assertEqual(self.qrz.upload_qsos([qso], replace={"1": "1"}), [("1", "sent", 1)])
+        self.assertEqual(self.server.options[-1], "REPLACE")
+        self.assertIn("<app_qrzlog_logid:1>1 ", self.server.uploads[-1])
+        self.assertEqual(list(self.server.records), ["1"])
+        self.assertIn("<call:5>K1ABD", self.server.records["1"])
+
+    def test_edited_qso_without_logid_replaces_the_duplicate(self):
+        self.qrz.login()
+        qso = Qso("1", "K1ABC", date="2025-01-01", time="1200", band="20M", mode="CW", remarks="old")
+        self.qrz.upload_qsos([qso])
+        qso.remarks = "new"
+        self.assertEqual(self.qrz.upload_qsos([qso], replace={"1": None}), [("1", "sent", 1)])
+        self.assertNotIn("app_qrzlog_logid", self.server.uploads[-1])
+        self.assertIn("<remarks:3>new", self.server.records["1"])
+
+    def test_duplicate_answer_to_an_edit_is_failed(self):
+        self.qrz.login()
+        qso = Qso("1", "K1ABC", date="2025-01-01", time="1200", band="20M", mode="CW")
+        self.qrz.upload_qsos([qso])
+        with mock.patch.object(self.qrz, "upload_qso", return_value=("FAIL", None, None, "duplicate")):
+            self.assertEqual(self.qrz.upload_qsos([qso], replace={"1": "1"}), [("1", "failed", "duplicate")])
+
+    def test_upload_with_bad_api_key_is_retried(self):
+        qrz = self.make_qrz(api_key="WRONG")
+        try:
+            qrz.login()
+            qso = Qso("1", "K1ABC", date="2025-01-01", time="1200", band="20M", mode="CW")
+            self.assertEqual(qrz.upload_qsos([qso]), [("1", "retry", "invalid api key")])
+            self.assertEqual(self.server.uploads, [])
+        finally:
+            qrz.close()
+
+    def test_close_releases_the_cache(self):
+        self.qrz.close()
+        with self.assertRaises(Exception):
+            self.qrz.cache_stats()
+        self.qrz = self.make_qrz()  # tearDown closes it
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+# Tests for the TTL and LRU eviction of QrzCache.
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from QrzCache import EVICT_EVERY, QrzCache
+
+
+class QrzCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000000.0
+        patcher = mock.patch("QrzCache.time.time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = QrzCache(os.path.join(tempfile.mkdtemp(), "qrz_cache.db"), ttl_days=1, max_entries=10)
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_entries_go_stale_after_the_ttl(self):
+        self.cache.put("K1ABC", {"name": "Test"})
+        self.assertEqual(self.cache.get("K1ABC"), ({"name": "Test"}, True))
+        self.now += 86400
+        self.assertEqual(self.cache.get("K1ABC"), ({"name": "Test"}, False))
+        self.cache.put("K1ABC", {"name": "New"})  # Refreshed
+        self.assertEqual(self.cache.get("K1ABC"), ({"name": "New"}, True))
+        self.assertEqual(self.cache.get("K2ABC"), (None, False))
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["stale_hits"], stats["misses"]), (2, 1, 1))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        for i in range(EVICT_EVERY - 1):
+            self.now += 1
+            self.cache.put(f"K{i}ABC", {})
+        self.now += 1
+        self.cache.get("K0ABC")  # Used again, so it is kept
+        self.assertEqual(self.cache.stats()["entries"], EVICT_EVERY - 1)  # Cap only checked every EVICT_EVERY puts
+        self.now += 1
+        self.cache.put("LAST", {})
+        self.assertEqual(self.cache.stats()["entries"], 10)
+        kept = [call for call in ["K0ABC", "LAST"] + [f"K{i}ABC" for i in range(1, EVICT_EVERY - 1)]
+                if self.cache.get(call)[0] is not None]
+        self.assertEqual(kept[:2], ["K0ABC", "LAST"])
+        self.assertEqual(kept[2:], [f"K{i}ABC" for i in range(EVICT_EVERY - 9, EVICT_EVERY - 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()